@@ -0,0 +1,89 @@
+"""
+Benchmark the memory held per Dependency
+
+Builds the dependencies of a synthetic fleet of projects, where the same
+packages, versions and manifest paths recur across many lock files, and
+reports the traced bytes per dependency for ``Dependency`` and for a plain
+``__dict__``-backed dataclass with the same fields and no interning (the
+previous layout). Run from the repository root:
+
+    python benchmarks/dependency_memory.py [--projects N] [--dependencies N]
+"""
+import argparse
+import dataclasses
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Iterator, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sbom_scanner.models import Dependency, DependencyType, Ecosystem  # noqa: E402
+
+
+# The previous layout: same fields, per-instance __dict__, strings as parsed
+_DictDependency = dataclasses.make_dataclass(
+    'Dependency',
+    [(f.name, f.type, dataclasses.field(default=f.default, init=f.init))
+     for f in dataclasses.fields(Dependency)],
+)
+
+
+def _parsed_fields(projects: int, dependencies: int, packages: int) -> Iterator[Tuple]:
+    """
+    Constructor arguments as a detector produces them
+
+    Every string is built afresh, as it is when read from a manifest, so
+    equal values are separate objects unless the model interns them.
+    """
+    for project in range(projects):
+        for i in range(dependencies):
+            package = (project * 7 + i) % packages
+            name = f"pkg-{package}"
+            version = f"1.{package % 50}.{package % 7}"
+            yield (
+                name, version, Ecosystem.NPM, f"pkg:npm/{name}@{version}",
+                DependencyType.DIRECT if i % 20 == 0 else DependencyType.TRANSITIVE,
+                f"services/svc-{project}/package-lock.json",
+                None, "MIT", None, 1.0,
+                tuple(f"pkg:npm/pkg-{j}@1.{j % 50}.{j % 7}"
+                      for j in ((package + 1) % packages, (package + 2) % packages)),
+            )
+
+
+def _bytes_per_dependency(factory: Callable, args: argparse.Namespace) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        held = [factory(*row) for row in _parsed_fields(args.projects, args.dependencies, args.packages)]
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size / len(held)
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argument_parser.add_argument('--projects', type=int, default=200,
+                                 help='projects in the fleet (default: 200)')
+    argument_parser.add_argument('--dependencies', type=int, default=500,
+                                 help='dependencies per project (default: 500)')
+    argument_parser.add_argument('--packages', type=int, default=5000,
+                                 help='distinct packages across the fleet (default: 5000)')
+    args = argument_parser.parse_args()
+
+    count = args.projects * args.dependencies
+    print(f"{count} dependencies, {args.packages} distinct packages, {args.projects} projects\n")
+
+    before = _bytes_per_dependency(_DictDependency, args)
+    after = _bytes_per_dependency(Dependency, args)
+    print(f"{'layout':<22} {'bytes/dependency':>17}")
+    print(f"{'dict, not interned':<22} {before:>17.0f}")
+    print(f"{'slots, interned':<22} {after:>17.0f}")
+    print(f"\n{(1 - after / before) * 100:.0f}% less memory per dependency")
+
+
+if __name__ == '__main__':
+    main()
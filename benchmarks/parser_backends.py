@@ -0,0 +1,117 @@
+"""
+Benchmark the parser backends available for each manifest format
+
+Generates synthetic lock-file-sized documents and times every installed
+backend (see ``sbom_scanner.parsers``) on them, reporting the speedup over
+the fallback implementation. Run from the repository root:
+
+    python benchmarks/parser_backends.py [--repeat N]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sbom_scanner import parsers  # noqa: E402
+
+
+def _write_documents(directory: Path, packages: int) -> dict:
+    """Write one package-lock-like document per format; returns format -> path"""
+    documents = {}
+
+    path = directory / 'package-lock.json'
+    path.write_text(json.dumps({
+        'name': 'bench', 'lockfileVersion': 3,
+        'packages': {
+            f'node_modules/pkg-{i}': {
+                'version': f'1.{i % 50}.{i % 7}',
+                'resolved': f'https://registry.npmjs.org/pkg-{i}/-/pkg-{i}-1.0.0.tgz',
+                'integrity': 'sha512-' + 'a' * 86,
+                'dependencies': {f'pkg-{(i + j) % packages}': '^1.0.0' for j in range(1, 4)},
+            }
+            for i in range(packages)
+        },
+    }, indent=2))
+    documents['json'] = path
+
+    path = directory / 'Cargo.lock'
+    with open(path, 'w') as f:
+        f.write('version = 3\n\n')
+        for i in range(packages):
+            f.write(f'[[package]]\nname = "crate-{i}"\nversion = "0.{i % 30}.{i % 9}"\n'
+                    f'source = "registry+https://github.com/rust-lang/crates.io-index"\n'
+                    f'checksum = "{"0" * 64}"\n'
+                    f'dependencies = [\n "crate-{(i + 1) % packages}",\n "crate-{(i + 2) % packages}",\n]\n\n')
+    documents['toml'] = path
+
+    path = directory / 'pom.xml'
+    with open(path, 'w') as f:
+        f.write('<project xmlns="http://maven.apache.org/POM/4.0.0"><dependencies>\n')
+        for i in range(packages):
+            f.write(f'  <dependency><groupId>org.bench{i % 40}</groupId><artifactId>artifact-{i}</artifactId>'
+                    f'<version>1.{i % 50}</version><scope>compile</scope></dependency>\n')
+        f.write('</dependencies></project>\n')
+    documents['xml'] = path
+
+    return documents
+
+
+_LOADERS = {
+    'json': parsers.load_json,
+    'toml': parsers.load_toml,
+    'xml': parsers.parse_xml,
+}
+
+
+def _best_time(load, path: Path, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argument_parser.add_argument('--packages', type=int, default=20000,
+                                 help='entries per generated document (default: 20000)')
+    argument_parser.add_argument('--repeat', type=int, default=3,
+                                 help='runs per backend, the best is reported (default: 3)')
+    args = argument_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        documents = _write_documents(Path(tmp), args.packages)
+
+        print(f"{'format':<6} {'backend':<12} {'size':>9} {'time':>9} {'speedup':>8}")
+        for kind, path in documents.items():
+            backends = parsers.available_backends(kind)
+            if not backends:
+                print(f"{kind:<6} {'(none installed)':<12}")
+                continue
+
+            selected = parsers.active_backend(kind)
+            # The last backend is the fallback the others are measured against
+            timings = {}
+            for name in reversed(backends):
+                parsers.set_backend(kind, name)
+                timings[name] = _best_time(_LOADERS[kind], path, args.repeat)
+            parsers.set_backend(kind, selected)
+
+            baseline = timings[backends[-1]]
+            size = f"{os.path.getsize(path) / 1e6:.1f} MB"
+            for name in backends:
+                marker = '*' if name == selected else ' '
+                print(f"{kind:<6} {name + marker:<12} {size:>9} {timings[name] * 1000:>7.0f}ms "
+                      f"{baseline / timings[name]:>7.1f}x")
+
+    print("\n* selected by default")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Persistent content-addressed cache of per-manifest parse results
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Optional, Sequence, Set
+
+from . import __version__
+from .models import Dependency
+from .parsers import load_json
+
+
+# Bump when the on-disk entry layout changes
+CACHE_FORMAT = 3
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    """Return the default cache location (``$XDG_CACHE_HOME/sbom-scanner``)"""
+    base = os.environ.get('XDG_CACHE_HOME')
+    return (Path(base) if base else Path.home() / '.cache') / 'sbom-scanner'
+
+
+class ParseCache:
+    """
+    On-disk cache of the Dependency set produced by each ``_parse_*`` call
+
+    Entries are keyed by the SHA-256 of the manifest contents plus the
+    detector name, detector version and parser method, so an unchanged file
+    is never reparsed no matter where or when it was last seen. The cache is
+    bounded in size and evicts least recently used entries (tracked through
+    the entry file mtime, which is refreshed on every hit).
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        self.max_size = max_size
+        self._entries_dir = self.cache_dir / 'parse'
+
+    def get_or_parse(self, detector_name: str, detector_version: str, parser_name: str,
+                     file_path: Path, base_path: Path,
+                     parse: Callable[[], Set[Dependency]],
+                     inputs: Sequence[Path] = ()) -> Set[Dependency]:
+        """
+        Return the cached dependencies for ``file_path`` or run ``parse`` and store them
+
+        Args:
+            detector_name: Detector class name
+            detector_version: Detector parse logic version
+            parser_name: ``_parse_*`` method that handles the manifest
+            file_path: Manifest being parsed
+            base_path: Scan root, used to restore relative source_file values
+            parse: Callback performing the actual parse on a cache miss
+            inputs: Other files the parse result depends on; their contents
+                    are part of the key
+        """
+        try:
+            digest = hashlib.sha256()
+            with open(file_path, 'rb') as f:
+                digest.update(f.read())
+            for input_path in inputs:
+                digest.update(b'\0' + str(input_path).encode('utf-8') + b'\0')
+                with open(input_path, 'rb') as f:
+                    digest.update(f.read())
+            content_hash = digest.hexdigest()
+        except OSError:
+            return parse()
+
+        key = hashlib.sha256(
+            f"{CACHE_FORMAT}:{__version__}:{detector_name}:{detector_version}:"
+            f"{parser_name}:{content_hash}".encode('utf-8')
+        ).hexdigest()
+        entry = self._entries_dir / key[:2] / f"{key}.json"
+        source_file = str(file_path.relative_to(base_path))
+
+        cached = self._load(entry, source_file)
+        if cached is not None:
+            return cached
+
+        dependencies = parse()
+        self._store(entry, dependencies, source_file)
+        return dependencies
+
+    def _load(self, entry: Path, source_file: str) -> Optional[Set[Dependency]]:
+        """Read an entry, refreshing its LRU timestamp"""
+        try:
+            rows = load_json(entry)
+            os.utime(entry)
+        except (OSError, ValueError):
+            return None
+
+        dependencies = set()
+        for row in rows:
+            # Source paths are stored relative to the manifest itself (None)
+            # so identical files at different locations share one entry
+            if row[5] is None:
+                row[5] = source_file
+            dependencies.add(Dependency.from_tuple(row))
+        return dependencies
+
+    def _store(self, entry: Path, dependencies: Set[Dependency], source_file: str):
+        """Atomically write an entry; cache failures never fail the scan"""
+        rows = []
+        for dep in dependencies:
+            row = list(dep.to_tuple())
+            if row[5] == source_file:
+                row[5] = None
+            rows.append(row)
+
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=entry.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(rows, f, separators=(',', ':'))
+                os.replace(tmp_name, entry)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+        except OSError:
+            pass
+
+    def prune(self):
+        """Evict least recently used entries until the cache fits in max_size"""
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self._entries_dir):
+            for filename in filenames:
+                entry = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(entry)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry))
+                total += stat.st_size
+
+        if total <= self.max_size:
+            return
+
+        entries.sort()
+        for _, size, entry in entries:
+            try:
+                os.unlink(entry)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_size:
+                break
+
+    def clear(self):
+        """Remove every cached entry"""
+        for dirpath, _, filenames in os.walk(self._entries_dir):
+            for filename in filenames:
+                try:
+                    os.unlink(os.path.join(dirpath, filename))
+                except OSError:
+                    pass
@@ -8,6 +8,10 @@ from colorama import init, Fore, Style
 
 from .scanner import Scanner
 from .cyclonedx_generator import CycloneDXGenerator
+from .file_index import DEFAULT_SKIP_DIRS
+from .cache import ParseCache, default_cache_dir
+from .incremental import default_state_file
+from .watch import WatchSession, watch as watch_changes
 from . import __version__
 
 # Initialize colorama for Windows support
@@ -24,9 +28,16 @@ init(autoreset=True)
 )
 @click.option(
     '--format', '-f',
-    type=click.Choice(['json', 'xml'], case_sensitive=False),
+    'formats',
+    callback=lambda ctx, param, value: parse_formats(value),
     default='json',
-    help='Output format: json or xml (default: json)'
+    help='Output format: json, xml, or several separated by commas (default: json)'
+)
+@click.option(
+    '--engine',
+    type=click.Choice(CycloneDXGenerator.ENGINES, case_sensitive=False),
+    default='library',
+    help='BOM writer: library (cyclonedx-python-lib) or streaming (components written one at a time) (default: library)'
 )
 @click.option(
     '--project-name', '-n',
@@ -44,6 +55,50 @@ init(autoreset=True)
     default=0.8,
     help='Minimum confidence threshold (0.0-1.0) to reduce false positives (default: 0.8)'
 )
+@click.option(
+    '--skip-dir',
+    'skip_dirs',
+    multiple=True,
+    help='Additional directory name to skip while scanning (repeatable)'
+)
+@click.option(
+    '--all-manifests',
+    is_flag=True,
+    help='Also parse manifests that a lock file in the same directory supersedes'
+)
+@click.option(
+    '--jobs', '-j',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Number of detectors to run in parallel (default: automatic, 1 = sequential)'
+)
+@click.option(
+    '--processes',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Parse individual manifest files on a pool of N processes (default: off)'
+)
+@click.option(
+    '--no-cache',
+    is_flag=True,
+    help='Do not read or write the persistent parse cache'
+)
+@click.option(
+    '--cache-dir',
+    type=click.Path(file_okay=False),
+    default=None,
+    help='Parse cache directory (default: ~/.cache/sbom-scanner)'
+)
+@click.option(
+    '--incremental',
+    is_flag=True,
+    help='Only re-read manifests whose size/mtime/inode changed since the previous scan'
+)
+@click.option(
+    '--watch',
+    is_flag=True,
+    help='Keep running and rewrite the SBOM whenever a manifest file changes'
+)
 @click.option(
     '--verbose',
     is_flag=True,
@@ -54,7 +109,8 @@ init(autoreset=True)
     is_flag=True,
     help='Show version and exit'
 )
-def main(path, output, format, project_name, project_version, min_confidence, verbose, version):
+def main(path, output, formats, engine, project_name, project_version, min_confidence, skip_dirs,
+         all_manifests, jobs, processes, no_cache, cache_dir, incremental, watch, verbose, version):
     """
     SBOM Scanner - Multi-language dependency scanner
     
@@ -82,8 +138,20 @@ def main(path, output, format, project_name, project_version, min_confidence, ve
       # Generate XML format with project metadata
       sbom-scan -f xml -n MyProject -v 2.1.0
       
+      # Write sbom.json and sbom.xml from one scan
+      sbom-scan -f json,xml
+      
       # Increase confidence threshold to reduce false positives
       sbom-scan --min-confidence 0.9
+      
+      # Also skip generated directories
+      sbom-scan --skip-dir generated --skip-dir third_party
+      
+      # Write a very large BOM without building it in memory
+      sbom-scan --engine streaming
+      
+      # Keep sbom.json up to date while editing manifests
+      sbom-scan --watch
     """
     
     if version:
@@ -100,15 +168,29 @@ def main(path, output, format, project_name, project_version, min_confidence, ve
     
     try:
         # Initialize scanner
-        scanner = Scanner(min_confidence=min_confidence)
+        scanner = Scanner(
+            min_confidence=min_confidence,
+            skip_dirs=DEFAULT_SKIP_DIRS.union(skip_dirs),
+            prefer_lockfiles=not all_manifests,
+            max_workers=jobs,
+            max_processes=processes,
+            parse_cache=None if no_cache else ParseCache(cache_dir),
+            state_file=default_state_file(
+                Path(path).resolve(), cache_dir or default_cache_dir()
+            ) if incremental else None
+        )
         
         # Run scan
         click.echo(f"\n{Fore.CYAN}Starting scan...{Style.RESET_ALL}\n")
-        scan_result = scanner.scan(
-            path=path,
-            project_name=project_name,
-            project_version=project_version
-        )
+        if watch:
+            session = WatchSession(scanner, path, project_name, project_version)
+            scan_result = session.start()
+        else:
+            scan_result = scanner.scan(
+                path=path,
+                project_name=project_name,
+                project_version=project_version
+            )
         
         # Check for errors
         if scan_result.errors:
@@ -118,14 +200,18 @@ def main(path, output, format, project_name, project_version, min_confidence, ve
         
         # Generate CycloneDX BOM
         click.echo(f"\n{Fore.CYAN}Generating CycloneDX BOM...{Style.RESET_ALL}")
-        generator = CycloneDXGenerator()
-        generator.save_to_file(scan_result, output, format)
+        generator = CycloneDXGenerator(engine=engine.lower())
+        outputs = output_paths(output, formats)
+        generator.save_many(scan_result, outputs, max_workers=jobs or 1)
         
         # Print summary
-        print_summary(scan_result, output, format)
+        print_summary(scan_result, outputs)
         
         click.echo(f"\n{Fore.GREEN}[OK] Scan completed successfully!{Style.RESET_ALL}")
         
+        if watch:
+            run_watch(session, generator, outputs)
+        
     except FileNotFoundError as e:
         click.echo(f"{Fore.RED}[X] Error: {e}{Style.RESET_ALL}")
         sys.exit(1)
@@ -140,6 +226,47 @@ def main(path, output, format, project_name, project_version, min_confidence, ve
         sys.exit(1)
 
 
+def parse_formats(value):
+    """Split a comma-separated --format value into known, unique formats"""
+    formats = []
+    for output_format in value.split(','):
+        output_format = output_format.strip().lower()
+        if output_format not in CycloneDXGenerator.FORMATS:
+            raise click.BadParameter(
+                f"'{output_format}' is not one of {', '.join(CycloneDXGenerator.FORMATS)}",
+                param_hint="'--format'"
+            )
+        if output_format not in formats:
+            formats.append(output_format)
+    return formats
+
+
+def output_paths(output, formats):
+    """Map each format to its output file; with several formats the suffix is the format"""
+    if len(formats) == 1:
+        return {formats[0]: output}
+    return {output_format: str(Path(output).with_suffix(f'.{output_format}')) for output_format in formats}
+
+
+def run_watch(session, generator, outputs):
+    """Rewrite the BOMs after every manifest change until interrupted"""
+    def on_update(scan_result, changed):
+        generator.save_many(scan_result, outputs)
+        names = ', '.join(sorted(path.name for path in changed))
+        click.echo(
+            f"{Fore.CYAN}[~] {names} changed: "
+            f"{len(scan_result.dependencies)} dependencies{Style.RESET_ALL}"
+        )
+        for error in scan_result.errors:
+            click.echo(f"  {Fore.YELLOW}{error}{Style.RESET_ALL}")
+    
+    click.echo(f"\n{Fore.CYAN}Watching for manifest changes (Ctrl+C to stop)...{Style.RESET_ALL}")
+    try:
+        watch_changes(session, on_update)
+    except KeyboardInterrupt:
+        click.echo(f"\n{Fore.CYAN}Stopped watching.{Style.RESET_ALL}")
+
+
 def print_banner():
     """Print application banner"""
     banner = f"""
@@ -153,7 +280,7 @@ def print_banner():
     click.echo(banner)
 
 
-def print_summary(scan_result, output_path, output_format):
+def print_summary(scan_result, outputs):
     """Print scan summary"""
     # Count dependencies by ecosystem
     ecosystem_counts = {}
@@ -172,8 +299,9 @@ def print_summary(scan_result, output_path, output_format):
             click.echo(f"  {Fore.WHITE}{ecosystem:12s}{Style.RESET_ALL}: {count}")
     
     click.echo(f"\n{Fore.CYAN}Output:{Style.RESET_ALL}")
-    click.echo(f"  Format: {Fore.WHITE}{output_format.upper()}{Style.RESET_ALL}")
-    click.echo(f"  File:   {Fore.WHITE}{output_path}{Style.RESET_ALL}")
+    for output_format, output_path in outputs.items():
+        click.echo(f"  Format: {Fore.WHITE}{output_format.upper()}{Style.RESET_ALL}")
+        click.echo(f"  File:   {Fore.WHITE}{output_path}{Style.RESET_ALL}")
 
 
 if __name__ == '__main__':
@@ -1,10 +1,11 @@
 """
 CycloneDX BOM generator
 """
-import json
-from datetime import datetime
-from typing import Dict, Any
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Dict, IO, Iterable, List, Optional, Sequence
 try:
     from cyclonedx.model import Tool
 except ImportError:
@@ -15,15 +16,47 @@ from cyclonedx.output.json import JsonV1Dot5
 from cyclonedx.output.xml import XmlV1Dot5
 from packageurl import PackageURL
 
-from .models import ScanResult, Ecosystem, DependencyType
+from .models import ScanResult, DependencyType
+from .cyclonedx_stream import BomComponent, JsonBomWriter, XmlBomWriter, sort_key
+
+
+class _PreparedBom:
+    """The normalized component list of a scan, built once and shared by every output format"""
+    
+    def __init__(self, scan_result: ScanResult, components: List[BomComponent]):
+        self.scan_result = scan_result
+        self.components = components
+        # cyclonedx-python-lib Bom, built on first use by the library engine
+        self.bom: Optional[Bom] = None
+        # The library rewrites bom-refs while serializing, so one Bom is serialized at a time
+        self.lock = threading.Lock()
 
 
 class CycloneDXGenerator:
-    """Generate CycloneDX SBOM from scan results"""
+    """
+    Generate CycloneDX SBOM from scan results
+    
+    Two engines are available: "library" builds a cyclonedx-python-lib
+    ``Bom`` and serializes it, "streaming" writes the document component by
+    component without building the object graph. Either way the component
+    list is normalized once per scan, so several formats can be produced
+    from it with ``generate_many`` / ``save_many``.
+    """
+    
+    ENGINES = ('library', 'streaming')
+    
+    # Output format -> cyclonedx-python-lib outputter / streaming writer
+    LIBRARY_OUTPUTTERS = {'json': JsonV1Dot5, 'xml': XmlV1Dot5}
+    STREAMING_WRITERS = {'json': JsonBomWriter, 'xml': XmlBomWriter}
     
-    def __init__(self):
+    FORMATS = tuple(LIBRARY_OUTPUTTERS)
+    
+    def __init__(self, engine: str = 'library'):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unsupported engine: {engine}. Use one of: {', '.join(self.ENGINES)}")
         self.tool_name = "sbom-scanner"
         self.tool_version = "1.0.0"
+        self.engine = engine
     
     def generate(self, scan_result: ScanResult, output_format: str = "json") -> str:
         """
@@ -36,6 +69,92 @@ class CycloneDXGenerator:
         Returns:
             Serialized BOM as string
         """
+        return self.generate_many(scan_result, [output_format])[output_format.lower()]
+    
+    def generate_many(self, scan_result: ScanResult, output_formats: Iterable[str],
+                      max_workers: int = 1) -> Dict[str, str]:
+        """
+        Generate the BOM in several formats from one normalized component list
+        
+        Args:
+            scan_result: ScanResult from scanner
+            output_formats: Formats to produce, e.g. ["json", "xml"]
+            max_workers: Serialize up to this many formats concurrently on threads
+        
+        Returns:
+            Serialized BOM per (lowercased) format
+        """
+        output_formats = self._check_formats(output_formats)
+        prepared = self._prepare(scan_result)
+        
+        def generate_one(output_format: str) -> str:
+            buffer = io.StringIO()
+            self._write(prepared, buffer, output_format)
+            return buffer.getvalue()
+        
+        documents = self._run([lambda f=f: generate_one(f) for f in output_formats], max_workers)
+        return dict(zip(output_formats, documents))
+    
+    def write(self, scan_result: ScanResult, stream: IO[str], output_format: str = "json"):
+        """
+        Generate CycloneDX BOM into a text stream
+        
+        With the streaming engine components are written as they are
+        serialized, so the document is never held in memory as a whole.
+        """
+        output_format, = self._check_formats([output_format])
+        self._write(self._prepare(scan_result), stream, output_format)
+    
+    def _check_formats(self, output_formats: Iterable[str]) -> List[str]:
+        """Lowercase and deduplicate requested formats, rejecting unknown ones"""
+        checked = []
+        for output_format in output_formats:
+            output_format = output_format.lower()
+            if output_format not in self.FORMATS:
+                raise ValueError(f"Unsupported format: {output_format}. Use 'json' or 'xml'")
+            if output_format not in checked:
+                checked.append(output_format)
+        return checked
+    
+    def _run(self, tasks: Sequence[Callable[[], object]], max_workers: int) -> list:
+        """Run tasks, concurrently when max_workers allows it; results are in task order"""
+        if max_workers <= 1 or len(tasks) <= 1:
+            return [task() for task in tasks]
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks)),
+                                thread_name_prefix='sbom-output') as executor:
+            futures = [executor.submit(task) for task in tasks]
+            return [future.result() for future in futures]
+    
+    def _prepare(self, scan_result: ScanResult) -> _PreparedBom:
+        """Normalize the dependencies of a scan into BOM components, in BOM order"""
+        components = []
+        for dep in scan_result.dependencies:
+            purl = dep.canonical_purl
+            if purl is None:
+                print(f"Warning: Could not create component for {dep.name}: invalid purl {dep.purl!r}")
+                continue
+            components.append(BomComponent(dep, purl))
+        components.sort(key=sort_key)
+        return _PreparedBom(scan_result, components)
+    
+    def _write(self, prepared: _PreparedBom, stream: IO[str], output_format: str):
+        """Serialize a prepared BOM in one (checked) format"""
+        if self.engine == 'streaming':
+            writer = self.STREAMING_WRITERS[output_format](self.tool_name, self.tool_version)
+            writer.write(prepared.scan_result, prepared.components, stream)
+            return
+        
+        with prepared.lock:
+            if prepared.bom is None:
+                prepared.bom = self._build_bom(prepared)
+            document = self.LIBRARY_OUTPUTTERS[output_format](prepared.bom).output_as_string()
+        stream.write(document)
+    
+    def _build_bom(self, prepared: _PreparedBom) -> Bom:
+        """Build a cyclonedx-python-lib Bom from the prepared components"""
+        scan_result = prepared.scan_result
+        
         # Create BOM
         bom = Bom()
         
@@ -65,34 +184,37 @@ class CycloneDXGenerator:
             bom.metadata.component = main_component
         
         # Add dependencies as components
-        for dep in scan_result.dependencies:
-            component = self._create_component(dep)
+        components = []
+        components_by_purl = {}
+        for dep, _ in prepared.components:
+            component = self._create_component(dep, dep.package_url)
             if component:
                 bom.components.add(component)
+                components.append((dep, component))
+                if dep.purl:
+                    components_by_purl[dep.purl] = component
         
-        # Serialize BOM
-        if output_format.lower() == "json":
-            outputter = JsonV1Dot5(bom)
-            return outputter.output_as_string()
-        elif output_format.lower() == "xml":
-            outputter = XmlV1Dot5(bom)
-            return outputter.output_as_string()
-        else:
-            raise ValueError(f"Unsupported format: {output_format}. Use 'json' or 'xml'")
-    
-    def _create_component(self, dep) -> Component:
+        # Add the dependency graph: the project depends on its direct
+        # dependencies, lock files supply the edges between packages
+        direct = [component for dep, component in components
+                  if dep.dependency_type != DependencyType.TRANSITIVE]
+        if direct:
+            bom.register_dependency(bom.metadata.component, direct)
+        for dep, component in components:
+            if dep.depends_on:
+                targets = [components_by_purl[purl] for purl in dep.depends_on
+                           if purl in components_by_purl]
+                if targets:
+                    bom.register_dependency(component, targets)
+        
+        return bom
+    
+    def _create_component(self, dep, purl: PackageURL) -> Component:
         """Create a CycloneDX Component from a Dependency"""
         try:
             # Determine component type based on dependency type
             comp_type = ComponentType.LIBRARY
             
-            # Create PackageURL
-            if dep.purl:
-                purl = PackageURL.from_string(dep.purl)
-            else:
-                # Construct PURL if not provided
-                purl = self._construct_purl(dep)
-            
             # Create component
             try:
                 component = Component(
@@ -125,47 +247,6 @@ class CycloneDXGenerator:
             print(f"Warning: Could not create component for {dep.name}: {e}")
             return None
     
-    def _construct_purl(self, dep) -> PackageURL:
-        """Construct a PackageURL from dependency information"""
-        ecosystem_map = {
-            Ecosystem.NPM: "npm",
-            Ecosystem.PYPI: "pypi",
-            Ecosystem.MAVEN: "maven",
-            Ecosystem.GRADLE: "maven",  # Gradle uses Maven repos
-            Ecosystem.COMPOSER: "composer",
-            Ecosystem.NUGET: "nuget",
-            Ecosystem.GEM: "gem",
-            Ecosystem.CARGO: "cargo",
-            Ecosystem.GO: "golang",
-            Ecosystem.CONAN: "conan",
-            Ecosystem.VCPKG: "vcpkg",
-            Ecosystem.CMAKE: "generic",  # CMake deps are generic
-            Ecosystem.PLATFORMIO: "platformio",
-            Ecosystem.ARDUINO: "arduino",
-            Ecosystem.MBED: "generic",  # Mbed uses generic type
-        }
-        
-        purl_type = ecosystem_map.get(dep.ecosystem, "generic")
-        
-        # Handle Maven-style coordinates (group:artifact)
-        if purl_type == "maven" and ":" in dep.name:
-            parts = dep.name.split(":")
-            namespace = parts[0]
-            name = parts[1] if len(parts) > 1 else parts[0]
-            
-            return PackageURL(
-                type=purl_type,
-                namespace=namespace,
-                name=name,
-                version=dep.version if dep.version != "*" else None
-            )
-        else:
-            return PackageURL(
-                type=purl_type,
-                name=dep.name,
-                version=dep.version if dep.version != "*" else None
-            )
-    
     def save_to_file(self, scan_result: ScanResult, output_path: str, 
                      output_format: str = "json"):
         """
@@ -176,13 +257,28 @@ class CycloneDXGenerator:
             output_path: Path to save the BOM file
             output_format: "json" or "xml"
         """
-        bom_content = self.generate(scan_result, output_format)
+        self.save_many(scan_result, {output_format: output_path})
+    
+    def save_many(self, scan_result: ScanResult, outputs: Dict[str, str], max_workers: int = 1):
+        """
+        Generate the BOM in several formats and save each to its own file
         
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+        Args:
+            scan_result: ScanResult from scanner
+            outputs: Output path per format, e.g. {"json": "sbom.json", "xml": "sbom.xml"}
+            max_workers: Write up to this many files concurrently on threads
+        """
+        output_formats = self._check_formats(outputs)
+        paths = {output_format.lower(): Path(path) for output_format, path in outputs.items()}
+        prepared = self._prepare(scan_result)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(bom_content)
+        def save_one(output_format: str):
+            output_file = paths[output_format]
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(output_file, 'w', encoding='utf-8') as f:
+                self._write(prepared, f, output_format)
         
-        print(f"SBOM saved to: {output_file}")
+        self._run([lambda f=f: save_one(f) for f in output_formats], max_workers)
+        for output_format in output_formats:
+            print(f"SBOM saved to: {paths[output_format]}")
 
@@ -0,0 +1,193 @@
+"""
+Streaming CycloneDX writers for very large BOMs
+"""
+import json
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Dict, IO, Iterable, List, NamedTuple, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from .models import Dependency, DependencyType, ScanResult
+
+SPEC_VERSION = "1.5"
+JSON_SCHEMA = "http://cyclonedx.org/schema/bom-1.5.schema.json"
+XML_NAMESPACE = "http://cyclonedx.org/schema/bom/1.5"
+
+
+class BomComponent(NamedTuple):
+    """A dependency prepared for serialization, shared by every output format"""
+    dependency: Dependency
+    purl: str  # the dependency's canonical purl
+
+
+def sort_key(component: BomComponent) -> Tuple[str, str, str, str]:
+    """Order components like cyclonedx-python-lib does (name, version, description, purl)"""
+    dep = component.dependency
+    return (dep.name, '' if dep.version == "*" else dep.version, dep.description or '', component.purl)
+
+
+class BomWriter(ABC):
+    """
+    Write a CycloneDX 1.5 document component by component
+
+    Produces the same document structure as the cyclonedx-python-lib
+    outputters, but no ``Bom``/``Component`` objects are built and every
+    component is written to the stream as soon as it is serialized, so only
+    the bom-refs are kept for the dependency graph. Components are
+    referenced by their purl, which makes the output reproducible apart from
+    the serial number and timestamp. Subclasses render the document parts of
+    one format.
+    """
+
+    def __init__(self, tool_name: str, tool_version: str):
+        self.tool_name = tool_name
+        self.tool_version = tool_version
+
+    def write(self, scan_result: ScanResult, components: Iterable[BomComponent], stream: IO[str]):
+        """
+        Serialize a scan to ``stream``
+
+        Args:
+            scan_result: ScanResult providing the project metadata
+            components: Components in output order
+            stream: Text stream the document is written to
+        """
+        root_ref = f"{scan_result.project_name}@{scan_result.project_version or ''}"
+        stream.write(self._header(scan_result, root_ref, f"urn:uuid:{uuid.uuid4()}",
+                                  datetime.now(timezone.utc).isoformat()))
+
+        refs: List[Tuple[str, Dependency]] = []
+        refs_by_purl: Dict[str, str] = {}
+        used = set()
+        for dep, purl in components:
+            ref = purl
+            if ref in used or ref == root_ref:
+                ref = f"{purl}#{len(refs)}"
+            used.add(ref)
+            stream.write(self._component(ref, dep, purl, first=not refs))
+            refs.append((ref, dep))
+            if dep.purl:
+                refs_by_purl[dep.purl] = ref
+        stream.write(self._components_end())
+
+        # The project depends on its direct dependencies, lock files supply
+        # the edges between packages; every component gets an entry
+        direct = sorted(ref for ref, dep in refs if dep.dependency_type != DependencyType.TRANSITIVE)
+        stream.write(self._dependency(root_ref, direct, first=True))
+        for ref, dep in refs:
+            targets = sorted({refs_by_purl[purl] for purl in dep.depends_on or ()
+                              if purl in refs_by_purl})
+            stream.write(self._dependency(ref, targets, first=False))
+        stream.write(self._footer())
+
+    @abstractmethod
+    def _header(self, scan_result: ScanResult, root_ref: str, serial_number: str, timestamp: str) -> str:
+        """Document start up to the opening of the component list"""
+        pass
+
+    @abstractmethod
+    def _component(self, ref: str, dep: Dependency, purl: str, first: bool) -> str:
+        pass
+
+    @abstractmethod
+    def _components_end(self) -> str:
+        """Close the component list and open the dependency graph"""
+        pass
+
+    @abstractmethod
+    def _dependency(self, ref: str, targets: List[str], first: bool) -> str:
+        pass
+
+    @abstractmethod
+    def _footer(self) -> str:
+        pass
+
+
+class JsonBomWriter(BomWriter):
+    """Streaming equivalent of ``JsonV1Dot5``"""
+
+    def _header(self, scan_result: ScanResult, root_ref: str, serial_number: str, timestamp: str) -> str:
+        root = {"bom-ref": root_ref, "name": scan_result.project_name, "type": "application"}
+        if scan_result.project_version:
+            root["version"] = scan_result.project_version
+
+        header = {
+            "$schema": JSON_SCHEMA,
+            "bomFormat": "CycloneDX",
+            "specVersion": SPEC_VERSION,
+            "serialNumber": serial_number,
+            "version": 1,
+            "metadata": {
+                "timestamp": timestamp,
+                "tools": [{"name": self.tool_name, "version": self.tool_version}],
+                "component": root,
+            },
+        }
+        # Leave the header object open for the arrays
+        return json.dumps(header)[:-1] + ', "components": ['
+
+    def _component(self, ref: str, dep: Dependency, purl: str, first: bool) -> str:
+        component = {"bom-ref": ref, "name": dep.name, "type": "library"}
+        if dep.version != "*":
+            component["version"] = dep.version
+        if dep.description:
+            component["description"] = dep.description
+        component["purl"] = purl
+        return ('\n' if first else ',\n') + json.dumps(component)
+
+    def _components_end(self) -> str:
+        return '\n], "dependencies": ['
+
+    def _dependency(self, ref: str, targets: List[str], first: bool) -> str:
+        entry: Dict[str, object] = {"ref": ref}
+        if targets:
+            entry["dependsOn"] = targets
+        return ('\n' if first else ',\n') + json.dumps(entry)
+
+    def _footer(self) -> str:
+        return '\n]}\n'
+
+
+class XmlBomWriter(BomWriter):
+    """Streaming equivalent of ``XmlV1Dot5``"""
+
+    def _header(self, scan_result: ScanResult, root_ref: str, serial_number: str, timestamp: str) -> str:
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<bom xmlns="{XML_NAMESPACE}" serialNumber={quoteattr(serial_number)} version="1">\n'
+            f'<metadata><timestamp>{timestamp}</timestamp>'
+            f'<tools><tool>{self._element("name", self.tool_name)}'
+            f'{self._element("version", self.tool_version)}</tool></tools>'
+            f'<component type="application" bom-ref={quoteattr(root_ref)}>'
+            f'{self._element("name", scan_result.project_name)}'
+            f'{self._element("version", scan_result.project_version)}</component></metadata>\n'
+            '<components>'
+        )
+
+    def _component(self, ref: str, dep: Dependency, purl: str, first: bool) -> str:
+        return (
+            f'\n<component type="library" bom-ref={quoteattr(ref)}>'
+            f'{self._element("name", dep.name)}'
+            f'{self._element("version", dep.version if dep.version != "*" else None)}'
+            f'{self._element("description", dep.description)}'
+            f'{self._element("purl", purl)}</component>'
+        )
+
+    def _components_end(self) -> str:
+        return '\n</components>\n<dependencies>'
+
+    def _dependency(self, ref: str, targets: List[str], first: bool) -> str:
+        if not targets:
+            return f'\n<dependency ref={quoteattr(ref)} />'
+        children = ''.join(f'<dependency ref={quoteattr(target)} />' for target in targets)
+        return f'\n<dependency ref={quoteattr(ref)}>{children}</dependency>'
+
+    def _footer(self) -> str:
+        return '\n</dependencies>\n</bom>\n'
+
+    def _element(self, tag: str, text: Optional[str]) -> str:
+        """Render a text element; omitted when there is no value"""
+        if not text:
+            return ''
+        return f'<{tag}>{escape(text)}</{tag}>'
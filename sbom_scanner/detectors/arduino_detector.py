@@ -12,6 +12,11 @@ from ..models import Dependency, Ecosystem, DependencyType
 class ArduinoDetector(BaseDetector):
     """Detector for Arduino projects"""
     
+    # Manifest pattern -> parser method, in parse order
+    manifest_parsers = {
+        'library.properties': '_parse_library_properties',
+    }
+    
     def get_manifest_files(self) -> list[str]:
         return ['library.properties', 'library.json']
     
@@ -19,17 +24,6 @@ class ArduinoDetector(BaseDetector):
         """Check if Arduino manifest files exist"""
         return len(self.find_files(path, ['library.properties'])) > 0
     
-    def parse(self, path: Path) -> Set[Dependency]:
-        """Parse Arduino dependencies"""
-        dependencies = set()
-        
-        # Parse library.properties files
-        lib_props = self.find_files(path, ['library.properties'])
-        for prop_file in lib_props:
-            dependencies.update(self._parse_library_properties(prop_file, path))
-        
-        return dependencies
-    
     def _parse_library_properties(self, file_path: Path, base_path: Path) -> Set[Dependency]:
         """Parse library.properties file"""
         dependencies = set()
@@ -2,14 +2,42 @@
 Base detector class for all language-specific detectors
 """
 from abc import ABC, abstractmethod
-from typing import List, Set
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
 from pathlib import Path
 from ..models import Dependency
+from ..file_index import DEFAULT_SKIP_DIRS, FileIndex
+from ..cache import ParseCache
 
 
 class BaseDetector(ABC):
     """Base class for all package manager detectors"""
     
+    # Shared index of the scan tree, assigned by the Scanner before detection
+    file_index: Optional[FileIndex] = None
+    
+    # Directory names whose contents are never scanned
+    skip_dirs: FrozenSet[str] = DEFAULT_SKIP_DIRS
+    
+    # Manifest pattern -> name of the _parse_* method that handles it.
+    # Each (method, file) pair is an independent work unit, see get_work_units.
+    manifest_parsers: Dict[str, str] = {}
+    
+    # Manifest pattern -> lock files that supersede it when present in the
+    # same directory. The lock file pins every resolved version, so the
+    # manifest is not parsed at all. Only lock files with an entry in
+    # manifest_parsers take effect.
+    superseding_lockfiles: Dict[str, Tuple[str, ...]] = {}
+    
+    # Set to False to parse manifests even when a lock file supersedes them
+    prefer_lockfiles: bool = True
+    
+    # Version of the detector's parse logic. Bump it whenever a _parse_*
+    # method changes its output so stale ParseCache entries are not reused.
+    detector_version: str = '1'
+    
+    # Persistent parse cache, assigned by the Scanner when caching is enabled
+    parse_cache: Optional[ParseCache] = None
+    
     @abstractmethod
     def detect(self, path: Path) -> bool:
         """
@@ -18,13 +46,66 @@ class BaseDetector(ABC):
         """
         pass
     
-    @abstractmethod
     def parse(self, path: Path) -> Set[Dependency]:
         """
         Parse dependencies from the project at the given path
         Returns a set of Dependency objects
         """
-        pass
+        dependencies = set()
+        for parser_name, file_path in self.get_work_units(path):
+            dependencies.update(self.parse_file(parser_name, file_path, path))
+        return self.finalize(dependencies, path)
+    
+    def get_work_units(self, path: Path) -> List[Tuple[str, Path]]:
+        """
+        Split parsing into independent per-manifest work units
+        
+        Returns:
+            (parser method name, manifest path) pairs, in parse order
+        """
+        found = {pattern: self.find_files(path, [pattern]) for pattern in self.manifest_parsers}
+        
+        units = []
+        for pattern, parser_name in self.manifest_parsers.items():
+            locked_dirs = set()
+            if self.prefer_lockfiles:
+                for lockfile in self.superseding_lockfiles.get(pattern, ()):
+                    locked_dirs.update(lock_path.parent for lock_path in found.get(lockfile, ()))
+            for file_path in found[pattern]:
+                if file_path.parent not in locked_dirs:
+                    units.append((parser_name, file_path))
+        return units
+    
+    def parse_file(self, parser_name: str, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """Run a single work unit: parse one manifest with the named _parse_* method"""
+        parser = getattr(self, parser_name)
+        if self.parse_cache is None:
+            return parser(file_path, base_path)
+        return self.parse_cache.get_or_parse(
+            self.__class__.__name__, self.detector_version, parser_name,
+            file_path, base_path, lambda: parser(file_path, base_path),
+            inputs=self.get_unit_inputs(parser_name, file_path, base_path)
+        )
+    
+    def get_unit_inputs(self, parser_name: str, file_path: Path, base_path: Path) -> List[Path]:
+        """
+        Return the other files a work unit's output depends on
+        
+        Parsers that read shared files besides their manifest (central
+        version files, parent POMs, ...) list them here so the parse cache
+        and incremental scan state notice when one of them changes.
+        """
+        return []
+    
+    def finalize(self, dependencies: Set[Dependency], path: Path) -> Set[Dependency]:
+        """
+        Post-process the merged output of all work units
+        
+        Work unit results are cached per manifest, so anything that depends
+        on several files at once (e.g. workspace membership) belongs here.
+        Runs on every scan and must stay cheap.
+        """
+        return dependencies
     
     @abstractmethod
     def get_manifest_files(self) -> List[str]:
@@ -33,48 +114,62 @@ class BaseDetector(ABC):
         """
         pass
     
+    def get_index_patterns(self) -> List[str]:
+        """
+        Return file names and ``*.ext`` globs the shared FileIndex must record
+        for this detector. Defaults to the manifest files.
+        """
+        return self.get_manifest_files()
+    
+    def set_file_index(self, file_index: Optional[FileIndex]):
+        """Use a prebuilt FileIndex for find_files lookups"""
+        self.file_index = file_index
+    
     def find_files(self, path: Path, filenames: List[str]) -> List[Path]:
         """
         Recursively find all files matching the given filenames
+        
+        Lookups are answered from the shared FileIndex when one covers the
+        path and pattern; otherwise the tree is searched with rglob.
         """
+        index = self.file_index
+        if index is not None and index.root != path:
+            index = None
+        
         found_files = []
         for filename in filenames:
+            if index is not None and index.covers(filename):
+                # Skipped directories were already pruned while indexing
+                found_files.extend(index.lookup(filename))
+                continue
+            
             # Search recursively
-            for file_path in path.rglob(filename):
+            candidates = path.rglob(filename)
+            for file_path in candidates:
                 # Skip node_modules, vendor, and other common dependency directories
-                if self._should_skip_path(file_path):
+                if self._should_skip_path(file_path, path):
                     continue
                 found_files.append(file_path)
         return found_files
     
-    def _should_skip_path(self, file_path: Path) -> bool:
+    def _should_skip_path(self, file_path: Path, base_path: Optional[Path] = None) -> bool:
         """
         Check if path should be skipped (e.g., in vendor/node_modules directories)
         This helps reduce false positives from nested dependencies
+        
+        Only directories below ``base_path`` are considered when it is given,
+        so scanning a project that itself lives under e.g. ``build/`` works.
         """
-        skip_dirs = {
-            'node_modules',
-            'vendor',
-            'bower_components',
-            '.git',
-            '__pycache__',
-            'venv',
-            'env',
-            '.venv',
-            'virtualenv',
-            'target',
-            'build',
-            'dist',
-            '.gradle',
-            'gradle',
-            'obj',
-            'bin',
-        }
+        if base_path is not None:
+            try:
+                file_path = file_path.relative_to(base_path)
+            except ValueError:
+                pass
         
         # Check if any parent directory should be skipped
-        for parent in file_path.parents:
-            if parent.name in skip_dirs:
+        skip_dirs = self.skip_dirs
+        for part in file_path.parts[:-1]:
+            if part in skip_dirs:
                 return True
         
         return False
-
@@ -12,6 +12,11 @@ from ..models import Dependency, Ecosystem, DependencyType
 class CMakeDetector(BaseDetector):
     """Detector for CMake C/C++ projects"""
     
+    # Manifest pattern -> parser method, in parse order
+    manifest_parsers = {
+        'CMakeLists.txt': '_parse_cmake_file',
+    }
+    
     def get_manifest_files(self) -> list[str]:
         return ['CMakeLists.txt', 'cmake/dependencies.cmake']
     
@@ -19,17 +24,6 @@ class CMakeDetector(BaseDetector):
         """Check if CMakeLists.txt exists"""
         return len(self.find_files(path, ['CMakeLists.txt'])) > 0
     
-    def parse(self, path: Path) -> Set[Dependency]:
-        """Parse CMake dependencies"""
-        dependencies = set()
-        
-        # Parse CMakeLists.txt files
-        cmake_files = self.find_files(path, ['CMakeLists.txt'])
-        for cmake_file in cmake_files:
-            dependencies.update(self._parse_cmake_file(cmake_file, path))
-        
-        return dependencies
-    
     def _parse_cmake_file(self, file_path: Path, base_path: Path) -> Set[Dependency]:
         """Parse CMakeLists.txt file"""
         dependencies = set()
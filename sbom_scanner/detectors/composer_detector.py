@@ -1,75 +1,249 @@
 """
 Composer (PHP) dependency detector
 """
+import dataclasses
 import json
+import os
 from pathlib import Path
-from typing import Set
+from typing import List, Optional, Set, Tuple
 from .base import BaseDetector
 from ..models import Dependency, Ecosystem, DependencyType
+from ..parsers import load_json
+from ..json_stream import JsonStreamReader
 
 
 class ComposerDetector(BaseDetector):
     """Detector for Composer/PHP projects"""
     
+    # Manifest pattern -> parser method, in parse order
+    manifest_parsers = {
+        'composer.json': '_parse_composer_json',
+        'composer.lock': '_parse_composer_lock',
+    }
+    
+    # Parse logic version (2: locked packages are transitive unless the
+    # composer.json next to the lock file, no longer superseded, requires them)
+    detector_version = '2'
+    
     def get_manifest_files(self) -> list[str]:
         return ['composer.json', 'composer.lock']
     
     def detect(self, path: Path) -> bool:
-        """Check if composer.json exists"""
-        return len(self.find_files(path, ['composer.json'])) > 0
+        """Check if composer.json or composer.lock exists"""
+        return len(self.find_files(path, ['composer.json', 'composer.lock'])) > 0
+    
+    def get_work_units(self, path: Path) -> List[Tuple[str, Path]]:
+        """
+        Add vendor/composer/installed.json for projects without a composer.lock
+        
+        ``vendor`` is never walked, so the file is looked up directly next to
+        each composer.json. Like a lock file it lists the exact installed
+        versions, which replace the composer.json ranges in finalize.
+        """
+        units = super().get_work_units(path)
+        locked_dirs = {file_path.parent for parser_name, file_path in units
+                       if parser_name == '_parse_composer_lock'}
+        
+        result = []
+        for parser_name, file_path in units:
+            result.append((parser_name, file_path))
+            installed = file_path.parent / 'vendor' / 'composer' / 'installed.json'
+            if (parser_name == '_parse_composer_json' and
+                    file_path.parent not in locked_dirs and installed.is_file()):
+                result.append(('_parse_installed_json', installed))
+        return result
+    
+    def finalize(self, dependencies: Set[Dependency], path: Path) -> Set[Dependency]:
+        """
+        Let composer.lock / installed.json versions replace composer.json ranges
+        
+        A composer.json requirement that is locked for the same directory is
+        dropped, and the locked package inherits its direct/dev type.
+        """
+        locked = {}
+        for dep in dependencies:
+            project_dir = self._locked_project_dir(dep.source_file)
+            if project_dir is not None:
+                locked[(project_dir, dep.name.lower())] = dep
+        if not locked:
+            return dependencies
+        
+        result = set(dependencies)
+        for dep in dependencies:
+            if not dep.source_file or os.path.basename(dep.source_file) != 'composer.json':
+                continue
+            pinned = locked.get((os.path.dirname(dep.source_file), dep.name.lower()))
+            if pinned is None:
+                continue
+            result.discard(dep)
+            if pinned.dependency_type == DependencyType.TRANSITIVE:
+                result.discard(pinned)
+                result.add(dataclasses.replace(pinned, dependency_type=dep.dependency_type))
+        return result
+    
+    def _locked_project_dir(self, source_file: Optional[str]) -> Optional[str]:
+        """Directory of the composer.json a composer.lock / installed.json belongs to"""
+        if not source_file:
+            return None
+        name = os.path.basename(source_file)
+        if name == 'composer.lock':
+            return os.path.dirname(source_file)
+        if name == 'installed.json':
+            # <project>/vendor/composer/installed.json
+            return os.path.dirname(os.path.dirname(os.path.dirname(source_file)))
+        return None
     
-    def parse(self, path: Path) -> Set[Dependency]:
-        """Parse Composer dependencies from composer.json"""
+    def _parse_composer_json(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """Parse composer.json file"""
         dependencies = set()
         
-        composer_files = self.find_files(path, ['composer.json'])
-        
-        for composer_file in composer_files:
-            try:
-                with open(composer_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Parse regular dependencies
-                if 'require' in data:
-                    for name, version in data['require'].items():
-                        # Skip PHP itself
-                        if name == 'php' or name.startswith('ext-'):
-                            continue
-                        
-                        dep = Dependency(
-                            name=name,
-                            version=self._clean_version(version),
-                            ecosystem=Ecosystem.COMPOSER,
-                            purl=f"pkg:composer/{name}@{self._clean_version(version)}",
-                            dependency_type=DependencyType.DIRECT,
-                            source_file=str(composer_file.relative_to(path)),
-                            confidence=1.0
-                        )
-                        dependencies.add(dep)
-                
-                # Parse dev dependencies
-                if 'require-dev' in data:
-                    for name, version in data['require-dev'].items():
-                        if name == 'php' or name.startswith('ext-'):
-                            continue
-                        
-                        dep = Dependency(
-                            name=name,
-                            version=self._clean_version(version),
-                            ecosystem=Ecosystem.COMPOSER,
-                            purl=f"pkg:composer/{name}@{self._clean_version(version)}",
-                            dependency_type=DependencyType.DEV,
-                            source_file=str(composer_file.relative_to(path)),
-                            confidence=1.0
-                        )
-                        dependencies.add(dep)
+        try:
+            data = load_json(file_path)
             
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Could not parse {composer_file}: {e}")
-                continue
+            # Parse regular dependencies
+            if 'require' in data:
+                for name, version in data['require'].items():
+                    # Skip PHP itself
+                    if name == 'php' or name.startswith('ext-'):
+                        continue
+                    
+                    dep = Dependency(
+                        name=name,
+                        version=self._clean_version(version),
+                        ecosystem=Ecosystem.COMPOSER,
+                        purl=f"pkg:composer/{name}@{self._clean_version(version)}",
+                        dependency_type=DependencyType.DIRECT,
+                        source_file=str(file_path.relative_to(base_path)),
+                        confidence=1.0
+                    )
+                    dependencies.add(dep)
+            
+            # Parse dev dependencies
+            if 'require-dev' in data:
+                for name, version in data['require-dev'].items():
+                    if name == 'php' or name.startswith('ext-'):
+                        continue
+                    
+                    dep = Dependency(
+                        name=name,
+                        version=self._clean_version(version),
+                        ecosystem=Ecosystem.COMPOSER,
+                        purl=f"pkg:composer/{name}@{self._clean_version(version)}",
+                        dependency_type=DependencyType.DEV,
+                        source_file=str(file_path.relative_to(base_path)),
+                        confidence=1.0
+                    )
+                    dependencies.add(dep)
+        
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
         
         return dependencies
     
+    def _parse_composer_lock(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """
+        Parse composer.lock with exact versions and dependency edges
+        
+        The file is streamed one package entry at a time, so lock files of
+        tens of megabytes (mostly dist/source/autoload metadata) never have
+        to be held in memory as a whole.
+        """
+        dependencies = set()
+        
+        try:
+            records = []
+            with open(file_path, 'r', encoding='utf-8') as f:
+                reader = JsonStreamReader(f)
+                for key in reader.iter_keys():
+                    if key in ('packages', 'packages-dev') and reader.peek() == '[':
+                        for _ in reader.iter_array():
+                            records.append((self._slim_entry(reader.read_value()), key == 'packages-dev'))
+                    else:
+                        reader.skip_value()
+            
+            dependencies = self._locked_dependencies(records, str(file_path.relative_to(base_path)))
+        
+        except (ValueError, IOError) as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
+        
+        return dependencies
+    
+    def _parse_installed_json(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """Parse vendor/composer/installed.json (Composer 1 list or Composer 2 object)"""
+        dependencies = set()
+        
+        try:
+            entries = []
+            dev_names = set()
+            with open(file_path, 'r', encoding='utf-8') as f:
+                reader = JsonStreamReader(f)
+                if reader.peek() == '[':
+                    for _ in reader.iter_array():
+                        entries.append(self._slim_entry(reader.read_value()))
+                else:
+                    for key in reader.iter_keys():
+                        if key == 'packages' and reader.peek() == '[':
+                            for _ in reader.iter_array():
+                                entries.append(self._slim_entry(reader.read_value()))
+                        elif key == 'dev-package-names':
+                            dev_names = set(reader.read_value() or [])
+                        else:
+                            reader.skip_value()
+            
+            records = [(entry, isinstance(entry, dict) and entry.get('name') in dev_names)
+                       for entry in entries]
+            dependencies = self._locked_dependencies(records, str(file_path.relative_to(base_path)))
+        
+        except (ValueError, IOError) as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
+        
+        return dependencies
+    
+    def _slim_entry(self, entry):
+        """Keep only the fields used from a package entry (drops dist/autoload/... metadata)"""
+        if not isinstance(entry, dict):
+            return None
+        return {key: entry.get(key) for key in ('name', 'version', 'require', 'description')}
+    
+    def _locked_dependencies(self, records: list, source_file: str) -> Set[Dependency]:
+        """
+        Build Dependencies from (package entry, is_dev) records
+        
+        Lock files do not say which packages the root requires: packages are
+        reported as transitive (dev packages as dev), and finalize marks the
+        ones composer.json requires as direct.
+        """
+        packages = {}
+        for entry, is_dev in records:
+            if isinstance(entry, dict) and entry.get('name') and entry.get('version'):
+                version = entry['version']
+                if version[:1] == 'v' and version[1:2].isdigit():
+                    version = version[1:]
+                packages[entry['name'].lower()] = (entry, is_dev, version)
+        
+        dependencies = set()
+        for entry, is_dev, version in packages.values():
+            name = entry['name']
+            dep_type = DependencyType.DEV if is_dev else DependencyType.TRANSITIVE
+            depends_on = tuple(sorted(
+                f"pkg:composer/{packages[req][0]['name']}@{packages[req][2]}"
+                for req in {required.lower() for required in entry.get('require') or {}}
+                if req in packages
+            ))
+            dep = Dependency(
+                name=name,
+                version=version,
+                ecosystem=Ecosystem.COMPOSER,
+                purl=f"pkg:composer/{name}@{version}",
+                dependency_type=dep_type,
+                source_file=source_file,
+                description=entry.get('description'),
+                confidence=1.0,  # Lock file has highest confidence
+                depends_on=depends_on
+            )
+            dependencies.add(dep)
+        return dependencies
+    
     def _clean_version(self, version: str) -> str:
         """Remove version prefixes like ^, ~, >=, etc."""
         version = version.strip()
@@ -6,11 +6,19 @@ from pathlib import Path
 from typing import Set
 from .base import BaseDetector
 from ..models import Dependency, Ecosystem, DependencyType
+from ..parsers import load_json
 
 
 class ConanDetector(BaseDetector):
     """Detector for Conan C/C++ projects"""
     
+    # Manifest pattern -> parser method, in parse order
+    manifest_parsers = {
+        'conanfile.txt': '_parse_conanfile_txt',
+        'conanfile.py': '_parse_conanfile_py',
+        'conan.lock': '_parse_conan_lock',
+    }
+    
     def get_manifest_files(self) -> list[str]:
         return ['conanfile.txt', 'conanfile.py', 'conan.lock']
     
@@ -18,27 +26,6 @@ class ConanDetector(BaseDetector):
         """Check if Conan manifest files exist"""
         return len(self.find_files(path, self.get_manifest_files())) > 0
     
-    def parse(self, path: Path) -> Set[Dependency]:
-        """Parse Conan dependencies"""
-        dependencies = set()
-        
-        # Parse conanfile.txt files
-        conanfile_txt = self.find_files(path, ['conanfile.txt'])
-        for conan_file in conanfile_txt:
-            dependencies.update(self._parse_conanfile_txt(conan_file, path))
-        
-        # Parse conanfile.py files
-        conanfile_py = self.find_files(path, ['conanfile.py'])
-        for conan_file in conanfile_py:
-            dependencies.update(self._parse_conanfile_py(conan_file, path))
-        
-        # Parse conan.lock files
-        conan_lock = self.find_files(path, ['conan.lock'])
-        for lock_file in conan_lock:
-            dependencies.update(self._parse_conan_lock(lock_file, path))
-        
-        return dependencies
-    
     def _parse_conanfile_txt(self, file_path: Path, base_path: Path) -> Set[Dependency]:
         """Parse conanfile.txt file"""
         dependencies = set()
@@ -141,9 +128,7 @@ class ConanDetector(BaseDetector):
         dependencies = set()
         
         try:
-            import json
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_json(file_path)
             
             # Parse graph_lock.nodes
             if 'graph_lock' in data and 'nodes' in data['graph_lock']:
@@ -1,85 +1,231 @@
 """
 Go dependency detector
 """
-import re
 from pathlib import Path
-from typing import Set
+from typing import Iterator, List, Optional, Set, Tuple
 from .base import BaseDetector
 from ..models import Dependency, Ecosystem, DependencyType
 
 
+def _iter_directives(file_path: Path) -> Iterator[Tuple[str, List[str], str]]:
+    """
+    Tokenize a go.mod / go.work file in a single pass
+    
+    Yields:
+        (verb, arguments, comment) for every directive; entries of a
+        ``verb ( ... )`` block are yielded with the block's verb
+    """
+    block = None
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            code, _, comment = line.partition('//')
+            tokens = [token.strip('"') for token in code.split()]
+            if not tokens:
+                continue
+            if block is not None:
+                if tokens[0] == ')':
+                    block = None
+                else:
+                    yield block, tokens, comment.strip()
+            elif tokens[1:] == ['(']:
+                block = tokens[0]
+            else:
+                yield tokens[0], tokens[1:], comment.strip()
+
+
+def _is_local_path(path: str) -> bool:
+    """Check whether a replacement target is a directory rather than a module"""
+    return path.startswith(('./', '../', '/')) or path in ('.', '..')
+
+
+def _version_key(version: str) -> tuple:
+    """Sort key for Go module versions (semver, pseudo-versions, +incompatible)"""
+    version = version.lstrip('v').split('+', 1)[0]
+    release, _, prerelease = version.partition('-')
+    numbers = tuple(int(part) if part.isdigit() else 0 for part in release.split('.'))
+    # A release sorts after any of its pre-releases / pseudo-versions
+    return numbers, prerelease == '', prerelease
+
+
 class GoDetector(BaseDetector):
     """Detector for Go projects"""
     
+    # Manifest pattern -> parser method, in parse order
+    manifest_parsers = {
+        'go.mod': '_parse_go_mod',
+        'go.sum': '_parse_go_sum',
+    }
+    
+    # Parse logic version (2: `// indirect` requirements are transitive)
+    detector_version = '2'
+    
     def get_manifest_files(self) -> list[str]:
-        return ['go.mod', 'go.sum']
+        return ['go.mod', 'go.sum', 'go.work']
     
     def detect(self, path: Path) -> bool:
-        """Check if go.mod exists"""
-        return len(self.find_files(path, ['go.mod'])) > 0
+        """Check if go.mod or go.work exists"""
+        return len(self.find_files(path, ['go.mod', 'go.work'])) > 0
     
-    def parse(self, path: Path) -> Set[Dependency]:
-        """Parse Go dependencies from go.mod"""
+    def get_work_units(self, path: Path) -> List[Tuple[str, Path]]:
+        """
+        Add vendor/modules.txt next to each go.mod
+        
+        ``vendor`` is never walked, so the file is looked up directly. When a
+        module is vendored its modules.txt is the exact build list and
+        supersedes go.sum.
+        """
+        units = []
+        vendored_dirs = set()
+        for parser_name, file_path in super().get_work_units(path):
+            if parser_name == '_parse_go_mod':
+                units.append((parser_name, file_path))
+                modules_txt = file_path.parent / 'vendor' / 'modules.txt'
+                if modules_txt.is_file():
+                    units.append(('_parse_vendor_modules', modules_txt))
+                    vendored_dirs.add(file_path.parent)
+            elif not (self.prefer_lockfiles and file_path.parent in vendored_dirs):
+                units.append((parser_name, file_path))
+        return units
+    
+    def finalize(self, dependencies: Set[Dependency], path: Path) -> Set[Dependency]:
+        """Drop modules that belong to a go.work workspace; they are project code"""
+        workspace_modules = set()
+        for work_file in self.find_files(path, ['go.work']):
+            try:
+                for verb, args, _ in _iter_directives(work_file):
+                    if verb == 'use' and args:
+                        module = self._read_module_path(work_file.parent / args[0] / 'go.mod')
+                        if module:
+                            workspace_modules.add(module)
+            except IOError as e:
+                print(f"Warning: Could not parse {work_file}: {e}")
+        
+        if not workspace_modules:
+            return dependencies
+        return {dep for dep in dependencies if dep.name not in workspace_modules}
+    
+    def _parse_go_mod(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """Parse go.mod file"""
         dependencies = set()
         
-        go_mod_files = self.find_files(path, ['go.mod'])
+        try:
+            requires = []
+            replacements = {}
+            for verb, args, comment in _iter_directives(file_path):
+                if verb == 'require' and len(args) >= 2:
+                    indirect = comment.split(';', 1)[0].strip() == 'indirect'
+                    requires.append((args[0], args[1], indirect))
+                elif verb == 'replace' and '=>' in args:
+                    arrow = args.index('=>')
+                    old, new = args[:arrow], args[arrow + 1:]
+                    if old and new and not _is_local_path(new[0]) and len(new) >= 2:
+                        replacements[tuple(old)] = (new[0], new[1])
+            
+            source_file = str(file_path.relative_to(base_path))
+            
+            for name, version, indirect in requires:
+                # A replace directive may pin one version or every version
+                name, version = replacements.get(
+                    (name, version), replacements.get((name,), (name, version))
+                )
+                dep = self._module_dependency(
+                    name, version,
+                    DependencyType.TRANSITIVE if indirect else DependencyType.DIRECT,
+                    source_file
+                )
+                dependencies.add(dep)
         
-        for go_mod_file in go_mod_files:
-            try:
-                with open(go_mod_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Parse require statements
-                # Pattern for single-line require
-                pattern1 = r'require\s+([^\s]+)\s+v?([^\s]+)'
-                matches = re.findall(pattern1, content)
-                
-                for name, version in matches:
-                    if name == '(' or name == ')':
+        except IOError as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
+        
+        return dependencies
+    
+    def _parse_go_sum(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """
+        Parse go.sum
+        
+        Only lines hashing a module's content (not just its go.mod) are
+        used, and the highest such version of each module is taken as the
+        selected one, since stale lines can outlive a downgrade.
+        """
+        dependencies = set()
+        
+        try:
+            selected = {}
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) != 3 or parts[1].endswith('/go.mod'):
                         continue
-                    
-                    version = version.strip()
-                    if version.endswith(')'):
-                        version = version[:-1].strip()
-                    
-                    dep = Dependency(
-                        name=name,
-                        version=version,
-                        ecosystem=Ecosystem.GO,
-                        purl=f"pkg:golang/{name}@{version}",
-                        dependency_type=DependencyType.DIRECT,
-                        source_file=str(go_mod_file.relative_to(path)),
-                        confidence=1.0
-                    )
-                    dependencies.add(dep)
-                
-                # Parse multi-line require blocks
-                require_blocks = re.findall(r'require\s*\((.*?)\)', content, re.DOTALL)
-                for block in require_blocks:
-                    lines = block.split('\n')
-                    for line in lines:
-                        line = line.strip()
-                        if not line or line.startswith('//'):
-                            continue
-                        
-                        match = re.match(r'([^\s]+)\s+v?([^\s]+)', line)
-                        if match:
-                            name, version = match.groups()
-                            
-                            dep = Dependency(
-                                name=name,
-                                version=version,
-                                ecosystem=Ecosystem.GO,
-                                purl=f"pkg:golang/{name}@{version}",
-                                dependency_type=DependencyType.DIRECT,
-                                source_file=str(go_mod_file.relative_to(path)),
-                                confidence=1.0
-                            )
-                            dependencies.add(dep)
+                    name, version = parts[0], parts[1]
+                    current = selected.get(name)
+                    if current is None or _version_key(version) > _version_key(current):
+                        selected[name] = version
             
-            except IOError as e:
-                print(f"Warning: Could not parse {go_mod_file}: {e}")
-                continue
+            source_file = str(file_path.relative_to(base_path))
+            
+            for name, version in selected.items():
+                dep = self._module_dependency(name, version, DependencyType.TRANSITIVE,
+                                              source_file, confidence=0.9)
+                dependencies.add(dep)
+        
+        except IOError as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
         
         return dependencies
-
+    
+    def _parse_vendor_modules(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """Parse vendor/modules.txt, the exact list of vendored module versions"""
+        dependencies = set()
+        
+        try:
+            source_file = str(file_path.relative_to(base_path))
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    # "# path version [=> replacement [version]]"; "##" lines are annotations
+                    if not line.startswith('# '):
+                        continue
+                    parts = line[2:].split()
+                    if '=>' in parts:
+                        arrow = parts.index('=>')
+                        new = parts[arrow + 1:]
+                        if not new or _is_local_path(new[0]) or len(new) < 2:
+                            continue
+                        name, version = new[0], new[1]
+                    elif len(parts) >= 2:
+                        name, version = parts[0], parts[1]
+                    else:
+                        continue
+                    dependencies.add(self._module_dependency(
+                        name, version, DependencyType.TRANSITIVE, source_file
+                    ))
+        
+        except IOError as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
+        
+        return dependencies
+    
+    def _read_module_path(self, go_mod: Path) -> Optional[str]:
+        """Return the ``module`` path declared by a go.mod file"""
+        try:
+            for verb, args, _ in _iter_directives(go_mod):
+                if verb == 'module' and args:
+                    return args[0]
+        except IOError:
+            pass
+        return None
+    
+    def _module_dependency(self, name: str, version: str, dep_type: DependencyType,
+                           source_file: str, confidence: float = 1.0) -> Dependency:
+        """Build the Dependency for a module requirement"""
+        if version.startswith('v'):
+            version = version[1:]
+        return Dependency(
+            name=name,
+            version=version,
+            ecosystem=Ecosystem.GO,
+            purl=f"pkg:golang/{name}@{version}",
+            dependency_type=dep_type,
+            source_file=source_file,
+            confidence=confidence
+        )
@@ -1,80 +1,304 @@
 """
 Gradle dependency detector
 """
+import dataclasses
+import os
 import re
 from pathlib import Path
-from typing import Set
+from typing import Dict, List, Optional, Set, Tuple
 from .base import BaseDetector
 from ..models import Dependency, Ecosystem, DependencyType
+from ..parsers import load_toml
+
+
+# Default version catalog, relative to the root of a build
+VERSION_CATALOG = Path('gradle') / 'libs.versions.toml'
+
+# Dependency configurations recognised in build scripts
+_CONFIGURATION = (r'(implementation|api|compile|testImplementation|testCompile|runtimeOnly|compileOnly|'
+                  r'testRuntimeOnly|testCompileOnly|androidTestImplementation)')
+
+# implementation 'group:artifact:version' / implementation("group:artifact:version")
+_STRING_NOTATION = re.compile(_CONFIGURATION + r'\s*\(?\s*["\']([^:"\']+):([^:"\']+):([^"\']+)["\']')
+
+# implementation group: 'group', name: 'artifact', version: 'version'
+_MAP_NOTATION = re.compile(
+    _CONFIGURATION + r'\s*\(?\s*group\s*:\s*["\']([^"\']+)["\']\s*,\s*name\s*:\s*["\']([^"\']+)["\']'
+    r'\s*,\s*version\s*:\s*["\']([^"\']+)["\']'
+)
+
+# implementation libs.some.alias / implementation(platform(libs.some.bom))
+_CATALOG_NOTATION = re.compile(
+    _CONFIGURATION + r'\s*\(?\s*(?:(?:enforced)?[pP]latform\s*\(\s*)?libs\.([\w.]+)'
+)
+
+
+def _accessor(alias: str) -> str:
+    """Catalog alias as written after ``libs.`` in build scripts ("foo-bar" -> "foo.bar")"""
+    return re.sub(r'[-_.]+', '.', alias).lower()
+
+
+def _is_test_configuration(configuration: str) -> bool:
+    """Check whether a configuration only feeds tests"""
+    return configuration.startswith(('test', 'androidTest'))
+
+
+class _VersionCatalog:
+    """Libraries and bundles of a libs.versions.toml, keyed by accessor"""
+    
+    def __init__(self, data: dict):
+        versions = {key: self._version(value) for key, value in (data.get('versions') or {}).items()}
+        
+        # accessor -> (group, artifact, version or None)
+        self.libraries: Dict[str, Tuple[str, str, Optional[str]]] = {}
+        for alias, spec in (data.get('libraries') or {}).items():
+            library = self._library(spec, versions)
+            if library is not None:
+                self.libraries[_accessor(alias)] = library
+        
+        self.bundles: Dict[str, List[str]] = {
+            _accessor(alias): [_accessor(member) for member in members]
+            for alias, members in (data.get('bundles') or {}).items()
+            if isinstance(members, list)
+        }
+    
+    def resolve(self, accessor: str) -> List[Tuple[str, str, Optional[str]]]:
+        """Return the libraries an accessor (``foo.bar`` or ``bundles.foo``) stands for"""
+        accessor = _accessor(accessor)
+        if accessor.endswith('.get'):
+            accessor = accessor[:-len('.get')]
+        if accessor.startswith('bundles.'):
+            members = self.bundles.get(accessor[len('bundles.'):], [])
+            return [self.libraries[member] for member in members if member in self.libraries]
+        library = self.libraries.get(accessor)
+        return [library] if library else []
+    
+    def _version(self, value) -> Optional[str]:
+        """Plain or rich version (strictly / require / prefer)"""
+        if isinstance(value, str):
+            return value
+        if isinstance(value, dict):
+            return value.get('strictly') or value.get('require') or value.get('prefer')
+        return None
+    
+    def _library(self, spec, versions: Dict[str, Optional[str]]) -> Optional[Tuple[str, str, Optional[str]]]:
+        """Library declared as "group:artifact[:version]" or as a table"""
+        if isinstance(spec, str):
+            parts = spec.split(':')
+            if len(parts) < 2:
+                return None
+            return parts[0], parts[1], parts[2] if len(parts) > 2 else None
+        if not isinstance(spec, dict):
+            return None
+        
+        if 'module' in spec:
+            group, _, artifact = str(spec['module']).partition(':')
+        else:
+            group, artifact = spec.get('group'), spec.get('name')
+        if not group or not artifact:
+            return None
+        
+        version = spec.get('version')
+        if isinstance(version, dict) and 'ref' in version:
+            version = versions.get(version['ref'])
+        else:
+            version = self._version(version)
+        return group, artifact, version
 
 
 class GradleDetector(BaseDetector):
     """Detector for Gradle projects"""
     
+    # Manifest pattern -> parser method, in parse order
+    manifest_parsers = {
+        'build.gradle': '_parse_build_gradle',
+        'build.gradle.kts': '_parse_build_gradle',
+        'gradle.lockfile': '_parse_lockfile',
+    }
+    
+    # Parse logic version (2: version catalog aliases, per-configuration test scope)
+    detector_version = '2'
+    
+    def __init__(self):
+        # directory -> nearest version catalog at or above it
+        self._catalog_lookup: Dict[Path, Optional[Path]] = {}
+        # catalog -> ((mtime_ns, size), parsed catalog), shared by all subprojects of a build
+        self._catalogs: Dict[Path, Tuple[Tuple[int, int], Optional[_VersionCatalog]]] = {}
+    
     def get_manifest_files(self) -> list[str]:
-        return ['build.gradle', 'build.gradle.kts']
+        return ['build.gradle', 'build.gradle.kts', 'gradle.lockfile']
     
     def detect(self, path: Path) -> bool:
         """Check if build.gradle or build.gradle.kts exists"""
-        return len(self.find_files(path, self.get_manifest_files())) > 0
+        return len(self.find_files(path, ['build.gradle', 'build.gradle.kts'])) > 0
     
-    def parse(self, path: Path) -> Set[Dependency]:
-        """Parse Gradle dependencies"""
-        dependencies = set()
+    def get_work_units(self, path: Path) -> List[Tuple[str, Path]]:
+        """Forget the catalog lookups of the previous scan"""
+        self._catalog_lookup.clear()
+        return super().get_work_units(path)
+    
+    def get_unit_inputs(self, parser_name: str, file_path: Path, base_path: Path) -> List[Path]:
+        """Build scripts depend on the version catalog of their build"""
+        if parser_name != '_parse_build_gradle':
+            return []
+        catalog_path = self._find_catalog(file_path.parent, base_path)
+        return [catalog_path] if catalog_path is not None else []
+    
+    def finalize(self, dependencies: Set[Dependency], path: Path) -> Set[Dependency]:
+        """
+        Let gradle.lockfile pins replace build script declarations
         
-        gradle_files = self.find_files(path, self.get_manifest_files())
+        A declared dependency that is locked in the same directory is
+        dropped, and the locked module inherits its direct/dev type.
+        """
+        locked = {}
+        for dep in dependencies:
+            if dep.source_file and os.path.basename(dep.source_file) == 'gradle.lockfile':
+                locked[(os.path.dirname(dep.source_file), dep.name)] = dep
+        if not locked:
+            return dependencies
         
-        for gradle_file in gradle_files:
-            try:
-                with open(gradle_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
+        result = set(dependencies)
+        for dep in dependencies:
+            if not dep.source_file or os.path.basename(dep.source_file) not in ('build.gradle', 'build.gradle.kts'):
+                continue
+            pinned = locked.get((os.path.dirname(dep.source_file), dep.name))
+            if pinned is None:
+                continue
+            result.discard(dep)
+            if pinned.dependency_type == DependencyType.TRANSITIVE:
+                result.discard(pinned)
+                result.add(dataclasses.replace(pinned, dependency_type=dep.dependency_type))
+        return result
+    
+    def _parse_build_gradle(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """
+        Parse build.gradle / build.gradle.kts file
+        
+        ``libs.*`` references are resolved against the build's
+        gradle/libs.versions.toml, which is parsed once and shared by every
+        subproject.
+        """
+        dependencies = set()
+        
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            source_file = str(file_path.relative_to(base_path))
+            
+            declared = []
+            for pattern in (_STRING_NOTATION, _MAP_NOTATION):
+                for configuration, group_id, artifact_id, version in pattern.findall(content):
+                    declared.append((configuration, group_id, artifact_id, version))
+            
+            if 'libs.' in content:
+                catalog = self._load_catalog(self._find_catalog(file_path.parent, base_path))
+                if catalog is not None:
+                    for configuration, accessor in _CATALOG_NOTATION.findall(content):
+                        for group_id, artifact_id, version in catalog.resolve(accessor):
+                            declared.append((configuration, group_id, artifact_id, version or "*"))
+            
+            for configuration, group_id, artifact_id, version in declared:
+                name = f"{group_id}:{artifact_id}"
                 
-                # Pattern for dependencies like: implementation 'group:artifact:version'
-                pattern1 = r'(?:implementation|api|compile|testImplementation|testCompile|runtimeOnly|compileOnly)\s+["\']([^:]+):([^:]+):([^"\']+)["\']'
-                matches = re.findall(pattern1, content)
+                # Determine dependency type based on configuration
+                dep_type = DependencyType.DEV if _is_test_configuration(configuration) else DependencyType.DIRECT
                 
-                for match in matches:
-                    group_id, artifact_id, version = match
-                    name = f"{group_id}:{artifact_id}"
+                dep = Dependency(
+                    name=name,
+                    version=version,
+                    ecosystem=Ecosystem.GRADLE,
+                    purl=f"pkg:maven/{group_id}/{artifact_id}@{version}" if version != "*" else f"pkg:maven/{group_id}/{artifact_id}",
+                    dependency_type=dep_type,
+                    source_file=source_file,
+                    confidence=0.95
+                )
+                dependencies.add(dep)
+        
+        except IOError as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
+        
+        return dependencies
+    
+    def _parse_lockfile(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """
+        Parse gradle.lockfile ("group:artifact:version=configurations")
+        
+        The lock file covers the whole resolved graph without marking direct
+        dependencies; modules locked only for test configurations are
+        reported as dev dependencies, the rest as transitive.
+        """
+        dependencies = set()
+        
+        try:
+            source_file = str(file_path.relative_to(base_path))
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    coordinates, _, configurations = line.partition('=')
+                    parts = coordinates.split(':')
+                    if len(parts) != 3:
+                        continue  # "empty=..." lists configurations without dependencies
                     
-                    # Determine dependency type based on configuration
-                    dep_type = DependencyType.DIRECT
-                    if 'test' in content.lower():
+                    group_id, artifact_id, version = parts
+                    configurations = [c for c in configurations.split(',') if c]
+                    if configurations and all(_is_test_configuration(c) for c in configurations):
                         dep_type = DependencyType.DEV
+                    else:
+                        dep_type = DependencyType.TRANSITIVE
                     
-                    dep = Dependency(
-                        name=name,
+                    dependencies.add(Dependency(
+                        name=f"{group_id}:{artifact_id}",
                         version=version,
                         ecosystem=Ecosystem.GRADLE,
                         purl=f"pkg:maven/{group_id}/{artifact_id}@{version}",
                         dependency_type=dep_type,
-                        source_file=str(gradle_file.relative_to(path)),
-                        confidence=0.95
-                    )
-                    dependencies.add(dep)
-                
-                # Pattern for dependencies with group, name, version separately
-                pattern2 = r'(?:implementation|api|compile|testImplementation|testCompile|runtimeOnly|compileOnly)\s+group\s*:\s*["\']([^"\']+)["\']\s*,\s*name\s*:\s*["\']([^"\']+)["\']\s*,\s*version\s*:\s*["\']([^"\']+)["\']'
-                matches2 = re.findall(pattern2, content)
-                
-                for match in matches2:
-                    group_id, artifact_id, version = match
-                    name = f"{group_id}:{artifact_id}"
-                    
-                    dep = Dependency(
-                        name=name,
-                        version=version,
-                        ecosystem=Ecosystem.GRADLE,
-                        purl=f"pkg:maven/{group_id}/{artifact_id}@{version}",
-                        dependency_type=DependencyType.DIRECT,
-                        source_file=str(gradle_file.relative_to(path)),
-                        confidence=0.95
-                    )
-                    dependencies.add(dep)
-            
-            except IOError as e:
-                print(f"Warning: Could not parse {gradle_file}: {e}")
-                continue
+                        source_file=source_file,
+                        confidence=1.0  # Lock file has highest confidence
+                    ))
+        
+        except IOError as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
         
         return dependencies
-
+    
+    def _find_catalog(self, directory: Path, base_path: Path) -> Optional[Path]:
+        """
+        Return the nearest gradle/libs.versions.toml at or above ``directory``
+        
+        ``gradle`` is never walked, so the catalog is looked up directly;
+        lookups are memoized per directory for the whole scan.
+        """
+        if directory not in self._catalog_lookup:
+            candidate = directory / VERSION_CATALOG
+            if candidate.is_file():
+                found = candidate
+            elif directory == base_path or directory.parent == directory:
+                found = None
+            else:
+                found = self._find_catalog(directory.parent, base_path)
+            self._catalog_lookup[directory] = found
+        return self._catalog_lookup[directory]
+    
+    def _load_catalog(self, catalog_path: Optional[Path]) -> Optional[_VersionCatalog]:
+        """Parse a version catalog once and share it with every build script of the build"""
+        if catalog_path is None:
+            return None
+        try:
+            stat = os.stat(catalog_path)
+        except OSError:
+            return None
+        
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = self._catalogs.get(catalog_path)
+        if cached is None or cached[0] != stamp:
+            try:
+                catalog = _VersionCatalog(load_toml(catalog_path))
+            except (ValueError, IOError) as e:
+                print(f"Warning: Could not parse {catalog_path}: {e}")
+                catalog = None
+            cached = self._catalogs[catalog_path] = (stamp, catalog)
+        return cached[1]
@@ -1,16 +1,159 @@
 """
 Maven dependency detector
 """
+import os
+import re
 import xml.etree.ElementTree as ET
+from collections import ChainMap
 from pathlib import Path
-from typing import Set
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
 from .base import BaseDetector
 from ..models import Dependency, Ecosystem, DependencyType
+from ..xml_stream import iter_elements, local_name
+
+
+# ${name} references in POM values
+_PROPERTY_REFERENCE = re.compile(r'\$\{([^}]+)\}')
+
+# groupId:artifactId
+ArtifactKey = Tuple[str, str]
+
+
+def _child_texts(element: ET.Element) -> Dict[str, str]:
+    """Map the local names of an element's children to their stripped text"""
+    return {local_name(child.tag): (child.text or '').strip() for child in element}
+
+
+def _interpolate(value: str, properties) -> str:
+    """Expand ${...} references; unknown properties are left as-is"""
+    for _ in range(10):  # properties may refer to other properties
+        if '${' not in value:
+            break
+        expanded = _PROPERTY_REFERENCE.sub(lambda m: properties.get(m.group(1), m.group(0)), value)
+        if expanded == value:
+            break
+        value = expanded
+    return value
+
+
+class _Pom:
+    """The parts of a single pom.xml that take part in version resolution"""
+    
+    # Elements read from a POM; everything else (build, plugins, reporting, ...) is streamed past
+    paths = (
+        ('parent',), ('groupId',), ('artifactId',), ('version',), ('properties',),
+        ('dependencyManagement', 'dependencies', 'dependency'),
+        ('dependencies', 'dependency'),
+    )
+    
+    def __init__(self, file_path: Path):
+        own: Dict[str, str] = {}
+        self.parent: Optional[Dict[str, str]] = None
+        self.properties: Dict[str, str] = {}
+        # dependencyManagement entries and scope=import BOMs, in declaration order
+        self.managed: Dict[ArtifactKey, Dict[str, str]] = {}
+        self.imports: List[Dict[str, str]] = []
+        self.dependencies: List[Dict[str, str]] = []
+        
+        for path, element in iter_elements(file_path, self.paths):
+            if path == ('dependencies', 'dependency'):
+                entry = _child_texts(element)
+                if entry.get('groupId') and entry.get('artifactId'):
+                    self.dependencies.append(entry)
+            elif len(path) == 3:
+                entry = _child_texts(element)
+                if not (entry.get('groupId') and entry.get('artifactId')):
+                    continue
+                if entry.get('scope') == 'import' and entry.get('type') == 'pom':
+                    self.imports.append(entry)
+                else:
+                    self.managed.setdefault((entry['groupId'], entry['artifactId']), entry)
+            elif path == ('parent',):
+                self.parent = _child_texts(element)
+                # A self-closing <relativePath/> disables the filesystem lookup
+                self.parent.setdefault('relativePath', '../pom.xml')
+            elif path == ('properties',):
+                self.properties = _child_texts(element)
+            else:
+                own[path[0]] = (element.text or '').strip()
+        
+        parent = self.parent or {}
+        self.group_id = own.get('groupId') or parent.get('groupId', '')
+        self.artifact_id = own.get('artifactId', '')
+        self.version = own.get('version') or parent.get('version', '')
+
+
+class _EffectivePom:
+    """A POM combined with everything it inherits from its parents"""
+    
+    def __init__(self, pom: _Pom, parent: Optional['_EffectivePom'], inputs: FrozenSet[Path]):
+        self.pom = pom
+        self.inputs = inputs
+        
+        # Inherited values are looked up through the parent chain instead of
+        # being copied, so deep reactors stay linear in the number of POMs
+        parent_properties = parent.raw_properties if parent else {}
+        self.raw_properties = ChainMap(pom.properties, parent_properties)
+        self.imports = (parent.imports if parent else []) + pom.imports
+        
+        parent_version = (pom.parent or {}).get('version', '')
+        builtins = {
+            'project.groupId': pom.group_id,
+            'project.artifactId': pom.artifact_id,
+            'project.version': pom.version,
+            'project.parent.groupId': (pom.parent or {}).get('groupId', ''),
+            'project.parent.version': parent_version,
+            'parent.version': parent_version,
+            'pom.groupId': pom.group_id,
+            'pom.version': pom.version,
+            'version': pom.version,
+        }
+        self.properties = ChainMap(builtins, self.raw_properties)
+        
+        # Managed artifacts are keyed by their coordinates as interpolated in
+        # the declaring POM; versions are interpolated where they are used
+        managed = {}
+        for (group_id, artifact_id), entry in pom.managed.items():
+            managed[(_interpolate(group_id, self.properties),
+                     _interpolate(artifact_id, self.properties))] = entry
+        self.raw_managed = ChainMap(managed, parent.raw_managed if parent else {})
+        
+        # (groupId, artifactId) -> (version, scope) from imported BOMs, first import wins
+        self.imported: Dict[ArtifactKey, Tuple[str, str]] = {}
+    
+    def managed_version(self, key: ArtifactKey) -> Tuple[Optional[str], Optional[str]]:
+        """Return the managed (version, scope) for an artifact, interpolated in this POM"""
+        entry = self.raw_managed.get(key)
+        if entry is not None:
+            version = entry.get('version')
+            scope = entry.get('scope')
+            return (_interpolate(version, self.properties) if version else None,
+                    _interpolate(scope, self.properties) if scope else None)
+        return self.imported.get(key, (None, None))
 
 
 class MavenDetector(BaseDetector):
     """Detector for Maven projects"""
     
+    # Manifest pattern -> parser method, in parse order
+    manifest_parsers = {
+        'pom.xml': '_parse_pom',
+    }
+    
+    # Parse logic version (2: property interpolation and parent/BOM version inheritance)
+    detector_version = '2'
+    
+    # Local repository searched for parent POMs and BOMs missing from the scanned tree
+    maven_repository: Optional[Path] = Path.home() / '.m2' / 'repository'
+    
+    def __init__(self):
+        # pom.xml -> ((mtime_ns, size), parsed POM); each file is parsed once
+        self._poms: Dict[Path, Tuple[Tuple[int, int], Optional[_Pom]]] = {}
+        # Per-scan POM graph: effective models and the reactor's coordinates
+        self._effective: Dict[Path, Optional[_EffectivePom]] = {}
+        self._resolving: Set[Path] = set()
+        self._reactor: Optional[Dict[ArtifactKey, Path]] = None
+    
     def get_manifest_files(self) -> list[str]:
         return ['pom.xml']
     
@@ -18,69 +161,174 @@ class MavenDetector(BaseDetector):
         """Check if pom.xml exists"""
         return len(self.find_files(path, ['pom.xml'])) > 0
     
-    def parse(self, path: Path) -> Set[Dependency]:
-        """Parse Maven dependencies from pom.xml"""
+    def get_work_units(self, path: Path) -> List[Tuple[str, Path]]:
+        """Start a new POM graph; the effective models of a scan are shared by all its units"""
+        self._effective.clear()
+        self._reactor = None
+        return super().get_work_units(path)
+    
+    def get_unit_inputs(self, parser_name: str, file_path: Path, base_path: Path) -> List[Path]:
+        """A POM depends on its parent chain and imported BOMs"""
+        effective = self._effective_pom(file_path, base_path)
+        if effective is None:
+            return []
+        return sorted(effective.inputs - {file_path})
+    
+    def _parse_pom(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """
+        Parse pom.xml file
+        
+        Versions and scopes are taken from the POM's effective model:
+        ``${...}`` properties are interpolated, and missing versions come from
+        ``dependencyManagement`` of the POM, its parents and imported BOMs.
+        """
         dependencies = set()
         
-        pom_files = self.find_files(path, ['pom.xml'])
+        effective = self._effective_pom(file_path, base_path)
+        if effective is None:
+            return dependencies
         
-        for pom_file in pom_files:
-            try:
-                tree = ET.parse(pom_file)
-                root = tree.getroot()
-                
-                # Handle XML namespace
-                namespace = {'maven': 'http://maven.apache.org/POM/4.0.0'}
-                if root.tag.startswith('{'):
-                    ns = root.tag.split('}')[0] + '}'
-                    namespace = {'maven': ns.strip('{}')}
-                
-                # Parse dependencies
-                deps_element = root.find('.//maven:dependencies', namespace)
-                if deps_element is None:
-                    # Try without namespace
-                    deps_element = root.find('.//dependencies')
-                
-                if deps_element is not None:
-                    for dep in deps_element.findall('.//maven:dependency', namespace):
-                        if dep is None:
-                            dep = deps_element.findall('.//dependency')
-                            if not dep:
-                                continue
-                            dep = dep[0]
-                        
-                        group_id = self._get_element_text(dep, 'groupId', namespace)
-                        artifact_id = self._get_element_text(dep, 'artifactId', namespace)
-                        version = self._get_element_text(dep, 'version', namespace)
-                        scope = self._get_element_text(dep, 'scope', namespace)
-                        
-                        if group_id and artifact_id:
-                            name = f"{group_id}:{artifact_id}"
-                            version = version if version else "*"
-                            
-                            dep_type = DependencyType.DEV if scope == 'test' else DependencyType.DIRECT
-                            
-                            dependency = Dependency(
-                                name=name,
-                                version=version,
-                                ecosystem=Ecosystem.MAVEN,
-                                purl=f"pkg:maven/{group_id}/{artifact_id}@{version}" if version != "*" else f"pkg:maven/{group_id}/{artifact_id}",
-                                dependency_type=dep_type,
-                                source_file=str(pom_file.relative_to(path)),
-                                confidence=1.0
-                            )
-                            dependencies.add(dependency)
+        source_file = str(file_path.relative_to(base_path))
+        
+        for entry in effective.pom.dependencies:
+            group_id = _interpolate(entry['groupId'], effective.properties)
+            artifact_id = _interpolate(entry['artifactId'], effective.properties)
+            managed_version, managed_scope = effective.managed_version((group_id, artifact_id))
             
-            except (ET.ParseError, IOError) as e:
-                print(f"Warning: Could not parse {pom_file}: {e}")
-                continue
+            version = entry.get('version')
+            version = _interpolate(version, effective.properties) if version else managed_version
+            scope = entry.get('scope')
+            scope = _interpolate(scope, effective.properties) if scope else managed_scope
+            
+            # Unresolvable versions are reported as unknown rather than as "${...}"
+            if not version or '${' in version:
+                version = "*"
+            
+            name = f"{group_id}:{artifact_id}"
+            dep_type = DependencyType.DEV if scope == 'test' else DependencyType.DIRECT
+            
+            dependency = Dependency(
+                name=name,
+                version=version,
+                ecosystem=Ecosystem.MAVEN,
+                purl=f"pkg:maven/{group_id}/{artifact_id}@{version}" if version != "*" else f"pkg:maven/{group_id}/{artifact_id}",
+                dependency_type=dep_type,
+                source_file=source_file,
+                confidence=1.0
+            )
+            dependencies.add(dependency)
         
         return dependencies
     
-    def _get_element_text(self, parent, tag_name, namespace):
-        """Get text from XML element, trying with and without namespace"""
-        element = parent.find(f"maven:{tag_name}", namespace)
-        if element is None:
-            element = parent.find(tag_name)
-        return element.text if element is not None else None
-
+    def _load_pom(self, file_path: Path) -> Optional[_Pom]:
+        """Parse a POM once; later lookups reuse it until the file changes"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = self._poms.get(file_path)
+        if cached is None or cached[0] != stamp:
+            try:
+                pom = _Pom(file_path)
+            except (ET.ParseError, IOError) as e:
+                print(f"Warning: Could not parse {file_path}: {e}")
+                pom = None
+            cached = self._poms[file_path] = (stamp, pom)
+        return cached[1]
+    
+    def _effective_pom(self, file_path: Path, base_path: Path) -> Optional[_EffectivePom]:
+        """Build (or reuse) the effective model of a POM, resolving its parents first"""
+        if file_path in self._effective:
+            return self._effective[file_path]
+        
+        pom = self._load_pom(file_path)
+        if pom is None or file_path in self._resolving:
+            return None
+        
+        self._resolving.add(file_path)
+        try:
+            parent = parent_path = None
+            if pom.parent is not None:
+                parent_path = self._find_parent(pom.parent, file_path, base_path)
+                if parent_path is not None:
+                    parent = self._effective_pom(parent_path, base_path)
+            
+            inputs = {file_path}
+            if parent is not None:
+                inputs |= parent.inputs
+            elif pom.parent is not None:
+                # A missing parent is keyed by where it is expected, so the
+                # result is neither cached nor reused until it can be read
+                inputs.add(parent_path or self._parent_lookup_path(pom.parent, file_path))
+            effective = _EffectivePom(pom, parent, frozenset(inputs))
+            
+            for entry in effective.imports:
+                key = (_interpolate(entry['groupId'], effective.properties),
+                       _interpolate(entry['artifactId'], effective.properties))
+                version = _interpolate(entry.get('version', ''), effective.properties)
+                bom_path = self._find_pom(key, version, base_path)
+                bom = self._effective_pom(bom_path, base_path) if bom_path else None
+                if bom is None:
+                    continue
+                inputs |= bom.inputs
+                for managed_key, managed in self._managed_versions(bom).items():
+                    effective.imported.setdefault(managed_key, managed)
+            effective.inputs = frozenset(inputs)
+        finally:
+            self._resolving.discard(file_path)
+        
+        self._effective[file_path] = effective
+        return effective
+    
+    def _managed_versions(self, effective: _EffectivePom) -> Dict[ArtifactKey, Tuple[str, str]]:
+        """All managed (version, scope) pairs of a BOM, interpolated in the BOM itself"""
+        managed = {key: effective.managed_version(key) for key in effective.raw_managed}
+        for key, value in effective.imported.items():
+            managed.setdefault(key, value)
+        return managed
+    
+    def _find_parent(self, parent: Dict[str, str], file_path: Path, base_path: Path) -> Optional[Path]:
+        """Locate a parent POM: relativePath first, then the reactor and local repository"""
+        key = (parent.get('groupId', ''), parent.get('artifactId', ''))
+        relative_path = parent.get('relativePath')
+        if relative_path:
+            candidate = Path(os.path.normpath(file_path.parent / relative_path))
+            if candidate.is_dir():
+                candidate = candidate / 'pom.xml'
+            candidate_pom = self._load_pom(candidate) if candidate.is_file() else None
+            if candidate_pom is not None and (candidate_pom.group_id, candidate_pom.artifact_id) == key:
+                return candidate
+        return self._find_pom(key, parent.get('version', ''), base_path)
+    
+    def _parent_lookup_path(self, parent: Dict[str, str], file_path: Path) -> Path:
+        """Where a parent POM that could not be found is expected: the local repository, else relativePath"""
+        key = (parent.get('groupId', ''), parent.get('artifactId', ''))
+        repository_path = self._repository_path(key, parent.get('version', ''))
+        if repository_path is not None:
+            return repository_path
+        candidate = Path(os.path.normpath(file_path.parent / (parent.get('relativePath') or '../pom.xml')))
+        return candidate / 'pom.xml' if candidate.is_dir() else candidate
+    
+    def _find_pom(self, key: ArtifactKey, version: str, base_path: Path) -> Optional[Path]:
+        """Locate a POM by coordinates in the scanned tree or the local repository"""
+        if self._reactor is None:
+            self._reactor = {}
+            for pom_path in self.find_files(base_path, ['pom.xml']):
+                pom = self._load_pom(pom_path)
+                if pom is not None:
+                    self._reactor.setdefault((pom.group_id, pom.artifact_id), pom_path)
+        if key in self._reactor:
+            return self._reactor[key]
+        
+        candidate = self._repository_path(key, version)
+        return candidate if candidate is not None and candidate.is_file() else None
+    
+    def _repository_path(self, key: ArtifactKey, version: str) -> Optional[Path]:
+        """Path of a POM in the local repository (None without a repository or concrete version)"""
+        group_id, artifact_id = key
+        if self.maven_repository is None or not version or '${' in version:
+            return None
+        return (self.maven_repository / group_id.replace('.', '/') / artifact_id /
+                version / f"{artifact_id}-{version}.pom")
@@ -1,51 +1,40 @@
 """
 Mbed OS (ARM Embedded) dependency detector
 """
-import json
 from pathlib import Path
 from typing import Set
 from .base import BaseDetector
 from ..models import Dependency, Ecosystem, DependencyType
+from ..parsers import load_json
 
 
 class MbedDetector(BaseDetector):
     """Detector for Mbed OS ARM embedded projects"""
     
+    # Manifest pattern -> parser method, in parse order
+    manifest_parsers = {
+        'mbed_lib.json': '_parse_mbed_lib_json',
+        'mbed_app.json': '_parse_mbed_app_json',
+        '*.lib': '_parse_mbed_lib_file',
+    }
+    
     def get_manifest_files(self) -> list[str]:
         return ['mbed_lib.json', 'mbed.lib', 'mbed_app.json']
     
+    def get_index_patterns(self) -> list[str]:
+        # parse() also follows every *.lib library reference file
+        return self.get_manifest_files() + ['*.lib']
+    
     def detect(self, path: Path) -> bool:
         """Check if Mbed manifest files exist"""
         return len(self.find_files(path, self.get_manifest_files())) > 0
     
-    def parse(self, path: Path) -> Set[Dependency]:
-        """Parse Mbed dependencies"""
-        dependencies = set()
-        
-        # Parse mbed_lib.json files
-        mbed_lib_json = self.find_files(path, ['mbed_lib.json'])
-        for lib_file in mbed_lib_json:
-            dependencies.update(self._parse_mbed_lib_json(lib_file, path))
-        
-        # Parse mbed_app.json files
-        mbed_app_json = self.find_files(path, ['mbed_app.json'])
-        for app_file in mbed_app_json:
-            dependencies.update(self._parse_mbed_app_json(app_file, path))
-        
-        # Parse .lib files (references to other libraries)
-        mbed_lib_files = self.find_files(path, ['*.lib'])
-        for lib_file in mbed_lib_files:
-            dependencies.update(self._parse_mbed_lib_file(lib_file, path))
-        
-        return dependencies
-    
     def _parse_mbed_lib_json(self, file_path: Path, base_path: Path) -> Set[Dependency]:
         """Parse mbed_lib.json file"""
         dependencies = set()
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_json(file_path)
             
             # Parse dependencies if present
             if 'dependencies' in data:
@@ -71,8 +60,7 @@ class MbedDetector(BaseDetector):
         dependencies = set()
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_json(file_path)
             
             # Parse requires if present
             if 'requires' in data:
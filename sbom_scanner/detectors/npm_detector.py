@@ -2,81 +2,458 @@
 NPM/Node.js dependency detector
 """
 import json
+import re
 from pathlib import Path
-from typing import Set
+from typing import List, Set
 from .base import BaseDetector
 from ..models import Dependency, Ecosystem, DependencyType
+from ..parsers import load_json
+from ..json_stream import JsonStreamReader
+
+
+# yarn.lock entry: unindented header line followed by its indented fields
+_YARN_ENTRY = re.compile(r'^([^ #\n][^\n]*):\n((?:  [^\n]*\n?)*)', re.MULTILINE)
+
+# Entry field: `  version "1.2.3"` (v1) or `  version: 1.2.3` (berry)
+_YARN_FIELD = re.compile(r'^  (version|resolution):? +"?([^"\n]*)', re.MULTILINE)
+
+# Berry workspace entry dependency list
+_YARN_DEPENDENCY_BLOCK = re.compile(r'^  dependencies:\n((?:    [^\n]*\n?)*)', re.MULTILINE)
+
+# Resolution protocols of local (workspace/linked) packages and patched copies
+_YARN_SKIPPED_PROTOCOLS = ('workspace:', 'link:', 'portal:', 'patch:')
+
+_PNPM_DEPENDENCY_SECTIONS = {
+    'dependencies': DependencyType.DIRECT,
+    'optionalDependencies': DependencyType.DIRECT,
+    'devDependencies': DependencyType.DEV,
+}
 
 
 class NpmDetector(BaseDetector):
     """Detector for NPM/Node.js projects"""
     
+    # Manifest pattern -> parser method, in parse order
+    manifest_parsers = {
+        'package.json': '_parse_package_json',
+        'package-lock.json': '_parse_package_lock',
+        'npm-shrinkwrap.json': '_parse_package_lock',
+        'yarn.lock': '_parse_yarn_lock',
+        'pnpm-lock.yaml': '_parse_pnpm_lock',
+    }
+    
+    # yarn.lock is not listed: v1 lock files do not say which packages are
+    # direct or dev dependencies, so package.json is still needed next to it
+    superseding_lockfiles = {
+        'package.json': ('package-lock.json', 'npm-shrinkwrap.json', 'pnpm-lock.yaml'),
+    }
+    
+    # Parse logic version (2: v1 package-lock.json takes direct/dev types from
+    # the package.json next to it, ``dev: true`` entries are dev dependencies)
+    detector_version = '2'
+    
     def get_manifest_files(self) -> list[str]:
-        return ['package.json', 'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml']
+        return ['package.json', 'package-lock.json', 'npm-shrinkwrap.json', 'yarn.lock', 'pnpm-lock.yaml']
     
     def detect(self, path: Path) -> bool:
-        """Check if package.json exists"""
-        return len(self.find_files(path, ['package.json'])) > 0
+        """Check if package.json or a lock file exists"""
+        return len(self.find_files(path, self.get_manifest_files())) > 0
+    
+    def get_unit_inputs(self, parser_name: str, file_path: Path, base_path: Path) -> List[Path]:
+        """v1 package-lock.json files take their direct dependencies from package.json"""
+        if parser_name != '_parse_package_lock':
+            return []
+        package_json = file_path.parent / 'package.json'
+        return [package_json] if package_json.is_file() else []
+    
+    def _parse_package_json(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """Parse package.json file"""
+        dependencies = set()
+        
+        try:
+            data = load_json(file_path)
+            
+            # Parse regular dependencies
+            if 'dependencies' in data:
+                for name, version in data['dependencies'].items():
+                    dep = Dependency(
+                        name=name,
+                        version=self._clean_version(version),
+                        ecosystem=Ecosystem.NPM,
+                        purl=f"pkg:npm/{name}@{self._clean_version(version)}",
+                        dependency_type=DependencyType.DIRECT,
+                        source_file=str(file_path.relative_to(base_path)),
+                        confidence=1.0
+                    )
+                    dependencies.add(dep)
+            
+            # Parse dev dependencies
+            if 'devDependencies' in data:
+                for name, version in data['devDependencies'].items():
+                    dep = Dependency(
+                        name=name,
+                        version=self._clean_version(version),
+                        ecosystem=Ecosystem.NPM,
+                        purl=f"pkg:npm/{name}@{self._clean_version(version)}",
+                        dependency_type=DependencyType.DEV,
+                        source_file=str(file_path.relative_to(base_path)),
+                        confidence=1.0
+                    )
+                    dependencies.add(dep)
+            
+            # Parse peer dependencies
+            if 'peerDependencies' in data:
+                for name, version in data['peerDependencies'].items():
+                    dep = Dependency(
+                        name=name,
+                        version=self._clean_version(version),
+                        ecosystem=Ecosystem.NPM,
+                        purl=f"pkg:npm/{name}@{self._clean_version(version)}",
+                        dependency_type=DependencyType.DIRECT,
+                        source_file=str(file_path.relative_to(base_path)),
+                        confidence=0.9  # Slightly lower confidence for peer deps
+                    )
+                    dependencies.add(dep)
+        
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
+        
+        return dependencies
+    
+    def _parse_package_lock(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """
+        Parse package-lock.json / npm-shrinkwrap.json with resolved versions
+        
+        The document is streamed: only one package entry is decoded at a time,
+        so multi-megabyte lock files are parsed with bounded memory. Lockfile
+        v2/v3 ``packages`` maps are preferred; v1 ``dependencies`` trees are
+        used when no ``packages`` map exists. v1 lock files have no root
+        entry, so direct dependencies are read from the package.json next to
+        the lock file, which it supersedes.
+        """
+        dependencies = set()
+        
+        try:
+            lockfile_version = None
+            direct = {}
+            packages = []
+            legacy = []
+            
+            with open(file_path, 'r', encoding='utf-8') as f:
+                reader = JsonStreamReader(f)
+                for key in reader.iter_keys():
+                    if key == 'lockfileVersion':
+                        lockfile_version = reader.read_value()
+                    elif key == 'packages' and reader.peek() == '{':
+                        for package_path in reader.iter_keys():
+                            entry = reader.read_value()
+                            if package_path == '':
+                                direct = self._root_dependency_types(entry)
+                            elif isinstance(entry, dict):
+                                packages.append(self._lock_package_record(package_path, entry))
+                    elif (key == 'dependencies' and lockfile_version in (None, 1) and
+                          reader.peek() == '{'):
+                        for name in reader.iter_keys():
+                            self._collect_legacy_lock_entries(name, reader.read_value(), legacy)
+                    else:
+                        reader.skip_value()
+            
+            source_file = str(file_path.relative_to(base_path))
+            
+            if packages:
+                records = packages
+            else:
+                records = legacy
+                package_json = file_path.parent / 'package.json'
+                if package_json.is_file():
+                    direct = self._root_dependency_types(load_json(package_json))
+            
+            for name, version, is_top_level, is_dev in records:
+                if not name or not version:
+                    continue
+                if is_top_level and name in direct:
+                    dep_type = direct[name]
+                elif is_dev:
+                    dep_type = DependencyType.DEV
+                else:
+                    dep_type = DependencyType.TRANSITIVE
+                dependencies.add(self._lock_dependency(name, version, dep_type, source_file))
+        
+        except (ValueError, IOError) as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
+        
+        return dependencies
     
-    def parse(self, path: Path) -> Set[Dependency]:
-        """Parse NPM dependencies from package.json"""
+    def _parse_yarn_lock(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """
+        Parse yarn.lock (classic v1 and berry v2+)
+        
+        The file is read in blocks that end on an entry boundary and each
+        block is split into entries with a multi-line regex, so only a few
+        thousand entries are in memory at a time. Berry workspace entries
+        list the project's own dependencies, which marks the matching
+        entries as direct; v1 lock files do not record this, so all of their
+        entries are transitive.
+        """
         dependencies = set()
         
-        package_json_files = self.find_files(path, ['package.json'])
-        
-        for package_file in package_json_files:
-            try:
-                with open(package_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Parse regular dependencies
-                if 'dependencies' in data:
-                    for name, version in data['dependencies'].items():
-                        dep = Dependency(
-                            name=name,
-                            version=self._clean_version(version),
-                            ecosystem=Ecosystem.NPM,
-                            purl=f"pkg:npm/{name}@{self._clean_version(version)}",
-                            dependency_type=DependencyType.DIRECT,
-                            source_file=str(package_file.relative_to(path)),
-                            confidence=1.0
-                        )
-                        dependencies.add(dep)
-                
-                # Parse dev dependencies
-                if 'devDependencies' in data:
-                    for name, version in data['devDependencies'].items():
-                        dep = Dependency(
-                            name=name,
-                            version=self._clean_version(version),
-                            ecosystem=Ecosystem.NPM,
-                            purl=f"pkg:npm/{name}@{self._clean_version(version)}",
-                            dependency_type=DependencyType.DEV,
-                            source_file=str(package_file.relative_to(path)),
-                            confidence=1.0
-                        )
-                        dependencies.add(dep)
-                
-                # Parse peer dependencies
-                if 'peerDependencies' in data:
-                    for name, version in data['peerDependencies'].items():
-                        dep = Dependency(
-                            name=name,
-                            version=self._clean_version(version),
-                            ecosystem=Ecosystem.NPM,
-                            purl=f"pkg:npm/{name}@{self._clean_version(version)}",
-                            dependency_type=DependencyType.DIRECT,
-                            source_file=str(package_file.relative_to(path)),
-                            confidence=0.9  # Slightly lower confidence for peer deps
-                        )
-                        dependencies.add(dep)
-                
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Could not parse {package_file}: {e}")
-                continue
+        try:
+            entries = []
+            direct_descriptors = set()
+            
+            for header, body in self._iter_yarn_entries(file_path):
+                fields = dict(_YARN_FIELD.findall(body))
+                entries.append((header, fields.get('version'), fields.get('resolution')))
+                if '@workspace:' in header:
+                    direct_descriptors.update(self._yarn_workspace_descriptors(body))
+            
+            source_file = str(file_path.relative_to(base_path))
+            
+            for header, version, resolution in entries:
+                first = header.split(',', 1)[0].strip().strip('"')
+                name = self._yarn_package_name(first, resolution)
+                if not name or not version:
+                    continue
+                dep_type = DependencyType.TRANSITIVE
+                if direct_descriptors and direct_descriptors.intersection(
+                        d.strip().strip('"') for d in header.split(',')):
+                    dep_type = DependencyType.DIRECT
+                dependencies.add(self._lock_dependency(name, version, dep_type, source_file))
+        
+        except (ValueError, IOError) as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
         
         return dependencies
     
+    def _iter_yarn_entries(self, file_path: Path, block_size: int = 1 << 20):
+        """Yield (header, indented body) for each yarn.lock entry"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            rest = ''
+            while True:
+                chunk = f.read(block_size)
+                text = rest + chunk
+                if chunk:
+                    # Entries are separated by blank lines; keep the last partial one
+                    cut = text.rfind('\n\n')
+                    if cut < 0:
+                        rest = text
+                        continue
+                    text, rest = text[:cut + 1], text[cut + 2:]
+                for match in _YARN_ENTRY.finditer(text):
+                    yield match.group(1), match.group(2)
+                if not chunk:
+                    return
+    
+    def _yarn_workspace_descriptors(self, body: str) -> Set[str]:
+        """Return the descriptors a berry workspace entry depends on"""
+        descriptors = set()
+        match = _YARN_DEPENDENCY_BLOCK.search(body)
+        if match is None:
+            return descriptors
+        for line in match.group(1).splitlines():
+            name, _, spec = line.strip().partition(': ')
+            name, spec = name.strip('"'), spec.strip('"')
+            if ':' not in spec:
+                # Plain ranges are keyed as "name@npm:range"
+                spec = f"npm:{spec}"
+            descriptors.add(f"{name}@{spec}")
+        return descriptors
+    
+    def _yarn_package_name(self, descriptor: str, resolution) -> str:
+        """
+        Resolve the package name of a yarn.lock entry
+        
+        Returns None for berry metadata, workspace/linked packages and patch
+        entries (the unpatched package has an entry of its own).
+        """
+        if resolution:
+            at = resolution.find('@', 1)
+            if at < 0 or resolution[at + 1:].startswith(_YARN_SKIPPED_PROTOCOLS):
+                return None
+            return resolution[:at]
+        
+        at = descriptor.find('@', 1)
+        if at < 0:
+            return None
+        name, spec = descriptor[:at], descriptor[at + 1:]
+        if spec.startswith(_YARN_SKIPPED_PROTOCOLS):
+            return None
+        if spec.startswith('npm:') and spec.find('@', 5) > 0:
+            # Aliased install: "alias@npm:real-name@^1.2.3"
+            return spec[4:spec.find('@', 5)]
+        return name
+    
+    def _parse_pnpm_lock(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """
+        Parse pnpm-lock.yaml (lockfile v5 - v9)
+        
+        The file is processed line by line instead of being loaded as YAML.
+        Package keys under ``packages`` give the resolved name and version;
+        the top-level (v5/v6) or per-importer dependency sections mark
+        which of them the project depends on directly.
+        """
+        dependencies = set()
+        
+        try:
+            legacy_keys = False
+            section = None
+            direct = {}
+            packages = []
+            
+            # Indentation-based key path outside the ``packages``/``snapshots`` sections
+            path = []
+            package_key = None
+            package_fields = {}
+            
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    # Fast path through the large ``packages``/``snapshots`` sections
+                    if section == 'packages':
+                        if line.startswith('    '):
+                            if package_key is not None and line.startswith(('    name:', '    version:')):
+                                key, _, value = line.strip().partition(':')
+                                package_fields[key] = value.strip().strip('\'"')
+                            continue
+                        if line.startswith('  '):
+                            if package_key is not None:
+                                packages.append((package_key, package_fields))
+                            # Keys may contain ':' (e.g. URLs); only the trailing one separates the value
+                            stripped = line.strip()
+                            package_key = stripped[:-1].strip('\'"') if stripped.endswith(':') else None
+                            package_fields = {}
+                            continue
+                    elif section == 'snapshots' and line.startswith(' '):
+                        continue
+                    
+                    stripped = line.strip()
+                    if not stripped or stripped.startswith('#'):
+                        continue
+                    indent = len(line) - len(line.lstrip(' '))
+                    key, _, value = stripped.partition(':')
+                    key = key.strip('\'"')
+                    value = value.strip().strip('\'"')
+                    
+                    if indent == 0:
+                        if package_key is not None:
+                            packages.append((package_key, package_fields))
+                            package_key = None
+                        section = key
+                        path = [(0, key)]
+                        if key == 'lockfileVersion':
+                            legacy_keys = value.split('.')[0].isdigit() and int(value.split('.')[0]) < 6
+                        continue
+                    if section in ('packages', 'snapshots'):
+                        continue
+                    
+                    while path and path[-1][0] >= indent:
+                        path.pop()
+                    path.append((indent, key))
+                    if not value:
+                        continue
+                    keys = [k for _, k in path]
+                    # v5: `<section>: {name: version}`, v6+: `<section>: {name: {version: ...}}`
+                    if keys[-1] == 'version' and len(keys) >= 3 and keys[-3] in _PNPM_DEPENDENCY_SECTIONS:
+                        name, dep_section = keys[-2], keys[-3]
+                    elif len(keys) >= 2 and keys[-2] in _PNPM_DEPENDENCY_SECTIONS:
+                        name, dep_section = keys[-1], keys[-2]
+                    else:
+                        continue
+                    version = self._pnpm_version(value, legacy_keys)
+                    direct[(name, version)] = _PNPM_DEPENDENCY_SECTIONS[dep_section]
+            
+            if package_key is not None:
+                packages.append((package_key, package_fields))
+            
+            source_file = str(file_path.relative_to(base_path))
+            
+            for package_key, fields in packages:
+                name, version = self._pnpm_package_id(package_key, legacy_keys)
+                name = fields.get('name') or name
+                version = fields.get('version') or version
+                if not name or not version:
+                    continue
+                dep_type = direct.get((name, version), DependencyType.TRANSITIVE)
+                dependencies.add(self._lock_dependency(name, version, dep_type, source_file))
+        
+        except (ValueError, IOError) as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
+        
+        return dependencies
+    
+    def _pnpm_package_id(self, package_key: str, legacy_keys: bool) -> tuple:
+        """
+        Split a pnpm ``packages`` key into (name, version)
+        
+        v5 keys look like ``/@scope/name/1.2.3_peer@4.5.6``; v6 uses
+        ``/@scope/name@1.2.3(peer@4.5.6)`` and v9 drops the leading slash.
+        """
+        key = package_key.lstrip('/')
+        if legacy_keys:
+            name, _, version = key.rpartition('/')
+        else:
+            at = key.find('@', 1)
+            if at < 0:
+                return None, None
+            name, version = key[:at], key[at + 1:]
+        return name, self._pnpm_version(version, legacy_keys)
+    
+    def _pnpm_version(self, version: str, legacy_keys: bool) -> str:
+        """Strip the peer dependency suffix from a pnpm version reference"""
+        if version.startswith(('link:', 'file:', 'workspace:')):
+            return None
+        return version.split('_', 1)[0] if legacy_keys else version.split('(', 1)[0]
+    
+    def _lock_dependency(self, name: str, version: str, dep_type: DependencyType,
+                         source_file: str) -> Dependency:
+        """Build the Dependency for a resolved lock file entry"""
+        return Dependency(
+            name=name,
+            version=version,
+            ecosystem=Ecosystem.NPM,
+            purl=f"pkg:npm/{name}@{version}",
+            dependency_type=dep_type,
+            source_file=source_file,
+            confidence=1.0  # Lock file has highest confidence
+        )
+    
+    def _root_dependency_types(self, root: dict) -> dict:
+        """Map the root package's direct dependency names to their DependencyType"""
+        direct = {}
+        for section, dep_type in [('devDependencies', DependencyType.DEV),
+                                  ('optionalDependencies', DependencyType.DIRECT),
+                                  ('peerDependencies', DependencyType.DIRECT),
+                                  ('dependencies', DependencyType.DIRECT)]:
+            for name in root.get(section) or {}:
+                direct[name] = dep_type
+        return direct
+    
+    def _lock_package_record(self, package_path: str, entry: dict) -> tuple:
+        """
+        Turn a v2/v3 ``packages`` entry into (name, version, is_top_level, is_dev)
+        
+        Workspace members and symlinked packages are local code and yield
+        an empty record.
+        """
+        if entry.get('link') or 'node_modules/' not in package_path:
+            return None, None, False, False
+        
+        installed_name = package_path.rsplit('node_modules/', 1)[1]
+        name = entry.get('name') or installed_name
+        is_top_level = package_path == f"node_modules/{installed_name}"
+        return name, entry.get('version'), is_top_level, entry.get('dev') is True
+    
+    def _collect_legacy_lock_entries(self, name: str, entry, records: list, depth: int = 0):
+        """Flatten a lockfile v1 ``dependencies`` tree into (name, version, is_top_level, is_dev) records"""
+        if not isinstance(entry, dict):
+            return
+        version = entry.get('version')
+        if isinstance(version, str) and version.startswith('npm:'):
+            # Aliased install: "npm:real-name@1.2.3"
+            name, _, version = version[4:].rpartition('@')
+        records.append((name, version, depth == 0, entry.get('dev') is True))
+        for child_name, child in (entry.get('dependencies') or {}).items():
+            self._collect_legacy_lock_entries(child_name, child, records, depth + 1)
+    
     def _clean_version(self, version: str) -> str:
         """Remove version prefixes like ^, ~, >=, etc."""
         version = version.strip()
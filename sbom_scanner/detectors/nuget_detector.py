@@ -1,55 +1,157 @@
 """
 NuGet (.NET) dependency detector
 """
+import json
+import os
+import re
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Set
+from typing import Dict, List, Optional, Set, Tuple
 from .base import BaseDetector
 from ..models import Dependency, Ecosystem, DependencyType
+from ..parsers import load_json
+from ..json_stream import JsonStreamReader
+from ..xml_stream import iter_elements, local_name
+
+
+# MSBuild files imported by every project below the directory they live in
+BUILD_PROPS = 'Directory.Build.props'
+PACKAGES_PROPS = 'Directory.Packages.props'
+
+# $(Name) property references in MSBuild values
+_PROPERTY_REFERENCE = re.compile(r'\$\(([A-Za-z_][\w.-]*)\)')
+
+
+# Item types read from project and props files
+_ITEM_TYPES = ('PackageReference', 'PackageVersion', 'GlobalPackageReference')
+
+
+def _msbuild_paths() -> List[Tuple[str, ...]]:
+    """Element paths of properties and package items, top-level or inside <Choose>"""
+    paths = []
+    for prefix in [(), ('Choose', 'When'), ('Choose', 'Otherwise')]:
+        paths.append(prefix + ('PropertyGroup',))
+        paths.extend(prefix + ('ItemGroup', item_type) for item_type in _ITEM_TYPES)
+    return paths
+
+
+def _item_metadata(element) -> Dict[str, str]:
+    """Item attributes and metadata child elements (<Version>1.0</Version>) of an item"""
+    metadata = {local_name(child.tag): (child.text or '').strip() for child in element}
+    metadata.update(element.attrib)
+    return metadata
+
+
+class _MsBuildFile:
+    """The package-related parts of a project or Directory.*.props file"""
+    
+    paths = _msbuild_paths()
+    
+    def __init__(self, file_path: Path):
+        self.properties: Dict[str, str] = {}
+        # Central package versions, keyed by lowercased package id
+        self.package_versions: Dict[str, str] = {}
+        # Item metadata of PackageReference / GlobalPackageReference items
+        self.package_references: List[Dict[str, str]] = []
+        self.global_references: List[Dict[str, str]] = []
+        
+        for path, element in iter_elements(file_path, self.paths):
+            kind = path[-1]
+            if kind == 'PropertyGroup':
+                for prop in element:
+                    self.properties[local_name(prop.tag)] = (prop.text or '').strip()
+                continue
+            
+            item = _item_metadata(element)
+            if kind == 'PackageReference':
+                self.package_references.append(item)
+            elif kind == 'GlobalPackageReference':
+                self.global_references.append(item)
+            else:
+                name = item.get('Include') or item.get('Update')
+                if name and item.get('Version'):
+                    self.package_versions[name.lower()] = item['Version']
 
 
 class NuGetDetector(BaseDetector):
     """Detector for NuGet/.NET projects"""
     
+    # Manifest pattern -> parser method, in parse order
+    manifest_parsers = {
+        'packages.config': '_parse_packages_config',
+        'packages.lock.json': '_parse_packages_lock',
+        '*.csproj': '_parse_project_file',
+        '*.fsproj': '_parse_project_file',
+        BUILD_PROPS: '_parse_project_file',
+        PACKAGES_PROPS: '_parse_global_references',
+    }
+    
+    # Manifest pattern -> lock files that replace it in the same directory
+    superseding_lockfiles = {
+        '*.csproj': ('packages.lock.json',),
+        '*.fsproj': ('packages.lock.json',),
+    }
+    
+    # Parse logic version (2: central package versions and property references)
+    detector_version = '2'
+    
+    def __init__(self):
+        # (props file name, directory) -> nearest props file at or above it
+        self._props_lookup: Dict[Tuple[str, Path], Optional[Path]] = {}
+        # props file -> ((mtime_ns, size), parsed file), shared by all projects below it
+        self._props_files: Dict[Path, Tuple[Tuple[int, int], Optional[_MsBuildFile]]] = {}
+    
     def get_manifest_files(self) -> list[str]:
-        return ['packages.config', '*.csproj', '*.fsproj', '*.vbproj']
+        return ['packages.config', 'packages.lock.json', '*.csproj', '*.fsproj', '*.vbproj',
+                BUILD_PROPS, PACKAGES_PROPS]
     
     def detect(self, path: Path) -> bool:
         """Check if .NET project files exist"""
-        return (len(self.find_files(path, ['packages.config'])) > 0 or
-                len(list(path.rglob('*.csproj'))) > 0 or
-                len(list(path.rglob('*.fsproj'))) > 0)
+        return len(self.find_files(path, ['packages.config', 'packages.lock.json',
+                                          '*.csproj', '*.fsproj'])) > 0
     
-    def parse(self, path: Path) -> Set[Dependency]:
-        """Parse NuGet dependencies"""
-        dependencies = set()
-        
-        # Parse packages.config
-        packages_files = self.find_files(path, ['packages.config'])
-        for pkg_file in packages_files:
-            dependencies.update(self._parse_packages_config(pkg_file, path))
-        
-        # Parse .csproj files
-        csproj_files = [f for f in path.rglob('*.csproj') if not self._should_skip_path(f)]
-        for csproj_file in csproj_files:
-            dependencies.update(self._parse_project_file(csproj_file, path))
+    def get_work_units(self, path: Path) -> List[Tuple[str, Path]]:
+        """
+        Add obj/project.assets.json for projects without a packages.lock.json
         
-        # Parse .fsproj files
-        fsproj_files = [f for f in path.rglob('*.fsproj') if not self._should_skip_path(f)]
-        for fsproj_file in fsproj_files:
-            dependencies.update(self._parse_project_file(fsproj_file, path))
+        ``obj`` is never walked, so the restore output is looked up directly
+        next to each project file. It holds the resolved package graph and,
+        like a lock file, supersedes the project file.
+        """
+        self._props_lookup.clear()
         
-        return dependencies
+        result = []
+        seen_assets = set()
+        for parser_name, file_path in super().get_work_units(path):
+            assets = file_path.parent / 'obj' / 'project.assets.json'
+            if (parser_name == '_parse_project_file' and file_path.name != BUILD_PROPS and
+                    assets.is_file()):
+                if not self.prefer_lockfiles:
+                    result.append((parser_name, file_path))
+                if assets not in seen_assets:
+                    seen_assets.add(assets)
+                    result.append(('_parse_project_assets', assets))
+            else:
+                result.append((parser_name, file_path))
+        return result
+    
+    def get_unit_inputs(self, parser_name: str, file_path: Path, base_path: Path) -> List[Path]:
+        """Project files depend on the Directory.*.props files above them"""
+        if parser_name != '_parse_project_file':
+            return []
+        inputs = []
+        for name in (BUILD_PROPS, PACKAGES_PROPS):
+            props_path = self._find_props(name, file_path.parent, base_path)
+            if props_path is not None and props_path != file_path:
+                inputs.append(props_path)
+        return inputs
     
     def _parse_packages_config(self, file_path: Path, base_path: Path) -> Set[Dependency]:
         """Parse packages.config file"""
         dependencies = set()
         
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            
-            for package in root.findall('.//package'):
+            for _, package in iter_elements(file_path, [('package',)]):
                 name = package.get('id')
                 version = package.get('version')
                 
@@ -71,32 +173,77 @@ class NuGetDetector(BaseDetector):
         return dependencies
     
     def _parse_project_file(self, file_path: Path, base_path: Path) -> Set[Dependency]:
-        """Parse .csproj/.fsproj file"""
+        """
+        Parse .csproj/.fsproj file (or the PackageReferences of Directory.Build.props)
+        
+        References without a version take it from the nearest
+        Directory.Packages.props (central package management), and
+        ``$(Property)`` references are expanded with the properties of the
+        project and of the Directory.*.props files above it.
+        """
         dependencies = set()
         
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
+            build_props_path = self._find_props(BUILD_PROPS, file_path.parent, base_path)
+            build_props = self._load_props(build_props_path)
+            central = self._load_props(self._find_props(PACKAGES_PROPS, file_path.parent, base_path))
+            project = build_props if build_props_path == file_path else _MsBuildFile(file_path)
+            if project is None:
+                return dependencies
+            
+            # Project properties override the imported ones
+            properties = {}
+            for props in (build_props, central):
+                if props is not None:
+                    properties.update(props.properties)
+            properties.update(project.properties)
             
-            # Find PackageReference elements
-            for package_ref in root.findall('.//PackageReference'):
+            package_versions = {}
+            if central is not None and properties.get('ManagePackageVersionsCentrally', '').lower() != 'false':
+                package_versions = central.package_versions
+            
+            for package_ref in project.package_references:
                 name = package_ref.get('Include')
-                version = package_ref.get('Version')
+                if not name:
+                    continue
                 
-                if not version:
-                    # Try to find Version as child element
-                    version_elem = package_ref.find('Version')
-                    if version_elem is not None:
-                        version = version_elem.text
+                version = (package_ref.get('VersionOverride') or package_ref.get('Version') or
+                           package_versions.get(name.lower()))
+                version = self._expand_properties(version, properties) if version else "*"
                 
-                if name:
-                    version = version if version else "*"
-                    
+                dep = Dependency(
+                    name=name,
+                    version=version,
+                    ecosystem=Ecosystem.NUGET,
+                    purl=f"pkg:nuget/{name}@{version}" if version != "*" else f"pkg:nuget/{name}",
+                    dependency_type=DependencyType.DIRECT,
+                    source_file=str(file_path.relative_to(base_path)),
+                    confidence=1.0
+                )
+                dependencies.add(dep)
+        
+        except (ET.ParseError, IOError) as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
+        
+        return dependencies
+    
+    def _parse_global_references(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """Parse the GlobalPackageReference items of Directory.Packages.props"""
+        dependencies = set()
+        
+        try:
+            props = _MsBuildFile(file_path)
+            
+            for package_ref in props.global_references:
+                name = package_ref.get('Include')
+                version = package_ref.get('Version')
+                if name and version:
+                    version = self._expand_properties(version, props.properties)
                     dep = Dependency(
                         name=name,
                         version=version,
                         ecosystem=Ecosystem.NUGET,
-                        purl=f"pkg:nuget/{name}@{version}" if version != "*" else f"pkg:nuget/{name}",
+                        purl=f"pkg:nuget/{name}@{version}",
                         dependency_type=DependencyType.DIRECT,
                         source_file=str(file_path.relative_to(base_path)),
                         confidence=1.0
@@ -107,4 +254,159 @@ class NuGetDetector(BaseDetector):
             print(f"Warning: Could not parse {file_path}: {e}")
         
         return dependencies
-
+    
+    def _parse_packages_lock(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """
+        Parse packages.lock.json
+        
+        Each target framework pins its own package graph; the graphs are
+        merged. Project-to-project references are skipped.
+        """
+        dependencies = set()
+        
+        try:
+            data = load_json(file_path)
+            
+            source_file = str(file_path.relative_to(base_path))
+            
+            for packages in (data.get('dependencies') or {}).values():
+                resolved = {
+                    name.lower(): (name, entry['resolved'])
+                    for name, entry in packages.items()
+                    if isinstance(entry, dict) and entry.get('type') != 'Project' and entry.get('resolved')
+                }
+                for name, version in resolved.values():
+                    entry = packages[name]
+                    dep_type = (DependencyType.DIRECT if entry.get('type') == 'Direct'
+                                else DependencyType.TRANSITIVE)
+                    dependencies.add(self._locked_dependency(
+                        name, version, dep_type, source_file,
+                        self._edges(entry.get('dependencies') or {}, resolved)
+                    ))
+        
+        except (json.JSONDecodeError, AttributeError, IOError) as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
+        
+        return dependencies
+    
+    def _parse_project_assets(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """
+        Parse obj/project.assets.json, the package graph written by restore
+        
+        The file is streamed: only the ``targets`` graph and the ``project``
+        section are read, the large ``libraries`` file listings are skipped.
+        """
+        dependencies = set()
+        
+        try:
+            targets = []
+            project = {}
+            with open(file_path, 'r', encoding='utf-8') as f:
+                reader = JsonStreamReader(f)
+                for key in reader.iter_keys():
+                    if key == 'targets' and reader.peek() == '{':
+                        for _ in reader.iter_keys():
+                            packages = []
+                            for package_id in reader.iter_keys():
+                                entry = reader.read_value()
+                                if isinstance(entry, dict) and entry.get('type') == 'package':
+                                    name, _, version = package_id.partition('/')
+                                    packages.append((name, version, entry.get('dependencies') or {}))
+                            targets.append(packages)
+                    elif key == 'project':
+                        project = reader.read_value() or {}
+                    else:
+                        reader.skip_value()
+            
+            # Package references of the project itself; PrivateAssets="all"
+            # references (analyzers, build tools) do not flow to consumers
+            direct = {}
+            for framework in (project.get('frameworks') or {}).values():
+                for name, spec in (framework.get('dependencies') or {}).items():
+                    if isinstance(spec, dict) and spec.get('target', 'Package') == 'Package':
+                        direct[name.lower()] = spec.get('suppressParent', '').lower() == 'all'
+            
+            source_file = str(file_path.relative_to(base_path))
+            
+            for packages in targets:
+                resolved = {name.lower(): (name, version) for name, version, _ in packages}
+                for name, version, requires in packages:
+                    key = name.lower()
+                    if key not in direct:
+                        dep_type = DependencyType.TRANSITIVE
+                    else:
+                        dep_type = DependencyType.DEV if direct[key] else DependencyType.DIRECT
+                    dependencies.add(self._locked_dependency(
+                        name, version, dep_type, source_file, self._edges(requires, resolved)
+                    ))
+        
+        except (ValueError, AttributeError, IOError) as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
+        
+        return dependencies
+    
+    def _find_props(self, name: str, directory: Path, base_path: Path) -> Optional[Path]:
+        """
+        Return the nearest ``name`` file at or above ``directory``, within the scan root
+        
+        Lookups are memoized per directory, so each directory of the tree is
+        checked at most once per scan no matter how many projects it holds.
+        """
+        key = (name, directory)
+        if key not in self._props_lookup:
+            candidate = directory / name
+            if candidate.is_file():
+                found = candidate
+            elif directory == base_path or directory.parent == directory:
+                found = None
+            else:
+                found = self._find_props(name, directory.parent, base_path)
+            self._props_lookup[key] = found
+        return self._props_lookup[key]
+    
+    def _load_props(self, props_path: Optional[Path]) -> Optional[_MsBuildFile]:
+        """Parse a Directory.*.props file once and share it with every project below it"""
+        if props_path is None:
+            return None
+        try:
+            stat = os.stat(props_path)
+        except OSError:
+            return None
+        
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = self._props_files.get(props_path)
+        if cached is None or cached[0] != stamp:
+            try:
+                props = _MsBuildFile(props_path)
+            except (ET.ParseError, IOError) as e:
+                print(f"Warning: Could not parse {props_path}: {e}")
+                props = None
+            cached = self._props_files[props_path] = (stamp, props)
+        return cached[1]
+    
+    def _expand_properties(self, value: str, properties: Dict[str, str]) -> str:
+        """Expand $(Name) references; unknown properties are left as-is"""
+        if '$(' not in value:
+            return value
+        return _PROPERTY_REFERENCE.sub(lambda m: properties.get(m.group(1), m.group(0)), value)
+    
+    def _edges(self, requires: dict, resolved: Dict[str, Tuple[str, str]]) -> Tuple[str, ...]:
+        """purls of the resolved packages a package depends on"""
+        return tuple(sorted(
+            f"pkg:nuget/{resolved[name.lower()][0]}@{resolved[name.lower()][1]}"
+            for name in requires if name.lower() in resolved
+        ))
+    
+    def _locked_dependency(self, name: str, version: str, dep_type: DependencyType,
+                           source_file: str, depends_on: Tuple[str, ...]) -> Dependency:
+        """Build the Dependency for a resolved package"""
+        return Dependency(
+            name=name,
+            version=version,
+            ecosystem=Ecosystem.NUGET,
+            purl=f"pkg:nuget/{name}@{version}",
+            dependency_type=dep_type,
+            source_file=source_file,
+            confidence=1.0,  # Lock file has highest confidence
+            depends_on=depends_on
+        )
@@ -6,11 +6,18 @@ from pathlib import Path
 from typing import Set
 from .base import BaseDetector
 from ..models import Dependency, Ecosystem, DependencyType
+from ..parsers import load_json
 
 
 class PlatformIODetector(BaseDetector):
     """Detector for PlatformIO embedded/IoT projects"""
     
+    # Manifest pattern -> parser method, in parse order
+    manifest_parsers = {
+        'platformio.ini': '_parse_platformio_ini',
+        'library.json': '_parse_library_json',
+    }
+    
     def get_manifest_files(self) -> list[str]:
         return ['platformio.ini', 'library.json']
     
@@ -18,22 +25,6 @@ class PlatformIODetector(BaseDetector):
         """Check if PlatformIO manifest files exist"""
         return len(self.find_files(path, self.get_manifest_files())) > 0
     
-    def parse(self, path: Path) -> Set[Dependency]:
-        """Parse PlatformIO dependencies"""
-        dependencies = set()
-        
-        # Parse platformio.ini files
-        platformio_ini = self.find_files(path, ['platformio.ini'])
-        for ini_file in platformio_ini:
-            dependencies.update(self._parse_platformio_ini(ini_file, path))
-        
-        # Parse library.json files
-        library_json = self.find_files(path, ['library.json'])
-        for lib_file in library_json:
-            dependencies.update(self._parse_library_json(lib_file, path))
-        
-        return dependencies
-    
     def _parse_platformio_ini(self, file_path: Path, base_path: Path) -> Set[Dependency]:
         """Parse platformio.ini file"""
         dependencies = set()
@@ -103,9 +94,7 @@ class PlatformIODetector(BaseDetector):
         dependencies = set()
         
         try:
-            import json
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_json(file_path)
             
             # Parse dependencies
             if 'dependencies' in data:
@@ -1,49 +1,55 @@
 """
 Python dependency detector
 """
+import dataclasses
+import os
 import re
 from pathlib import Path
-from typing import Set
+from typing import Dict, Set
 from .base import BaseDetector
 from ..models import Dependency, Ecosystem, DependencyType
+from ..parsers import load_json, load_toml, loads_toml
+
+
+def _normalize_name(name: str) -> str:
+    """PEP 503 normalized project name"""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+# Lock file -> manifest whose entries its pins replace in the same directory
+_LOCKED_MANIFESTS = {
+    'poetry.lock': 'pyproject.toml',
+    'uv.lock': 'pyproject.toml',
+    'Pipfile.lock': 'Pipfile',
+}
 
 
 class PythonDetector(BaseDetector):
     """Detector for Python projects"""
     
+    # Manifest pattern -> parser method, in parse order
+    manifest_parsers = {
+        'requirements.txt': '_parse_requirements_txt',
+        'setup.py': '_parse_setup_py',
+        'Pipfile': '_parse_pipfile',
+        'pyproject.toml': '_parse_pyproject_toml',
+        'Pipfile.lock': '_parse_pipfile_lock',
+        'poetry.lock': '_parse_poetry_lock',
+        'uv.lock': '_parse_uv_lock',
+    }
+    
+    # Parse logic version (2: Pipfile.lock packages are transitive unless the
+    # Pipfile next to it, which is no longer superseded, requests them)
+    detector_version = '2'
+    
     def get_manifest_files(self) -> list[str]:
-        return ['requirements.txt', 'setup.py', 'Pipfile', 'pyproject.toml', 'setup.cfg']
+        return ['requirements.txt', 'setup.py', 'Pipfile', 'pyproject.toml', 'setup.cfg',
+                'Pipfile.lock', 'poetry.lock', 'uv.lock']
     
     def detect(self, path: Path) -> bool:
         """Check if Python dependency files exist"""
         return len(self.find_files(path, self.get_manifest_files())) > 0
     
-    def parse(self, path: Path) -> Set[Dependency]:
-        """Parse Python dependencies"""
-        dependencies = set()
-        
-        # Parse requirements.txt files
-        req_files = self.find_files(path, ['requirements.txt'])
-        for req_file in req_files:
-            dependencies.update(self._parse_requirements_txt(req_file, path))
-        
-        # Parse setup.py files
-        setup_files = self.find_files(path, ['setup.py'])
-        for setup_file in setup_files:
-            dependencies.update(self._parse_setup_py(setup_file, path))
-        
-        # Parse Pipfile
-        pipfiles = self.find_files(path, ['Pipfile'])
-        for pipfile in pipfiles:
-            dependencies.update(self._parse_pipfile(pipfile, path))
-        
-        # Parse pyproject.toml
-        pyproject_files = self.find_files(path, ['pyproject.toml'])
-        for pyproject_file in pyproject_files:
-            dependencies.update(self._parse_pyproject_toml(pyproject_file, path))
-        
-        return dependencies
-    
     def _parse_requirements_txt(self, file_path: Path, base_path: Path) -> Set[Dependency]:
         """Parse requirements.txt file"""
         dependencies = set()
@@ -145,9 +151,7 @@ class PythonDetector(BaseDetector):
         dependencies = set()
         
         try:
-            import toml
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = toml.load(f)
+            data = load_toml(file_path)
             
             # Parse packages
             if 'packages' in data:
@@ -206,9 +210,7 @@ class PythonDetector(BaseDetector):
         dependencies = set()
         
         try:
-            import toml
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = toml.load(f)
+            data = load_toml(file_path)
             
             # Poetry dependencies
             if 'tool' in data and 'poetry' in data['tool']:
@@ -269,4 +271,178 @@ class PythonDetector(BaseDetector):
             print(f"Warning: Could not parse {file_path}: {e}")
         
         return dependencies
-
+    
+    def finalize(self, dependencies: Set[Dependency], path: Path) -> Set[Dependency]:
+        """
+        Let lock file pins replace manifest ranges
+        
+        A pyproject.toml dependency that is locked by poetry.lock / uv.lock in
+        the same directory, or a Pipfile dependency locked by Pipfile.lock, is
+        dropped, and the locked package inherits its direct/dev type.
+        """
+        locked = {}
+        for dep in dependencies:
+            manifest = _LOCKED_MANIFESTS.get(os.path.basename(dep.source_file or ''))
+            if manifest is not None:
+                locked[(os.path.dirname(dep.source_file), manifest, _normalize_name(dep.name))] = dep
+        if not locked:
+            return dependencies
+        
+        result = set(dependencies)
+        for dep in dependencies:
+            if not dep.source_file:
+                continue
+            pinned = locked.get((os.path.dirname(dep.source_file), os.path.basename(dep.source_file),
+                                 _normalize_name(dep.name)))
+            if pinned is None:
+                continue
+            result.discard(dep)
+            if pinned.dependency_type == DependencyType.TRANSITIVE:
+                result.discard(pinned)
+                result.add(dataclasses.replace(pinned, dependency_type=dep.dependency_type))
+        return result
+    
+    def _parse_pipfile_lock(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """
+        Parse Pipfile.lock
+        
+        The lock file is flat and does not record which packages were
+        requested directly: ``default`` packages are reported as transitive
+        and ``develop`` packages as dev dependencies, and finalize marks the
+        ones the Pipfile lists as direct.
+        """
+        dependencies = set()
+        
+        try:
+            data = load_json(file_path)
+            
+            source_file = str(file_path.relative_to(base_path))
+            
+            for section, dep_type in [('default', DependencyType.TRANSITIVE),
+                                      ('develop', DependencyType.DEV)]:
+                for name, spec in (data.get(section) or {}).items():
+                    version = spec.get('version', '') if isinstance(spec, dict) else ''
+                    if not version.startswith('=='):
+                        # VCS / path entries are not pinned to a release
+                        continue
+                    dependencies.add(self._locked_dependency(
+                        name, version[2:].strip(), dep_type, source_file
+                    ))
+        
+        except (ValueError, IOError) as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
+        
+        return dependencies
+    
+    def _parse_poetry_lock(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """
+        Parse poetry.lock with pinned versions and dependency edges
+        
+        Only the [[package]] tables are decoded; the trailing [metadata]
+        table (which holds every file hash in older lock files) is cut off
+        before parsing.
+        """
+        dependencies = set()
+        
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            cut = text.find('\n[metadata]')
+            if cut >= 0:
+                text = text[:cut + 1]
+            packages = loads_toml(text).get('package', [])
+            
+            locked = {_normalize_name(package['name']): f"pkg:pypi/{package['name']}@{package['version']}"
+                      for package in packages if 'name' in package and 'version' in package}
+            source_file = str(file_path.relative_to(base_path))
+            
+            for package in packages:
+                name, version = package.get('name'), package.get('version')
+                if not name or not version:
+                    continue
+                # Poetry < 1.5 records a category, Poetry 2 the dependency groups
+                groups = package.get('groups') or [package.get('category', 'main')]
+                dep_type = DependencyType.DEV if 'main' not in groups else DependencyType.TRANSITIVE
+                depends_on = tuple(sorted(
+                    locked[_normalize_name(dep_name)]
+                    for dep_name in package.get('dependencies', {})
+                    if _normalize_name(dep_name) in locked
+                ))
+                dependencies.add(self._locked_dependency(name, version, dep_type, source_file, depends_on))
+        
+        except (ValueError, IOError, AttributeError) as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
+        
+        return dependencies
+    
+    def _parse_uv_lock(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """
+        Parse uv.lock with pinned versions and dependency edges
+        
+        Packages with an editable, virtual, directory or path source are the
+        project's own; their dependencies (and dev dependencies) are direct.
+        """
+        dependencies = set()
+        
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                packages = loads_toml(f.read()).get('package', [])
+            
+            versions_by_name = {}
+            for package in packages:
+                versions_by_name.setdefault(package.get('name'), []).append(package.get('version'))
+            
+            def resolve(reference: dict):
+                """Pick the locked package a dependency reference points to"""
+                name = reference.get('name')
+                version = reference.get('version') or versions_by_name.get(name, [None])[0]
+                return name, version
+            
+            local_sources = ('editable', 'virtual', 'directory', 'path')
+            direct: Dict[tuple, DependencyType] = {}
+            for package in packages:
+                if not any(key in (package.get('source') or {}) for key in local_sources):
+                    continue
+                for group in (package.get('dev-dependencies') or {}).values():
+                    for reference in group:
+                        direct[resolve(reference)] = DependencyType.DEV
+                for group in (package.get('optional-dependencies') or {}).values():
+                    for reference in group:
+                        direct[resolve(reference)] = DependencyType.DIRECT
+                for reference in package.get('dependencies', []):
+                    direct[resolve(reference)] = DependencyType.DIRECT
+            
+            source_file = str(file_path.relative_to(base_path))
+            
+            for package in packages:
+                name, version = package.get('name'), package.get('version')
+                if not name or not version:
+                    continue
+                if any(key in (package.get('source') or {}) for key in local_sources):
+                    continue
+                depends_on = tuple(sorted(
+                    f"pkg:pypi/{dep_name}@{dep_version}"
+                    for dep_name, dep_version in map(resolve, package.get('dependencies', []))
+                    if dep_version
+                ))
+                dep_type = direct.get((name, version), DependencyType.TRANSITIVE)
+                dependencies.add(self._locked_dependency(name, version, dep_type, source_file, depends_on))
+        
+        except (ValueError, IOError, AttributeError) as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
+        
+        return dependencies
+    
+    def _locked_dependency(self, name: str, version: str, dep_type: DependencyType,
+                           source_file: str, depends_on: tuple = None) -> Dependency:
+        """Build the Dependency for a pinned lock file entry"""
+        return Dependency(
+            name=name,
+            version=version,
+            ecosystem=Ecosystem.PYPI,
+            purl=f"pkg:pypi/{name}@{version}",
+            dependency_type=dep_type,
+            source_file=source_file,
+            confidence=1.0,  # Lock file has highest confidence
+            depends_on=depends_on
+        )
@@ -11,60 +11,142 @@ from ..models import Dependency, Ecosystem, DependencyType
 class RubyDetector(BaseDetector):
     """Detector for Ruby/Gem projects"""
     
+    # Manifest pattern -> parser method, in parse order
+    manifest_parsers = {
+        'Gemfile': '_parse_gemfile',
+        'Gemfile.lock': '_parse_gemfile_lock',
+    }
+    
+    # Manifest pattern -> lock files that replace it in the same directory
+    superseding_lockfiles = {
+        'Gemfile': ('Gemfile.lock',),
+    }
+    
     def get_manifest_files(self) -> list[str]:
         return ['Gemfile', 'Gemfile.lock', '*.gemspec']
     
     def detect(self, path: Path) -> bool:
-        """Check if Gemfile exists"""
-        return len(self.find_files(path, ['Gemfile'])) > 0
+        """Check if Gemfile or Gemfile.lock exists"""
+        return len(self.find_files(path, ['Gemfile', 'Gemfile.lock'])) > 0
     
-    def parse(self, path: Path) -> Set[Dependency]:
-        """Parse Ruby dependencies from Gemfile"""
+    def _parse_gemfile(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """Parse Gemfile"""
         dependencies = set()
         
-        gemfiles = self.find_files(path, ['Gemfile'])
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            # Pattern for gem 'name', 'version' or gem "name", "version"
+            pattern1 = r'gem\s+["\']([^"\']+)["\']\s*,\s*["\']([^"\']+)["\']'
+            matches = re.findall(pattern1, content)
+            
+            for name, version in matches:
+                version = self._clean_version(version)
+                dep = Dependency(
+                    name=name,
+                    version=version,
+                    ecosystem=Ecosystem.GEM,
+                    purl=f"pkg:gem/{name}@{version}",
+                    dependency_type=DependencyType.DIRECT,
+                    source_file=str(file_path.relative_to(base_path)),
+                    confidence=1.0
+                )
+                dependencies.add(dep)
+            
+            # Pattern for gem 'name' without version
+            pattern2 = r'gem\s+["\']([^"\']+)["\'](?!\s*,)'
+            matches2 = re.findall(pattern2, content)
+            
+            for name in matches2:
+                dep = Dependency(
+                    name=name,
+                    version="*",
+                    ecosystem=Ecosystem.GEM,
+                    purl=f"pkg:gem/{name}",
+                    dependency_type=DependencyType.DIRECT,
+                    source_file=str(file_path.relative_to(base_path)),
+                    confidence=0.9
+                )
+                dependencies.add(dep)
+        
+        except IOError as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
+        
+        return dependencies
+    
+    def _parse_gemfile_lock(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """
+        Parse Gemfile.lock with resolved versions and dependency edges
+        
+        A single pass tracks the current section: ``specs:`` entries of the
+        GEM and GIT sections (4-space indent) are resolved gems, the 6-space
+        lines below them are their dependencies. PATH specs are the project's
+        own gems; they and the DEPENDENCIES section mark direct dependencies.
+        """
+        dependencies = set()
         
-        for gemfile in gemfiles:
-            try:
-                with open(gemfile, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Pattern for gem 'name', 'version' or gem "name", "version"
-                pattern1 = r'gem\s+["\']([^"\']+)["\']\s*,\s*["\']([^"\']+)["\']'
-                matches = re.findall(pattern1, content)
-                
-                for name, version in matches:
-                    version = self._clean_version(version)
-                    dep = Dependency(
-                        name=name,
-                        version=version,
-                        ecosystem=Ecosystem.GEM,
-                        purl=f"pkg:gem/{name}@{version}",
-                        dependency_type=DependencyType.DIRECT,
-                        source_file=str(gemfile.relative_to(path)),
-                        confidence=1.0
-                    )
-                    dependencies.add(dep)
-                
-                # Pattern for gem 'name' without version
-                pattern2 = r'gem\s+["\']([^"\']+)["\'](?!\s*,)'
-                matches2 = re.findall(pattern2, content)
-                
-                for name in matches2:
-                    dep = Dependency(
-                        name=name,
-                        version="*",
-                        ecosystem=Ecosystem.GEM,
-                        purl=f"pkg:gem/{name}",
-                        dependency_type=DependencyType.DIRECT,
-                        source_file=str(gemfile.relative_to(path)),
-                        confidence=0.9
-                    )
-                    dependencies.add(dep)
+        try:
+            specs = {}
+            local_gems = set()
+            direct = set()
+            section = None
+            current = None
             
-            except IOError as e:
-                print(f"Warning: Could not parse {gemfile}: {e}")
-                continue
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.rstrip('\r\n')
+                    if not line.strip():
+                        continue
+                    if not line.startswith(' '):
+                        section = line.strip()
+                        current = None
+                        continue
+                    
+                    if section in ('GEM', 'GIT', 'PATH'):
+                        if line.startswith('      '):
+                            # Dependency of the current spec: "    name (constraint)"
+                            if current is not None:
+                                current.append(line.split()[0])
+                        elif line.startswith('    '):
+                            # Resolved spec: "name (version[-platform])"
+                            name, _, version = line.strip().partition(' ')
+                            version = version.strip('()').split('-', 1)[0]
+                            if section == 'PATH':
+                                local_gems.add(name)
+                            current = specs.setdefault(name, (version, []))[1]
+                    elif section == 'DEPENDENCIES':
+                        # "name (constraints)" or "name!" for GIT/PATH sources
+                        direct.add(line.split()[0].rstrip('!'))
+            
+            # Gems the project's own (PATH) gems depend on are direct too
+            for name in local_gems:
+                direct.update(specs[name][1])
+            
+            source_file = str(file_path.relative_to(base_path))
+            
+            for name, (version, requires) in specs.items():
+                if name in local_gems:
+                    continue
+                depends_on = tuple(sorted(
+                    f"pkg:gem/{dep_name}@{specs[dep_name][0]}"
+                    for dep_name in set(requires)
+                    if dep_name in specs and dep_name not in local_gems
+                ))
+                dep = Dependency(
+                    name=name,
+                    version=version,
+                    ecosystem=Ecosystem.GEM,
+                    purl=f"pkg:gem/{name}@{version}",
+                    dependency_type=DependencyType.DIRECT if name in direct else DependencyType.TRANSITIVE,
+                    source_file=source_file,
+                    confidence=1.0,  # Lock file has highest confidence
+                    depends_on=depends_on
+                )
+                dependencies.add(dep)
+        
+        except IOError as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
         
         return dependencies
     
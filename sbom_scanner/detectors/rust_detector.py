@@ -1,15 +1,31 @@
 """
 Rust (Cargo) dependency detector
 """
+import dataclasses
+import os
+import re
 from pathlib import Path
-from typing import Set
+from typing import Optional, Set
 from .base import BaseDetector
 from ..models import Dependency, Ecosystem, DependencyType
+from ..parsers import load_toml
+
+
+# `key = "value"` line of a Cargo.lock [[package]] table
+_LOCK_FIELD = re.compile(r'(\w+) = "([^"]*)"')
+
+_QUOTED = re.compile(r'"([^"]*)"')
 
 
 class RustDetector(BaseDetector):
     """Detector for Rust/Cargo projects"""
     
+    # Manifest pattern -> parser method, in parse order
+    manifest_parsers = {
+        'Cargo.toml': '_parse_cargo_toml',
+        'Cargo.lock': '_parse_cargo_lock',
+    }
+    
     def get_manifest_files(self) -> list[str]:
         return ['Cargo.toml', 'Cargo.lock']
     
@@ -17,63 +33,193 @@ class RustDetector(BaseDetector):
         """Check if Cargo.toml exists"""
         return len(self.find_files(path, ['Cargo.toml'])) > 0
     
-    def parse(self, path: Path) -> Set[Dependency]:
-        """Parse Rust dependencies from Cargo.toml"""
+    def finalize(self, dependencies: Set[Dependency], path: Path) -> Set[Dependency]:
+        """
+        Let Cargo.lock pins replace the Cargo.toml requirements they resolve
+        
+        A workspace has a single Cargo.lock at its root that resolves every
+        member crate, so a Cargo.toml dependency is dropped when the nearest
+        Cargo.lock in its directory or above it pins that crate. Crates
+        outside the workspace (not a member, or excluded) are not pinned
+        there and keep their Cargo.toml entries. The lock file marks every
+        dependency of a workspace crate as direct; pins that the manifests
+        only list under [dev-dependencies] become dev dependencies.
+        """
+        locked = {}
+        for dep in dependencies:
+            if dep.source_file and os.path.basename(dep.source_file) == 'Cargo.lock':
+                locked.setdefault((os.path.dirname(dep.source_file), dep.name), []).append(dep)
+        if not locked:
+            return dependencies
+        lock_dirs = {lock_dir for lock_dir, _ in locked}
+        
+        result = set(dependencies)
+        declared_types = {}
+        for dep in dependencies:
+            if not dep.source_file or os.path.basename(dep.source_file) != 'Cargo.toml':
+                continue
+            lock_dir = self._nearest_lock_dir(os.path.dirname(dep.source_file), lock_dirs)
+            if lock_dir is None or (lock_dir, dep.name) not in locked:
+                continue
+            declared_types.setdefault((lock_dir, dep.name), set()).add(dep.dependency_type)
+            if self.prefer_lockfiles:
+                result.discard(dep)
+        
+        for key, types in declared_types.items():
+            if types != {DependencyType.DEV}:
+                continue
+            for pinned in locked[key]:
+                if pinned.dependency_type == DependencyType.DIRECT:
+                    result.discard(pinned)
+                    result.add(dataclasses.replace(pinned, dependency_type=DependencyType.DEV))
+        return result
+    
+    def _nearest_lock_dir(self, manifest_dir: str, lock_dirs: Set[str]) -> Optional[str]:
+        """Closest directory at or above ``manifest_dir`` that has a Cargo.lock"""
+        directory = manifest_dir
+        while directory not in lock_dirs:
+            if not directory:
+                return None
+            directory = os.path.dirname(directory)
+        return directory
+    
+    def _parse_cargo_toml(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """Parse Cargo.toml file"""
         dependencies = set()
         
-        cargo_files = self.find_files(path, ['Cargo.toml'])
+        try:
+            data = load_toml(file_path)
+            
+            # Parse dependencies
+            if 'dependencies' in data:
+                for name, version_spec in data['dependencies'].items():
+                    if isinstance(version_spec, dict):
+                        version = version_spec.get('version', '*')
+                    else:
+                        version = str(version_spec)
+                    
+                    version = version.strip('"\'')
+                    
+                    dep = Dependency(
+                        name=name,
+                        version=version,
+                        ecosystem=Ecosystem.CARGO,
+                        purl=f"pkg:cargo/{name}@{version}" if version != '*' else f"pkg:cargo/{name}",
+                        dependency_type=DependencyType.DIRECT,
+                        source_file=str(file_path.relative_to(base_path)),
+                        confidence=1.0
+                    )
+                    dependencies.add(dep)
+            
+            # Parse dev dependencies
+            if 'dev-dependencies' in data:
+                for name, version_spec in data['dev-dependencies'].items():
+                    if isinstance(version_spec, dict):
+                        version = version_spec.get('version', '*')
+                    else:
+                        version = str(version_spec)
+                    
+                    version = version.strip('"\'')
+                    
+                    dep = Dependency(
+                        name=name,
+                        version=version,
+                        ecosystem=Ecosystem.CARGO,
+                        purl=f"pkg:cargo/{name}@{version}" if version != '*' else f"pkg:cargo/{name}",
+                        dependency_type=DependencyType.DEV,
+                        source_file=str(file_path.relative_to(base_path)),
+                        confidence=1.0
+                    )
+                    dependencies.add(dep)
+        
+        except Exception as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
+        
+        return dependencies
+    
+    def _parse_cargo_lock(self, file_path: Path, base_path: Path) -> Set[Dependency]:
+        """
+        Parse Cargo.lock with exact versions and dependency edges
         
-        for cargo_file in cargo_files:
-            try:
-                import toml
-                with open(cargo_file, 'r', encoding='utf-8') as f:
-                    data = toml.load(f)
-                
-                # Parse dependencies
-                if 'dependencies' in data:
-                    for name, version_spec in data['dependencies'].items():
-                        if isinstance(version_spec, dict):
-                            version = version_spec.get('version', '*')
-                        else:
-                            version = str(version_spec)
-                        
-                        version = version.strip('"\'')
-                        
-                        dep = Dependency(
-                            name=name,
-                            version=version,
-                            ecosystem=Ecosystem.CARGO,
-                            purl=f"pkg:cargo/{name}@{version}" if version != '*' else f"pkg:cargo/{name}",
-                            dependency_type=DependencyType.DIRECT,
-                            source_file=str(cargo_file.relative_to(path)),
-                            confidence=1.0
-                        )
-                        dependencies.add(dep)
-                
-                # Parse dev dependencies
-                if 'dev-dependencies' in data:
-                    for name, version_spec in data['dev-dependencies'].items():
-                        if isinstance(version_spec, dict):
-                            version = version_spec.get('version', '*')
-                        else:
-                            version = str(version_spec)
-                        
-                        version = version.strip('"\'')
-                        
-                        dep = Dependency(
-                            name=name,
-                            version=version,
-                            ecosystem=Ecosystem.CARGO,
-                            purl=f"pkg:cargo/{name}@{version}" if version != '*' else f"pkg:cargo/{name}",
-                            dependency_type=DependencyType.DEV,
-                            source_file=str(cargo_file.relative_to(path)),
-                            confidence=1.0
-                        )
-                        dependencies.add(dep)
+        The [[package]] tables are read in a single line-by-line pass.
+        Packages without a ``source`` are the workspace's own crates; they
+        are not reported, but the crates they depend on are marked direct.
+        """
+        dependencies = set()
+        
+        try:
+            packages = []
+            package = None
+            in_dependencies = False
             
-            except Exception as e:
-                print(f"Warning: Could not parse {cargo_file}: {e}")
-                continue
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if in_dependencies:
+                        package['dependencies'].extend(_QUOTED.findall(line))
+                        if line.endswith(']'):
+                            in_dependencies = False
+                        continue
+                    if line.startswith('['):
+                        package = None
+                        if line == '[[package]]':
+                            package = {'dependencies': []}
+                            packages.append(package)
+                        continue
+                    if package is None:
+                        continue
+                    if line.startswith('dependencies = ['):
+                        package['dependencies'].extend(_QUOTED.findall(line))
+                        in_dependencies = not line.endswith(']')
+                        continue
+                    match = _LOCK_FIELD.match(line)
+                    if match:
+                        package[match.group(1)] = match.group(2)
+            
+            # Dependency references are "name", or "name version [(source)]"
+            # when several versions of a crate are locked
+            versions_by_name = {}
+            for package in packages:
+                versions_by_name.setdefault(package.get('name'), []).append(package.get('version'))
+            local = {(package.get('name'), package.get('version'))
+                     for package in packages if 'source' not in package}
+            
+            def resolve(reference: str):
+                parts = reference.split(' ')
+                if len(parts) > 1:
+                    return parts[0], parts[1]
+                versions = versions_by_name.get(parts[0], [None])
+                return parts[0], versions[0]
+            
+            direct = set()
+            for package in packages:
+                if (package.get('name'), package.get('version')) in local:
+                    direct.update(resolve(reference) for reference in package['dependencies'])
+            
+            source_file = str(file_path.relative_to(base_path))
+            
+            for package in packages:
+                name, version = package.get('name'), package.get('version')
+                if not name or not version or (name, version) in local:
+                    continue
+                depends_on = tuple(sorted(
+                    f"pkg:cargo/{dep_name}@{dep_version}"
+                    for dep_name, dep_version in map(resolve, package['dependencies'])
+                    if dep_version and (dep_name, dep_version) not in local
+                ))
+                dep = Dependency(
+                    name=name,
+                    version=version,
+                    ecosystem=Ecosystem.CARGO,
+                    purl=f"pkg:cargo/{name}@{version}",
+                    dependency_type=DependencyType.DIRECT if (name, version) in direct else DependencyType.TRANSITIVE,
+                    source_file=source_file,
+                    confidence=1.0,  # Lock file has highest confidence
+                    depends_on=depends_on
+                )
+                dependencies.add(dep)
+        
+        except (ValueError, IOError) as e:
+            print(f"Warning: Could not parse {file_path}: {e}")
         
         return dependencies
-
@@ -0,0 +1,193 @@
+"""
+Shared filesystem index used by all detectors
+"""
+import os
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+
+# Directories that hold installed/vendored dependencies or build output.
+# Manifests inside them describe third-party code rather than the project,
+# so the walker never descends into them.
+DEFAULT_SKIP_DIRS: FrozenSet[str] = frozenset({
+    'node_modules',
+    'vendor',
+    'bower_components',
+    '.git',
+    '__pycache__',
+    'venv',
+    'env',
+    '.venv',
+    'virtualenv',
+    'target',
+    'build',
+    'dist',
+    '.gradle',
+    'gradle',
+    'obj',
+    'bin',
+})
+
+
+def walk_files(root: Path, skip_dirs: FrozenSet[str] = DEFAULT_SKIP_DIRS) -> Iterator[Tuple[str, str]]:
+    """
+    Walk ``root`` with os.scandir, pruning skipped directories
+
+    Directories named in ``skip_dirs`` are never opened, so the cost of a walk
+    depends on the project sources rather than on ``node_modules`` and friends.
+    Symlinked directories are not followed.
+
+    Yields:
+        (directory, filename) tuples in sorted, deterministic order
+    """
+    stack = [str(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                if entry.name not in skip_dirs and not entry.is_symlink():
+                    subdirs.append(entry.path)
+            else:
+                yield directory, entry.name
+
+        # Reversed so subdirectories are popped in sorted order
+        stack.extend(reversed(subdirs))
+
+
+class FileIndex:
+    """
+    In-memory index of candidate manifest files under a scan root
+
+    The tree is walked exactly once and every file whose name matches one of
+    the requested patterns is recorded, keyed by basename (``package.json``)
+    or by extension (``*.csproj``). Detectors then resolve ``find_files``
+    calls with dictionary lookups instead of walking the tree again.
+    """
+
+    def __init__(self, root: Path, skip_dirs: FrozenSet[str] = DEFAULT_SKIP_DIRS):
+        self.root = root
+        self.skip_dirs = skip_dirs
+        self._names: Dict[str, List[Path]] = {}
+        self._extensions: Dict[str, List[Path]] = {}
+
+    @classmethod
+    def build(cls, root: Path, patterns: Iterable[str],
+              skip_dirs: Optional[FrozenSet[str]] = None) -> 'FileIndex':
+        """
+        Walk ``root`` once and index every file matching ``patterns``
+
+        Args:
+            root: Directory to walk
+            patterns: Plain file names or ``*.ext`` extension globs
+            skip_dirs: Directory names to prune (defaults to DEFAULT_SKIP_DIRS)
+
+        Returns:
+            Populated FileIndex
+        """
+        index = cls(root, skip_dirs if skip_dirs is not None else DEFAULT_SKIP_DIRS)
+        for pattern in patterns:
+            if cls._is_extension_pattern(pattern):
+                index._extensions.setdefault(pattern[1:], [])
+            elif cls._is_name_pattern(pattern):
+                index._names.setdefault(pattern, [])
+
+        names = index._names
+        extensions = index._extensions
+
+        current_dir = None
+        directory = None
+        for dirpath, filename in walk_files(root, index.skip_dirs):
+            name_bucket = names.get(filename)
+            dot = filename.rfind('.')
+            ext_bucket = extensions.get(filename[dot:]) if dot >= 0 else None
+            if name_bucket is None and ext_bucket is None:
+                continue
+            if dirpath != current_dir:
+                current_dir = dirpath
+                directory = Path(dirpath)
+            file_path = directory / filename
+            if name_bucket is not None:
+                name_bucket.append(file_path)
+            if ext_bucket is not None:
+                ext_bucket.append(file_path)
+
+        return index
+
+    def add(self, file_path: Path) -> bool:
+        """
+        Record a file that appeared after the index was built
+
+        Returns:
+            True if the file matches an indexed pattern
+        """
+        dot = file_path.name.rfind('.')
+        buckets = [self._names.get(file_path.name),
+                   self._extensions.get(file_path.name[dot:]) if dot >= 0 else None]
+
+        matched = False
+        for bucket in buckets:
+            if bucket is not None:
+                matched = True
+                if file_path not in bucket:
+                    bucket.append(file_path)
+        return matched
+
+    def remove_under(self, path: Path) -> List[Path]:
+        """
+        Forget ``path`` and, if it was a directory, every indexed file below it
+
+        Returns:
+            The indexed files that were removed
+        """
+        removed = set()
+        for buckets in (self._names, self._extensions):
+            for bucket in buckets.values():
+                kept = []
+                for file_path in bucket:
+                    if file_path == path or path in file_path.parents:
+                        removed.add(file_path)
+                    else:
+                        kept.append(file_path)
+                bucket[:] = kept
+        return sorted(removed)
+
+    def covers(self, pattern: str) -> bool:
+        """Check whether ``pattern`` was indexed and can be answered by lookup"""
+        if self._is_extension_pattern(pattern):
+            return pattern[1:] in self._extensions
+        return pattern in self._names
+
+    def lookup(self, pattern: str) -> List[Path]:
+        """Return all indexed files matching ``pattern``"""
+        if self._is_extension_pattern(pattern):
+            return list(self._extensions.get(pattern[1:], ()))
+        return list(self._names.get(pattern, ()))
+
+    @classmethod
+    def matches(cls, pattern: str, filename: str) -> bool:
+        """Check whether a file name matches an indexable pattern"""
+        if cls._is_extension_pattern(pattern):
+            return filename.endswith(pattern[1:])
+        return filename == pattern
+
+    @staticmethod
+    def _is_extension_pattern(pattern: str) -> bool:
+        """Check for a simple ``*.ext`` glob"""
+        return (pattern.startswith('*.') and
+                not any(ch in pattern[2:] for ch in '*?[./\\'))
+
+    @staticmethod
+    def _is_name_pattern(pattern: str) -> bool:
+        """Check for a plain file name without wildcards or separators"""
+        return not any(ch in pattern for ch in '*?[/\\')
@@ -0,0 +1,159 @@
+"""
+Stat-based incremental rescan support
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from . import __version__
+from .models import Dependency
+from .parsers import load_json
+
+
+# Bump when the on-disk state layout changes
+STATE_FORMAT = 3
+
+# (size, mtime_ns, inode) of a manifest, followed by those of its unit inputs
+StatKey = List[int]
+
+
+def default_state_file(scan_path: Path, cache_dir: Path) -> Path:
+    """Return the state file used for ``scan_path`` inside ``cache_dir``"""
+    digest = hashlib.sha256(str(scan_path).encode('utf-8')).hexdigest()
+    return Path(cache_dir) / 'state' / f"{digest}.json"
+
+
+class ScanState:
+    """
+    Record of every manifest parsed by the previous scan
+
+    For each work unit (detector, parser, manifest) the manifest's
+    (size, mtime_ns, inode) tuple is stored together with the dependencies
+    it produced. On the next scan a manifest whose stat tuple is unchanged
+    is not read again; its previous dependencies are reused instead.
+    """
+
+    def __init__(self, state_file: Optional[Path] = None):
+        self.state_file = Path(state_file) if state_file is not None else None
+        self._previous: Dict[str, dict] = {}
+        self._current: Dict[str, dict] = {}
+        # File -> names of the detectors whose work units read it
+        self._readers: Dict[Path, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, state_file: Path) -> 'ScanState':
+        """Load the state written by the previous scan, if any and still compatible"""
+        state = cls(state_file)
+        if state.state_file is None:
+            return state
+        try:
+            data = load_json(state.state_file)
+        except (OSError, ValueError):
+            return state
+
+        if data.get('format') == STATE_FORMAT and data.get('version') == __version__:
+            state._previous = data.get('units', {})
+        return state
+
+    def reuse(self, detector, parser_name: str, file_path: Path,
+              base_path: Path) -> Tuple[Optional[StatKey], Optional[Set[Dependency]]]:
+        """
+        Look up a work unit in the previous scan
+
+        Returns:
+            (stat key, dependencies) - dependencies is None when the manifest
+            changed (or was never seen) and has to be parsed again
+        """
+        paths = [file_path, *detector.get_unit_inputs(parser_name, file_path, base_path)]
+        with self._lock:
+            for path in paths:
+                self._readers.setdefault(path, set()).add(detector.__class__.__name__)
+
+        stat_key = []
+        try:
+            for path in paths:
+                stat = os.stat(path)
+                stat_key.extend([stat.st_size, stat.st_mtime_ns, stat.st_ino])
+        except OSError:
+            return None, None
+
+        entry = self._previous.get(self._unit_key(detector, parser_name, file_path, base_path))
+        if (entry is None or entry['stat'] != stat_key or
+                entry['detector_version'] != detector.detector_version):
+            return stat_key, None
+        return stat_key, {Dependency.from_tuple(row) for row in entry['dependencies']}
+
+    def record(self, detector, parser_name: str, file_path: Path, base_path: Path,
+               stat_key: Optional[StatKey], dependencies: Set[Dependency]):
+        """Remember the outcome of a work unit for the next scan"""
+        if stat_key is None:
+            return
+        entry = {
+            'stat': stat_key,
+            'detector_version': detector.detector_version,
+            'dependencies': [dep.to_tuple() for dep in dependencies],
+        }
+        key = self._unit_key(detector, parser_name, file_path, base_path)
+        with self._lock:
+            self._current[key] = entry
+
+    def readers(self, file_path: Path) -> Set[str]:
+        """Return the names of the detectors with a work unit that reads ``file_path``"""
+        with self._lock:
+            return set(self._readers.get(file_path, ()))
+
+    def read_files(self) -> Set[Path]:
+        """Return every manifest and unit input looked up so far"""
+        with self._lock:
+            return set(self._readers)
+
+    def invalidate(self, file_path: Path, base_path: Path):
+        """Force every work unit for ``file_path`` to be parsed again"""
+        suffix = ':' + file_path.relative_to(base_path).as_posix()
+        with self._lock:
+            for units in (self._previous, self._current):
+                for key in [key for key in units if key.endswith(suffix)]:
+                    del units[key]
+
+    def commit(self):
+        """
+        Make the units recorded so far reusable by later runs in this process
+
+        Used by long-lived sessions (watch mode) that re-run detectors without
+        writing the state to disk in between.
+        """
+        with self._lock:
+            self._previous.update(self._current)
+            self._current = {}
+
+    def save(self):
+        """Atomically write the units seen in this scan; vanished manifests drop out"""
+        if self.state_file is None:
+            return
+        data = {
+            'format': STATE_FORMAT,
+            'version': __version__,
+            'units': self._current,
+        }
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.state_file.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, separators=(',', ':'))
+                os.replace(tmp_name, self.state_file)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+        except OSError as e:
+            print(f"Warning: Could not save scan state {self.state_file}: {e}")
+
+    @staticmethod
+    def _unit_key(detector, parser_name: str, file_path: Path, base_path: Path) -> str:
+        """Identify a work unit independently of the scan root location"""
+        return f"{detector.__class__.__name__}:{parser_name}:{file_path.relative_to(base_path).as_posix()}"
@@ -0,0 +1,213 @@
+"""
+Incremental JSON reader for very large lock files
+"""
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, IO, Iterator, Sequence, Tuple
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+_SCALAR_END = re.compile(r'[,}\]\s]')
+
+_DECODER = json.JSONDecoder()
+
+
+class JsonStreamReader:
+    """
+    Pull-style JSON reader with bounded memory
+
+    The document is read in chunks and only the value currently being
+    decoded is held in memory, so walking the ``packages`` map of an 80 MB
+    lock file never builds the whole object tree. Objects are traversed with
+    ``iter_keys``; after each key the caller must consume the value with
+    ``read_value``, ``skip_value`` or a nested ``iter_keys``/``iter_array``::
+
+        reader = JsonStreamReader(f)
+        for key in reader.iter_keys():
+            if key == 'packages':
+                for name in reader.iter_keys():
+                    entry = reader.read_value()
+            else:
+                reader.skip_value()
+    """
+
+    def __init__(self, fp: IO[str], chunk_size: int = 1 << 16):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def iter_keys(self) -> Iterator[str]:
+        """Iterate the keys of the object at the current position"""
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self._read_string()
+            self._expect(':')
+            yield key
+            ch = self._peek()
+            self._pos += 1
+            if ch == '}':
+                return
+            if ch != ',':
+                raise ValueError(f"Expected ',' or '}}' in JSON object, got {ch!r}")
+
+    def iter_array(self) -> Iterator[None]:
+        """Iterate the elements of the array at the current position"""
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield None
+            ch = self._peek()
+            self._pos += 1
+            if ch == ']':
+                return
+            if ch != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {ch!r}")
+
+    def iter_items(self, path: Sequence[str] = ()) -> Iterator[Tuple[str, Any]]:
+        """
+        Yield decoded (key, value) pairs of the object found at ``path``
+
+        Args:
+            path: Keys leading from the root object to the target object;
+                  an empty path iterates the root object itself
+        """
+        if not path:
+            for key in self.iter_keys():
+                yield key, self.read_value()
+            return
+        for key in self.iter_keys():
+            if key == path[0] and self._peek() == '{':
+                yield from self.iter_items(path[1:])
+            else:
+                self.skip_value()
+
+    def peek(self) -> str:
+        """Return the next significant character without consuming it ('' at EOF)"""
+        return self._peek()
+
+    def read_value(self) -> Any:
+        """Decode the value at the current position"""
+        if self._peek() not in '{["':
+            # Buffer the whole scalar so a number is not cut at a chunk boundary
+            while _SCALAR_END.search(self._buf, self._pos) is None and self._fill():
+                pass
+        while True:
+            try:
+                value, self._pos = _DECODER.raw_decode(self._buf, self._pos)
+                return value
+            except json.JSONDecodeError:
+                # Most likely the value continues in the next chunk
+                if not self._fill():
+                    raise
+
+    def skip_value(self):
+        """Advance past the value at the current position without decoding it"""
+        self._peek()
+        self._scan_value()
+
+    def _fill(self) -> bool:
+        """Read the next chunk, discarding consumed input. Returns False at EOF."""
+        if self._eof:
+            return False
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character ('' at EOF)"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, expected: str):
+        ch = self._peek()
+        if ch != expected:
+            raise ValueError(f"Expected {expected!r} in JSON, got {ch!r}")
+        self._pos += 1
+
+    def _read_string(self) -> str:
+        """Decode the string at the current position"""
+        if self._peek() != '"':
+            raise ValueError(f"Expected string in JSON, got {self._buf[self._pos:self._pos + 1]!r}")
+        while True:
+            try:
+                value, end = scanstring(self._buf, self._pos + 1)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            self._pos = end
+            return value
+
+    def _scan_string_tail(self):
+        """Advance past the closing quote of a string whose opening quote was consumed"""
+        while True:
+            match = _STRING_SPECIAL.search(self._buf, self._pos)
+            if match is None:
+                self._pos = len(self._buf)
+                if not self._fill():
+                    raise ValueError("Unterminated string in JSON")
+                continue
+            if match.group() == '"':
+                self._pos = match.end()
+                return
+            # Backslash escape: make sure the escaped character is buffered
+            if match.end() >= len(self._buf):
+                self._pos = match.start()
+                if not self._fill():
+                    raise ValueError("Unterminated string in JSON")
+                continue
+            self._pos = match.end() + 1
+
+    def _scan_value(self):
+        """Advance past one complete value (scalar, string, object or array)"""
+        ch = self._buf[self._pos] if self._pos < len(self._buf) else ''
+        if ch == '"':
+            self._pos += 1
+            self._scan_string_tail()
+            return
+        if ch not in '{[':
+            while True:
+                match = _SCALAR_END.search(self._buf, self._pos)
+                if match is not None:
+                    self._pos = match.start()
+                    return
+                self._pos = len(self._buf)
+                if not self._fill():
+                    return
+
+        depth = 0
+        while True:
+            match = _STRUCTURAL.search(self._buf, self._pos)
+            if match is None:
+                self._pos = len(self._buf)
+                if not self._fill():
+                    raise ValueError("Unexpected end of JSON document")
+                continue
+            self._pos = match.end()
+            token = match.group()
+            if token == '"':
+                self._scan_string_tail()
+            elif token in '{[':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
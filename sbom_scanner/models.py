@@ -1,10 +1,33 @@
 """
 Data models for dependency information
 """
-from dataclasses import dataclass, field
-from typing import Optional, List, Set
+import sys
+from dataclasses import dataclass, field, fields
+from typing import Optional, List, Set, Tuple
 from enum import Enum
 
+from packageurl import PackageURL
+
+from .purl import build_purl, normalize_purl
+
+
+def _slotted(cls):
+    """
+    Rebuild a dataclass with ``__slots__`` instead of a per-instance ``__dict__``
+    
+    Equivalent of ``@dataclass(slots=True)``, which needs Python 3.10.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names and key not in ('__dict__', '__weakref__')}
+    namespace['__slots__'] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern a string field, so equal values share one object across dependencies"""
+    return sys.intern(value) if type(value) is str else value
+
 
 class Ecosystem(Enum):
     """Supported package ecosystems"""
@@ -35,9 +58,16 @@ class DependencyType(Enum):
     DEV = "development"
 
 
+@_slotted
 @dataclass
 class Dependency:
-    """Represents a single dependency"""
+    """
+    Represents a single dependency
+    
+    Scans of large trees hold millions of dependencies, so instances have no
+    ``__dict__`` and the strings that repeat across them (names, versions,
+    source files, licenses, dependency purls) are interned.
+    """
     name: str
     version: str
     ecosystem: Ecosystem
@@ -48,6 +78,47 @@ class Dependency:
     license: Optional[str] = None
     homepage: Optional[str] = None
     confidence: float = 1.0  # 0.0 to 1.0, helps filter false positives
+    depends_on: Optional[Tuple[str, ...]] = None  # purls of resolved dependencies (lock files)
+    # Computed on first use; dependencies are hashed by value, so they are never mutated
+    _canonical_purl: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _package_url: Optional[PackageURL] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.name = _intern(self.name)
+        self.version = _intern(self.version)
+        self.purl = _intern(self.purl)
+        self.source_file = _intern(self.source_file)
+        self.license = _intern(self.license)
+        if self.depends_on:
+            self.depends_on = tuple(_intern(purl) for purl in self.depends_on)
+        # Without a __dict__ the class-level defaults of init=False fields are gone
+        self._canonical_purl = None
+        self._package_url = None
+    
+    @property
+    def canonical_purl(self) -> Optional[str]:
+        """
+        Canonical form of ``purl``, shared by deduplication and BOM output
+        
+        Built from the ecosystem, name and version when the detector gave no
+        purl; None when the purl is invalid.
+        """
+        if self._canonical_purl is None:
+            try:
+                if self.purl:
+                    self._canonical_purl = normalize_purl(self.purl)
+                else:
+                    self._canonical_purl = build_purl(self.ecosystem.value, self.name, self.version)
+            except ValueError:
+                self._canonical_purl = ''
+        return self._canonical_purl or None
+    
+    @property
+    def package_url(self) -> Optional[PackageURL]:
+        """Typed PackageURL of canonical_purl, parsed on first use"""
+        if self._package_url is None and self.canonical_purl:
+            self._package_url = PackageURL.from_string(self.canonical_purl)
+        return self._package_url
     
     def __hash__(self):
         return hash((self.name, self.version, self.ecosystem.value))
@@ -58,8 +129,38 @@ class Dependency:
         return (self.name == other.name and 
                 self.version == other.version and 
                 self.ecosystem == other.ecosystem)
+    
+    def to_tuple(self) -> Tuple:
+        """Compact, picklable form used to ship results between processes"""
+        return (self.name, self.version, self.ecosystem.value, self.purl,
+                self.dependency_type.value, self.source_file, self.description,
+                self.license, self.homepage, self.confidence, self.depends_on,
+                self.canonical_purl)
+    
+    @classmethod
+    def from_tuple(cls, data: Tuple) -> 'Dependency':
+        """Rebuild a Dependency from to_tuple() output"""
+        (name, version, ecosystem, purl, dependency_type, source_file,
+         description, license, homepage, confidence, depends_on, canonical_purl) = data
+        dependency = cls(
+            name=name,
+            version=version,
+            ecosystem=Ecosystem(ecosystem),
+            purl=purl,
+            dependency_type=DependencyType(dependency_type),
+            source_file=source_file,
+            description=description,
+            license=license,
+            homepage=homepage,
+            confidence=confidence,
+            depends_on=tuple(depends_on) if depends_on is not None else None
+        )
+        # Share the purl string when it is already canonical, as computing it does
+        dependency._canonical_purl = dependency.purl if canonical_purl == purl else canonical_purl or ''
+        return dependency
 
 
+@_slotted
 @dataclass
 class ScanResult:
     """Result of scanning a project"""
@@ -0,0 +1,153 @@
+"""
+Parser backends for the manifest formats read by the detectors
+
+Each format has a stdlib implementation and optional faster ones that are
+used when installed (``orjson``, ``tomllib``, ``lxml``). The fastest
+available backend is selected at import time; ``set_backend`` switches it
+explicitly, e.g. for benchmarking.
+"""
+import codecs
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+try:
+    import toml
+except ImportError:
+    toml = None
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+PathLike = Union[str, Path]
+
+
+def _read_bytes(file_path: PathLike) -> bytes:
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+
+def _strip_bom(data: bytes) -> bytes:
+    """Drop a UTF-8 byte order mark, which Windows tools like to write"""
+    return data[len(codecs.BOM_UTF8):] if data.startswith(codecs.BOM_UTF8) else data
+
+
+def _lxml_parse(source: PathLike) -> ET.Element:
+    parser = lxml_etree.XMLParser(remove_comments=True, remove_pis=True, resolve_entities=False,
+                                  no_network=True, huge_tree=True)
+    try:
+        return lxml_etree.parse(str(source), parser).getroot()
+    except lxml_etree.XMLSyntaxError as e:
+        raise ET.ParseError(str(e)) from e
+
+
+def _lxml_iterparse(source: PathLike, events: Tuple[str, ...]) -> Iterator[Tuple[str, Any]]:
+    try:
+        yield from lxml_etree.iterparse(str(source), events=events, remove_comments=True,
+                                        remove_pis=True, resolve_entities=False,
+                                        no_network=True, huge_tree=True)
+    except lxml_etree.XMLSyntaxError as e:
+        raise ET.ParseError(str(e)) from e
+
+
+# format -> backend name -> implementation, fastest first
+JSON_BACKENDS: Dict[str, Callable[[bytes], Any]] = {}
+if orjson is not None:
+    JSON_BACKENDS['orjson'] = orjson.loads
+JSON_BACKENDS['json'] = json.loads
+
+TOML_BACKENDS: Dict[str, Callable[[str], dict]] = {}
+if tomllib is not None:
+    TOML_BACKENDS['tomllib'] = tomllib.loads
+if toml is not None:
+    TOML_BACKENDS['toml'] = toml.loads
+
+# (parse to root element, iterparse)
+XML_BACKENDS: Dict[str, Tuple[Callable, Callable]] = {}
+if lxml_etree is not None:
+    XML_BACKENDS['lxml'] = (_lxml_parse, _lxml_iterparse)
+XML_BACKENDS['xml.etree'] = (lambda source: ET.parse(source).getroot(),
+                             lambda source, events: ET.iterparse(source, events=events))
+
+_BACKENDS = {'json': JSON_BACKENDS, 'toml': TOML_BACKENDS, 'xml': XML_BACKENDS}
+
+# format -> selected backend name (None when no implementation is installed)
+_active: Dict[str, Any] = {kind: next(iter(backends), None) for kind, backends in _BACKENDS.items()}
+
+
+def available_backends(kind: str) -> List[str]:
+    """Names of the installed backends for a format ('json', 'toml', 'xml'), fastest first"""
+    return list(_BACKENDS[kind])
+
+
+def active_backend(kind: str) -> str:
+    """Name of the backend currently used for a format"""
+    return _active[kind]
+
+
+def set_backend(kind: str, name: str):
+    """Use a specific installed backend for a format"""
+    if name not in _BACKENDS[kind]:
+        raise ValueError(f"{kind} backend {name!r} is not available "
+                         f"(installed: {', '.join(_BACKENDS[kind]) or 'none'})")
+    _active[kind] = name
+
+
+def _backend(kind: str):
+    name = _active[kind]
+    if name is None:
+        raise ImportError(f"No {kind} parser available")
+    return _BACKENDS[kind][name]
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """Decode a JSON document"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    data = _strip_bom(data)
+    backend = _backend('json')
+    try:
+        return backend(data)
+    except ValueError:
+        if backend is json.loads:
+            raise
+        # Accept what the stdlib accepts (NaN, integers beyond 64 bits, ...)
+        return json.loads(data)
+
+
+def load_json(file_path: PathLike) -> Any:
+    """Read and decode a JSON file; errors are ``json.JSONDecodeError``"""
+    return loads_json(_read_bytes(file_path))
+
+
+def loads_toml(text: str) -> dict:
+    """Decode a TOML document; errors are ``ValueError`` subclasses"""
+    return _backend('toml')(text)
+
+
+def load_toml(file_path: PathLike) -> dict:
+    """Read and decode a TOML file"""
+    return loads_toml(_strip_bom(_read_bytes(file_path)).decode('utf-8'))
+
+
+def parse_xml(source: PathLike):
+    """Parse an XML file and return its root element; errors are ``ET.ParseError``"""
+    return _backend('xml')[0](source)
+
+
+def iterparse_xml(source: PathLike, events: Tuple[str, ...] = ('end',)) -> Iterator[Tuple[str, Any]]:
+    """Incrementally parse an XML file, like ``ET.iterparse``"""
+    return _backend('xml')[1](source, events)
@@ -0,0 +1,67 @@
+"""
+Package URL (purl) helpers
+"""
+import re
+
+from packageurl import PackageURL
+
+# Ecosystem value -> purl type; ecosystems not listed use "generic"
+PURL_TYPES = {
+    'npm': 'npm',
+    'pypi': 'pypi',
+    'maven': 'maven',
+    'gradle': 'maven',  # Gradle uses Maven repos
+    'composer': 'composer',
+    'nuget': 'nuget',
+    'gem': 'gem',
+    'cargo': 'cargo',
+    'golang': 'golang',
+    'conan': 'conan',
+    'vcpkg': 'vcpkg',
+    'cmake': 'generic',  # CMake deps are generic
+    'platformio': 'platformio',
+    'arduino': 'arduino',
+    'mbed': 'generic',  # Mbed uses generic type
+}
+
+# Types whose namespace and name packageurl lowercases
+_CASE_INSENSITIVE_TYPES = frozenset({'bitbucket', 'github', 'gitlab', 'pypi'})
+
+# A purl without qualifiers or subpath whose segments only use characters
+# that percent-encoding leaves alone, plus the "%40" of npm scopes (':' is
+# left to PackageURL, which may read it as a URL scheme)
+_SEGMENT = r'(?:[A-Za-z0-9._~-]|%40)+'
+_SIMPLE_PURL = re.compile(rf'pkg:([a-z0-9.-]+)/(?:{_SEGMENT}/)*({_SEGMENT})(?:@{_SEGMENT})?')
+
+def normalize_purl(purl: str) -> str:
+    """
+    Return the canonical form of a purl, as ``PackageURL.to_string`` writes it
+
+    Purls built by the detectors are almost always canonical already; those
+    are recognised with a single regular expression and returned unchanged,
+    and only the rest take the parse/rebuild round trip through PackageURL.
+
+    Raises:
+        ValueError: if the purl is invalid
+    """
+    match = _SIMPLE_PURL.fullmatch(purl)
+    if match is not None:
+        purl_type, name = match.groups()
+        if purl_type not in _CASE_INSENSITIVE_TYPES:
+            return purl
+        if purl == purl.lower() and not (purl_type == 'pypi' and '_' in name):
+            return purl
+    return PackageURL.from_string(purl).to_string()
+
+
+def build_purl(ecosystem: str, name: str, version: str) -> str:
+    """Canonical purl for a dependency that the detector gave none"""
+    purl_type = PURL_TYPES.get(ecosystem, 'generic')
+    version = version if version != "*" else None
+
+    # Handle Maven-style coordinates (group:artifact)
+    if purl_type == 'maven' and ':' in name:
+        parts = name.split(':')
+        return PackageURL(type=purl_type, namespace=parts[0], name=parts[1], version=version).to_string()
+    return PackageURL(type=purl_type, name=name, version=version).to_string()
+
@@ -1,9 +1,14 @@
 """
 Core scanner that orchestrates all detectors
 """
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
-from typing import List, Set, Optional
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Set, Optional, Tuple, Type
 from .models import ScanResult, Dependency
+from .file_index import DEFAULT_SKIP_DIRS, FileIndex
+from .cache import ParseCache
+from .incremental import ScanState
 from .detectors import (
     BaseDetector,
     NpmDetector,
@@ -24,18 +29,94 @@ from .detectors import (
 )
 
 
+# Result of running one detector: (dependencies or None if not detected, error)
+DetectorOutcome = Tuple[Optional[Set[Dependency]], Optional[Exception]]
+
+
+# Detector instances reused by each worker process across work units
+_worker_detectors: Dict[Type[BaseDetector], BaseDetector] = {}
+
+# Scanner configuration of the worker process, set by _init_worker
+_worker_config: Tuple = ()
+
+
+def _configure_detector(detector: BaseDetector, skip_dirs: FrozenSet[str],
+                        prefer_lockfiles: bool, parse_cache: Optional[ParseCache],
+                        file_index: Optional[FileIndex] = None):
+    """Apply the scanner configuration to a detector"""
+    detector.skip_dirs = skip_dirs
+    detector.prefer_lockfiles = prefer_lockfiles
+    detector.parse_cache = parse_cache
+    detector.set_file_index(file_index)
+
+
+def _init_worker(skip_dirs: FrozenSet[str], prefer_lockfiles: bool,
+                 parse_cache: Optional[ParseCache], file_index: Optional[FileIndex]):
+    """
+    Process pool initializer: receive the scan configuration once per worker
+    
+    The file index of the scan is shipped along, so parsers that look up
+    other manifests (e.g. the Maven reactor) do not walk the tree again.
+    """
+    global _worker_config
+    _worker_config = (skip_dirs, prefer_lockfiles, parse_cache, file_index)
+    _worker_detectors.clear()
+
+
+def _parse_work_unit(detector_class: Type[BaseDetector], parser_name: str,
+                     file_path: str, base_path: str) -> List[Tuple]:
+    """
+    Parse one manifest in a worker process
+    
+    Returns:
+        Dependencies in their compact Dependency.to_tuple() form
+    """
+    detector = _worker_detectors.get(detector_class)
+    if detector is None:
+        detector = _worker_detectors[detector_class] = detector_class()
+        _configure_detector(detector, *_worker_config)
+    dependencies = detector.parse_file(parser_name, Path(file_path), Path(base_path))
+    return [dep.to_tuple() for dep in dependencies]
+
+
 class Scanner:
     """Main scanner class that coordinates all language detectors"""
     
-    def __init__(self, min_confidence: float = 0.8):
+    def __init__(self, min_confidence: float = 0.8,
+                 skip_dirs: Optional[Iterable[str]] = None,
+                 max_workers: Optional[int] = None,
+                 max_processes: Optional[int] = None,
+                 parse_cache: Optional[ParseCache] = None,
+                 state_file: Optional[str] = None,
+                 prefer_lockfiles: bool = True):
         """
         Initialize scanner with all detectors
         
         Args:
             min_confidence: Minimum confidence threshold to include dependencies (0.0-1.0)
                           Higher values reduce false positives
+            skip_dirs: Directory names that are never descended into
+                       (defaults to DEFAULT_SKIP_DIRS)
+            max_workers: Number of detectors run concurrently on a thread pool
+                         (None lets the executor choose, 1 runs sequentially)
+            max_processes: Parse individual manifests on a process pool of this
+                           size (None parses inside the detector threads)
+            parse_cache: Persistent cache of per-manifest parse results
+                         (None disables caching)
+            state_file: Incremental scan state. Manifests whose size, mtime and
+                        inode are unchanged since the previous scan recorded in
+                        this file are not re-read (None disables incremental mode)
+            prefer_lockfiles: Skip a manifest when a lock file in the same
+                              directory supersedes it (e.g. package.json next
+                              to package-lock.json)
         """
         self.min_confidence = min_confidence
+        self.skip_dirs = frozenset(skip_dirs) if skip_dirs is not None else DEFAULT_SKIP_DIRS
+        self.max_workers = max_workers
+        self.max_processes = max_processes
+        self.parse_cache = parse_cache
+        self.state_file = state_file
+        self.prefer_lockfiles = prefer_lockfiles
         self.detectors: List[BaseDetector] = [
             NpmDetector(),
             PythonDetector(),
@@ -53,6 +134,8 @@ class Scanner:
             ArduinoDetector(),
             MbedDetector(),
         ]
+        for detector in self.detectors:
+            _configure_detector(detector, self.skip_dirs, self.prefer_lockfiles, self.parse_cache)
     
     def scan(self, path: str, project_name: Optional[str] = None, 
              project_version: Optional[str] = None) -> ScanResult:
@@ -67,6 +150,37 @@ class Scanner:
         Returns:
             ScanResult containing all discovered dependencies
         """
+        scan_path = self._resolve_scan_path(path)
+        result = self._new_result(scan_path, project_name, project_version)
+        
+        # Run all detectors
+        print(f"Scanning project: {result.project_name} at {scan_path}")
+        
+        # Walk the tree once and share the result with every detector
+        file_index = self._build_file_index(scan_path)
+        for detector in self.detectors:
+            detector.set_file_index(file_index)
+        
+        scan_state = ScanState.load(self.state_file) if self.state_file else None
+        
+        with self._create_process_pool(file_index) as process_pool:
+            # Merge in detector order so results do not depend on thread timing
+            outcomes = self._run_detectors(scan_path, process_pool, scan_state)
+            for detector, outcome in outcomes:
+                self._merge_outcome(result, detector, outcome)
+        
+        if self.parse_cache is not None:
+            self.parse_cache.prune()
+        
+        if scan_state is not None:
+            scan_state.save()
+        
+        self._finalize_result(result)
+        
+        return result
+    
+    def _resolve_scan_path(self, path: str) -> Path:
+        """Resolve and validate the directory to scan"""
         scan_path = Path(path).resolve()
         
         if not scan_path.exists():
@@ -75,52 +189,157 @@ class Scanner:
         if not scan_path.is_dir():
             raise ValueError(f"Path is not a directory: {scan_path}")
         
+        return scan_path
+    
+    def _new_result(self, scan_path: Path, project_name: Optional[str] = None,
+                    project_version: Optional[str] = None) -> ScanResult:
+        """Create an empty ScanResult for the project at scan_path"""
         # Determine project name
         if project_name is None:
             project_name = scan_path.name
         
-        # Create result object
-        result = ScanResult(
+        return ScanResult(
             project_name=project_name,
             project_version=project_version or "1.0.0",
             scan_path=str(scan_path)
         )
+    
+    def _merge_outcome(self, result: ScanResult, detector: BaseDetector,
+                       outcome: DetectorOutcome, report: bool = True):
+        """Add one detector's outcome (dependencies or error) to the result"""
+        dependencies, error = outcome
+        detector_name = detector.__class__.__name__
         
-        # Run all detectors
-        print(f"Scanning project: {project_name} at {scan_path}")
-        
-        for detector in self.detectors:
-            detector_name = detector.__class__.__name__
-            
-            try:
-                if detector.detect(scan_path):
-                    print(f"  [+] Detected {detector_name}")
-                    dependencies = detector.parse(scan_path)
-                    
-                    # Filter by confidence threshold
-                    filtered_deps = {
-                        dep for dep in dependencies 
-                        if dep.confidence >= self.min_confidence
-                    }
-                    
-                    if filtered_deps:
-                        print(f"    Found {len(filtered_deps)} dependencies")
-                        for dep in filtered_deps:
-                            result.add_dependency(dep)
-                    else:
-                        print(f"    No dependencies found (after confidence filtering)")
-            
-            except Exception as e:
-                error_msg = f"Error in {detector_name}: {str(e)}"
+        if error is not None:
+            error_msg = f"Error in {detector_name}: {str(error)}"
+            if report:
                 print(f"  [X] {error_msg}")
-                result.add_error(error_msg)
+            result.add_error(error_msg)
+            return
+        
+        if dependencies is None:
+            return
         
+        if report:
+            print(f"  [+] Detected {detector_name}")
+        
+        # Filter by confidence threshold
+        filtered_deps = {
+            dep for dep in dependencies 
+            if dep.confidence >= self.min_confidence
+        }
+        
+        if filtered_deps:
+            if report:
+                print(f"    Found {len(filtered_deps)} dependencies")
+            for dep in filtered_deps:
+                result.add_dependency(dep)
+        elif report:
+            print(f"    No dependencies found (after confidence filtering)")
+    
+    def _finalize_result(self, result: ScanResult, report: bool = True):
+        """Deduplicate the merged dependencies"""
         # Remove duplicates and apply additional false positive reduction
         result.dependencies = self._reduce_false_positives(result.dependencies)
         
-        print(f"\nTotal unique dependencies found: {len(result.dependencies)}")
+        if report:
+            print(f"\nTotal unique dependencies found: {len(result.dependencies)}")
+    
+    def _create_process_pool(self, file_index: Optional[FileIndex] = None):
+        """Return a ProcessPoolExecutor context, or a null context when disabled"""
+        if not self.max_processes:
+            return nullcontext()
+        return ProcessPoolExecutor(
+            max_workers=self.max_processes, initializer=_init_worker,
+            initargs=(self.skip_dirs, self.prefer_lockfiles, self.parse_cache, file_index)
+        )
+    
+    def _run_detectors(self, scan_path: Path,
+                       process_pool: Optional[Executor] = None,
+                       scan_state: Optional[ScanState] = None
+                       ) -> Iterator[Tuple[BaseDetector, DetectorOutcome]]:
+        """
+        Run every detector, concurrently when max_workers allows it
         
-        return result
+        Yields:
+            (detector, outcome) pairs in self.detectors order
+        """
+        if self.max_workers == 1:
+            for detector in self.detectors:
+                yield detector, self._run_detector(detector, scan_path, process_pool, scan_state)
+            return
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='sbom-detector') as executor:
+            futures = [
+                executor.submit(self._run_detector, detector, scan_path,
+                                process_pool, scan_state)
+                for detector in self.detectors
+            ]
+            for detector, future in zip(self.detectors, futures):
+                yield detector, future.result()
+    
+    def _run_detector(self, detector: BaseDetector, scan_path: Path,
+                      process_pool: Optional[Executor] = None,
+                      scan_state: Optional[ScanState] = None) -> DetectorOutcome:
+        """
+        Detect and parse with a single detector, isolating its failures
+        
+        Returns:
+            (dependencies, error) - dependencies is None when the detector
+            does not apply, error is the exception raised by the detector
+        """
+        try:
+            if not detector.detect(scan_path):
+                return None, None
+            return self._parse_work_units(detector, scan_path, process_pool, scan_state), None
+        except Exception as e:
+            return None, e
+    
+    def _parse_work_units(self, detector: BaseDetector, scan_path: Path,
+                          process_pool: Optional[Executor],
+                          scan_state: Optional[ScanState]) -> Set[Dependency]:
+        """
+        Parse each of the detector's manifests as a separate work unit
+        
+        Units unchanged since the previous incremental scan are reused,
+        the rest run inline or on the process pool.
+        """
+        units = detector.get_work_units(scan_path)
+        stat_keys = []
+        outputs = []
+        for parser_name, file_path in units:
+            stat_key, reused = None, None
+            if scan_state is not None:
+                stat_key, reused = scan_state.reuse(detector, parser_name, file_path, scan_path)
+            stat_keys.append(stat_key)
+            
+            if reused is not None:
+                outputs.append(reused)
+            elif process_pool is not None:
+                outputs.append(process_pool.submit(
+                    _parse_work_unit, type(detector), parser_name,
+                    str(file_path), str(scan_path)
+                ))
+            else:
+                outputs.append(detector.parse_file(parser_name, file_path, scan_path))
+        
+        # Merge in work-unit order, matching BaseDetector.parse
+        dependencies = set()
+        for (parser_name, file_path), stat_key, output in zip(units, stat_keys, outputs):
+            if isinstance(output, Future):
+                output = {Dependency.from_tuple(data) for data in output.result()}
+            if scan_state is not None:
+                scan_state.record(detector, parser_name, file_path, scan_path, stat_key, output)
+            dependencies.update(output)
+        return detector.finalize(dependencies, scan_path)
+    
+    def _build_file_index(self, scan_path: Path) -> FileIndex:
+        """Build the shared file index for all detector manifest patterns"""
+        patterns = set()
+        for detector in self.detectors:
+            patterns.update(detector.get_index_patterns())
+        return FileIndex.build(scan_path, patterns, skip_dirs=self.skip_dirs)
     
     def _reduce_false_positives(self, dependencies: Set[Dependency]) -> Set[Dependency]:
         """
@@ -128,33 +347,23 @@ class Scanner:
         
         Strategies:
         1. Remove dependencies with very low confidence
-        2. Deduplicate by name+version+ecosystem
+        2. Deduplicate by ecosystem and canonical purl (case-insensitive),
+           so spellings of the same package version are merged
         3. Filter out common false positives (if needed)
         """
         # Dependencies are already in a set, which handles basic deduplication
         # Additional filtering can be added here
         
-        filtered = set()
-        seen = {}
+        best = {}
         
         for dep in dependencies:
-            key = (dep.name.lower(), dep.ecosystem)
+            purl = dep.canonical_purl or f"{dep.name}@{dep.version}"
+            key = (dep.ecosystem, purl.lower())
             
-            # If we've seen this package before, keep the one with higher confidence
-            if key in seen:
-                existing = seen[key]
-                # If versions match, keep higher confidence
-                if dep.version == existing.version:
-                    if dep.confidence > existing.confidence:
-                        filtered.remove(existing)
-                        filtered.add(dep)
-                        seen[key] = dep
-                else:
-                    # Different versions, keep both
-                    filtered.add(dep)
-            else:
-                filtered.add(dep)
-                seen[key] = dep
+            # If we've seen this package version before, keep the one with higher confidence
+            existing = best.get(key)
+            if existing is None or dep.confidence > existing.confidence:
+                best[key] = dep
         
-        return filtered
+        return set(best.values())
 
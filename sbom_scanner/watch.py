@@ -0,0 +1,407 @@
+"""
+Watch mode: keep a scan result up to date as manifest files change
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .file_index import FileIndex, walk_files
+from .incremental import ScanState
+from .models import ScanResult
+
+
+class WatchSession:
+    """
+    Long-lived scan of one project that re-parses only what changed
+
+    ``start`` performs a full scan. ``apply_changes`` then takes the paths
+    reported by a watcher, updates the shared FileIndex, and re-runs only the
+    detectors whose manifest patterns match; within those detectors every
+    unchanged manifest is reused and only the affected ``_parse_*`` work
+    units run again. Files the detectors read inside skipped directories
+    (``vendor/modules.txt``, ``obj/project.assets.json``, ...) are followed
+    as well, see ``get_watch_files``.
+    """
+
+    def __init__(self, scanner, path: str, project_name: Optional[str] = None,
+                 project_version: Optional[str] = None):
+        self.scanner = scanner
+        self.scan_path = scanner._resolve_scan_path(path)
+        self.project_name = project_name
+        self.project_version = project_version
+        self.file_index: Optional[FileIndex] = None
+        self.scan_state = ScanState()
+        self._outcomes: Dict[int, tuple] = {}
+
+    def start(self) -> ScanResult:
+        """Run the initial full scan"""
+        print(f"Scanning project: {self.project_name or self.scan_path.name} at {self.scan_path}")
+
+        self.file_index = self.scanner._build_file_index(self.scan_path)
+        for detector in self.scanner.detectors:
+            detector.set_file_index(self.file_index)
+
+        outcomes = self.scanner._run_detectors(self.scan_path, None, self.scan_state)
+        for position, (_, outcome) in enumerate(outcomes):
+            self._outcomes[position] = outcome
+        self.scan_state.commit()
+
+        return self._build_result(report=True)
+
+    def get_watch_patterns(self) -> Set[str]:
+        """Return every manifest pattern any detector cares about"""
+        patterns = set()
+        for detector in self.scanner.detectors:
+            patterns.update(detector.get_index_patterns())
+        return patterns
+
+    def get_watch_files(self) -> Set[Path]:
+        """
+        Return the files read by detectors inside skipped directories
+
+        Watchers do not descend into skipped directories, so these have to be
+        watched individually. The set grows as rescans read new files.
+        """
+        return {path for path in self.scan_state.read_files()
+                if self._in_project(path) and self._in_skipped_dir(path)}
+
+    def apply_changes(self, paths: Iterable[Path]) -> Optional[ScanResult]:
+        """
+        Update the result for created, modified, moved or deleted paths
+
+        Returns:
+            The new ScanResult, or None if no detector was affected
+        """
+        changed_files = set()
+        readers = set()
+        for path in paths:
+            path = Path(path)
+            if not self._in_project(path):
+                continue
+            # Detectors that read the path (or files below it) as a work
+            # unit or unit input, including files in skipped directories
+            readers.update(self._readers_under(path))
+            if self._in_skipped_dir(path):
+                continue
+            # Whatever was indexed at (or below) this path may be gone now
+            changed_files.update(self.file_index.remove_under(path))
+            if path.is_dir():
+                for dirpath, filename in walk_files(path, self.scanner.skip_dirs):
+                    file_path = Path(dirpath) / filename
+                    if self.file_index.add(file_path):
+                        changed_files.add(file_path)
+            elif path.is_file() and self.file_index.add(path):
+                changed_files.add(path)
+
+        affected = set()
+        for file_path in changed_files:
+            self.scan_state.invalidate(file_path, self.scan_path)
+            for position, detector in enumerate(self.scanner.detectors):
+                if any(FileIndex.matches(pattern, file_path.name)
+                       for pattern in detector.get_index_patterns()):
+                    affected.add(position)
+        for position, detector in enumerate(self.scanner.detectors):
+            if detector.__class__.__name__ in readers:
+                affected.add(position)
+
+        if not affected:
+            return None
+
+        for position in sorted(affected):
+            detector = self.scanner.detectors[position]
+            self._outcomes[position] = self.scanner._run_detector(
+                detector, self.scan_path, None, self.scan_state
+            )
+        self.scan_state.commit()
+
+        return self._build_result(report=False)
+
+    def _build_result(self, report: bool) -> ScanResult:
+        """Merge the per-detector outcomes into a fresh ScanResult"""
+        result = self.scanner._new_result(self.scan_path, self.project_name, self.project_version)
+        for position, detector in enumerate(self.scanner.detectors):
+            self.scanner._merge_outcome(result, detector, self._outcomes[position], report=report)
+        self.scanner._finalize_result(result, report=report)
+        return result
+
+    def _in_project(self, path: Path) -> bool:
+        try:
+            path.relative_to(self.scan_path)
+        except ValueError:
+            return False
+        return True
+
+    def _in_skipped_dir(self, path: Path) -> bool:
+        relative = path.relative_to(self.scan_path)
+        return any(part in self.scanner.skip_dirs for part in relative.parts)
+
+    def _readers_under(self, path: Path) -> Set[str]:
+        """Names of the detectors reading ``path`` or, for a directory, a file below it"""
+        readers = self.scan_state.readers(path)
+        for file_path in self.scan_state.read_files():
+            if path in file_path.parents:
+                readers.update(self.scan_state.readers(file_path))
+        return readers
+
+
+class PollingWatcher:
+    """Portable watcher that re-stats every manifest on a fixed interval"""
+
+    def __init__(self, root: Path, skip_dirs: FrozenSet[str], patterns: Iterable[str],
+                 interval: float = 1.0):
+        self.root = root
+        self.skip_dirs = skip_dirs
+        self.patterns = list(patterns)
+        self.interval = interval
+        self._files: Set[Path] = set()
+        self._snapshot = self._take_snapshot()
+
+    def wait(self) -> Set[Path]:
+        """Sleep one interval and return the manifests that changed"""
+        time.sleep(self.interval)
+        snapshot = self._take_snapshot()
+        changed = {
+            path for path in snapshot.keys() | self._snapshot.keys()
+            if snapshot.get(path) != self._snapshot.get(path)
+        }
+        self._snapshot = snapshot
+        return changed
+
+    def watch_files(self, paths: Iterable[Path]):
+        """Also stat these files, which may lie in skipped directories"""
+        new_files = set(paths) - self._files
+        self._files.update(new_files)
+        for path in new_files:
+            stat = self._stat(path)
+            if stat is not None:
+                self._snapshot[path] = stat
+
+    def close(self):
+        pass
+
+    def _take_snapshot(self) -> Dict[Path, Tuple[int, int, int]]:
+        """Stat every manifest under the root and every watched file"""
+        index = FileIndex.build(self.root, self.patterns, skip_dirs=self.skip_dirs)
+        paths = set(self._files)
+        for pattern in self.patterns:
+            paths.update(index.lookup(pattern))
+
+        snapshot = {}
+        for path in paths:
+            stat = self._stat(path)
+            if stat is not None:
+                snapshot[path] = stat
+        return snapshot
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+
+class InotifyWatcher:
+    """Linux inotify watcher covering every non-skipped directory of the tree"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+                  IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+
+    _EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, root: Path, skip_dirs: FrozenSet[str], debounce: float = 0.1,
+                 timeout: float = 1.0):
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+
+        self.root = root
+        self.skip_dirs = skip_dirs
+        self.debounce = debounce
+        self.timeout = timeout
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._directories: Dict[int, Path] = {}
+        # Watched files inside skipped directories, and the skipped
+        # directories leading to them, which are watched without recursion
+        self._files: Set[Path] = set()
+        self._file_dirs: Set[Path] = set()
+
+        try:
+            self._watch_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def wait(self) -> Set[Path]:
+        """Block until events arrive, then collect a debounced batch of changed paths"""
+        changed: Set[Path] = set()
+        readable, _, _ = select.select([self._fd], [], [], self.timeout)
+        while readable:
+            changed.update(self._read_events())
+            readable, _, _ = select.select([self._fd], [], [], self.debounce)
+        return changed
+
+    def watch_files(self, paths: Iterable[Path]):
+        """Watch these files although they lie in skipped directories"""
+        for path in set(paths) - self._files:
+            try:
+                parts = path.relative_to(self.root).parts[:-1]
+            except ValueError:
+                continue
+            self._files.add(path)
+            skipped = next((i for i, part in enumerate(parts) if part in self.skip_dirs), None)
+            if skipped is None:
+                continue
+            for depth in range(skipped + 1, len(parts) + 1):
+                directory = self.root.joinpath(*parts[:depth])
+                if directory not in self._file_dirs:
+                    self._file_dirs.add(directory)
+                    if directory.is_dir():
+                        self._add_watch(directory)
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _watch_tree(self, directory: Path):
+        """Add a watch to ``directory`` and every non-skipped directory below it"""
+        self._add_watch(directory)
+        stack = [str(directory)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if (entry.is_dir(follow_symlinks=False) and
+                                entry.name not in self.skip_dirs):
+                            self._add_watch(Path(entry.path))
+                            stack.append(entry.path)
+            except OSError:
+                continue
+
+    def _add_watch(self, directory: Path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(directory)),
+                                          self.WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            # The directory vanished before we got to it; nothing to watch
+            if error in (errno.ENOENT, errno.ENOTDIR):
+                return
+            raise OSError(error, f"inotify_add_watch({directory}): {os.strerror(error)}")
+        self._directories[wd] = directory
+
+    def _rewatch(self, directory: Path) -> List[Path]:
+        """
+        Watch a re-created directory on the way to watched files
+
+        Returns:
+            The watched files that already exist below it
+        """
+        for file_dir in sorted(self._file_dirs):
+            if (file_dir == directory or directory in file_dir.parents) and file_dir.is_dir():
+                self._add_watch(file_dir)
+        return [path for path in self._files if directory in path.parents and path.is_file()]
+
+    def _read_events(self) -> List[Path]:
+        """Decode pending inotify events into the paths they refer to"""
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        paths = []
+        offset = 0
+        while offset + self._EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = self._EVENT_HEADER.unpack_from(data, offset)
+            offset += self._EVENT_HEADER.size
+            name = data[offset:offset + length].split(b'\0', 1)[0]
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                # Events were dropped; report the whole tree as changed
+                paths.append(self.root)
+                continue
+
+            directory = self._directories.get(wd)
+            if directory is None:
+                continue
+            if mask & self.IN_IGNORED:
+                del self._directories[wd]
+                continue
+            if mask & self.IN_DELETE_SELF:
+                paths.append(directory)
+                continue
+
+            path = directory / os.fsdecode(name)
+            if mask & self.IN_ISDIR:
+                if path.name in self.skip_dirs or directory in self._file_dirs:
+                    # Only the way to watched files is followed in here
+                    if path in self._file_dirs and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        paths.extend(self._rewatch(path))
+                    continue
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    try:
+                        self._watch_tree(path)
+                    except OSError as e:
+                        print(f"Warning: Could not watch {path}: {e}")
+            elif mask & self.IN_CREATE:
+                # Contents follow with IN_CLOSE_WRITE
+                continue
+            paths.append(path)
+        return paths
+
+
+def create_watcher(root: Path, skip_dirs: FrozenSet[str], patterns: Iterable[str],
+                   poll_interval: float = 1.0):
+    """Return an inotify watcher when possible, falling back to polling"""
+    try:
+        return InotifyWatcher(root, skip_dirs)
+    except (OSError, AttributeError) as e:
+        print(f"Note: inotify unavailable ({e}); polling every {poll_interval}s")
+        return PollingWatcher(root, skip_dirs, patterns, interval=poll_interval)
+
+
+def watch(session: WatchSession, on_update: Callable[[ScanResult, Set[Path]], None],
+          poll_interval: float = 1.0, should_stop: Optional[Callable[[], bool]] = None):
+    """
+    Observe the session's project and call ``on_update`` after every relevant change
+
+    Runs until ``should_stop`` returns True or the process is interrupted.
+    """
+    watcher = create_watcher(session.scan_path, session.scanner.skip_dirs,
+                             session.get_watch_patterns(), poll_interval)
+    try:
+        watcher.watch_files(session.get_watch_files())
+        while should_stop is None or not should_stop():
+            changed = watcher.wait()
+            if not changed:
+                continue
+            result = session.apply_changes(changed)
+            if result is not None:
+                watcher.watch_files(session.get_watch_files())
+                on_update(result, changed)
+    finally:
+        watcher.close()
@@ -0,0 +1,97 @@
+"""
+Streaming extraction of elements from large XML manifests
+"""
+import os
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Iterable, Iterator, Set, Tuple, Union
+
+from .parsers import iterparse_xml, parse_xml
+
+# Local element names from the document root (exclusive) down to an element
+ElementPath = Tuple[str, ...]
+
+# Files smaller than this are parsed into a tree in one go, which is faster
+# than streaming when memory is no concern
+STREAMING_THRESHOLD = 1 << 20
+
+
+def local_name(tag: str) -> str:
+    """Strip the XML namespace from an element tag"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def iter_elements(source: Union[str, Path], paths: Iterable[ElementPath]) -> Iterator[Tuple[ElementPath, ET.Element]]:
+    """
+    Stream the elements found at ``paths`` below the document root
+
+    Files of STREAMING_THRESHOLD bytes or more are read with ``iterparse``
+    (of the active XML backend, see ``parsers``) and every element is
+    discarded as soon as it has been closed, so peak memory is bounded by
+    the largest requested element rather than by the document, and no tree
+    is searched afterwards. Subtrees that cannot contain a requested element
+    (build plugins, targets, ...) are only counted through, without looking
+    at their tags. Namespaces are ignored, so
+    ``('dependencies', 'dependency')`` matches both plain and namespaced
+    POMs. Requested paths must not be nested in one another.
+
+    Yields:
+        (path, element) for each match in document order. The element is
+        complete (children included) but is cleared once the caller moves on.
+    """
+    targets = set(paths)
+    prefixes = {path[:i] for path in targets for i in range(1, len(path))}
+
+    if os.path.getsize(source) < STREAMING_THRESHOLD:
+        yield from _walk(parse_xml(source), (), targets, prefixes)
+        return
+
+    path: ElementPath = ()
+    open_elements = []  # root and the open elements on the way to a requested path
+    subtree_depth = 0   # nesting inside the subtree currently being passed through
+    subtree_requested = False
+
+    for event, element in iterparse_xml(source, events=('start', 'end')):
+        if subtree_depth:
+            if event == 'start':
+                subtree_depth += 1
+                continue
+            subtree_depth -= 1
+            if subtree_depth:
+                if not subtree_requested:
+                    element.clear()
+                continue
+            if subtree_requested:
+                yield path, element
+            path = path[:-1]
+        elif event == 'start':
+            if open_elements:
+                path += (local_name(element.tag),)
+                if path not in prefixes:
+                    subtree_depth = 1
+                    subtree_requested = path in targets
+                    continue
+            open_elements.append(element)
+            continue
+        else:
+            open_elements.pop()
+            if not open_elements:
+                return
+            path = path[:-1]
+
+        # Release the finished element; it is always its parent's last child
+        element.clear()
+        parent = open_elements[-1]
+        if len(parent) and parent[-1] is element:
+            del parent[-1]
+
+
+def _walk(element: ET.Element, path: ElementPath, targets: Set[ElementPath],
+          prefixes: Set[ElementPath]) -> Iterator[Tuple[ElementPath, ET.Element]]:
+    """Yield the requested descendants of a parsed element, descending only along requested paths"""
+    for child in element:
+        child_path = path + (local_name(child.tag),)
+        if child_path in targets:
+            yield child_path, child
+        elif child_path in prefixes:
+            yield from _walk(child, child_path, targets, prefixes)
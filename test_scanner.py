@@ -64,14 +64,11 @@ def test_example_project():
         print(f"\n🔄 Generating CycloneDX BOM...")
         generator = CycloneDXGenerator()
         
-        # Generate JSON
+        # Generate JSON and XML from one component list
         json_output = "test-output.json"
-        generator.save_to_file(result, json_output, "json")
-        print(f"   ✅ JSON BOM saved to: {json_output}")
-        
-        # Generate XML
         xml_output = "test-output.xml"
-        generator.save_to_file(result, xml_output, "xml")
+        generator.save_many(result, {"json": json_output, "xml": xml_output})
+        print(f"   ✅ JSON BOM saved to: {json_output}")
         print(f"   ✅ XML BOM saved to: {xml_output}")
         
         # Verify expected dependencies
@@ -157,6 +154,1024 @@ def test_detectors():
         return False
 
 
+def test_file_index():
+    """Test that the shared file index matches a recursive search"""
+    print("\n" + "=" * 60)
+    print("Testing Shared File Index")
+    print("=" * 60)
+    
+    try:
+        from pathlib import Path
+        from sbom_scanner.file_index import FileIndex
+        from sbom_scanner.detectors import CMakeDetector
+        
+        examples_path = Path(os.path.dirname(os.path.abspath(__file__))) / "examples"
+        patterns = ['requirements.txt', 'go.mod', 'CMakeLists.txt', '*.ini']
+        index = FileIndex.build(examples_path, patterns)
+        
+        for pattern in patterns:
+            expected = sorted(examples_path.rglob(pattern))
+            found = sorted(index.lookup(pattern))
+            if found != expected:
+                print(f"\n❌ Index mismatch for {pattern}: {found} != {expected}")
+                return False
+            print(f"   ✓ {pattern:18s} - {len(found)} file(s)")
+        
+        detector = CMakeDetector()
+        detector.set_file_index(index)
+        if not detector.detect(examples_path):
+            print(f"\n❌ Detector did not use the file index")
+            return False
+        
+        # Skipped directories must be pruned during the walk
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            (tmp_path / "app").mkdir()
+            (tmp_path / "app" / "package.json").write_text("{}")
+            (tmp_path / "node_modules" / "left-pad").mkdir(parents=True)
+            (tmp_path / "node_modules" / "left-pad" / "package.json").write_text("{}")
+            
+            pruned = FileIndex.build(tmp_path, ['package.json']).lookup('package.json')
+            if pruned != [tmp_path / "app" / "package.json"]:
+                print(f"\n❌ Walker descended into a skipped directory: {pruned}")
+                return False
+            print(f"   ✓ node_modules pruned during walk")
+        
+        print(f"\n✅ File index lookups match recursive search")
+        return True
+    
+    except Exception as e:
+        print(f"\n❌ Error testing file index: {e}")
+        return False
+
+
+def test_parallel_scan():
+    """Test that parallel detector and parse execution match a sequential scan"""
+    print("\n" + "=" * 60)
+    print("Testing Parallel Detector Execution")
+    print("=" * 60)
+    
+    try:
+        example_path = os.path.join(os.path.dirname(__file__), "examples")
+        
+        sequential = Scanner(max_workers=1).scan(example_path)
+        parallel = Scanner(max_workers=4).scan(example_path)
+        multiprocess = Scanner(max_workers=4, max_processes=2).scan(example_path)
+        
+        for label, other in [("Parallel", parallel), ("Multi-process", multiprocess)]:
+            if sequential.dependencies != other.dependencies:
+                print(f"\n❌ {label} scan returned different dependencies")
+                return False
+            if sequential.errors != other.errors:
+                print(f"\n❌ {label} scan returned different errors")
+                return False
+        
+        # Worker processes get the scanner configuration and file index:
+        # a parent POM in a custom skip dir must not be found by them either
+        import tempfile
+        from pathlib import Path
+        with tempfile.TemporaryDirectory() as tmp:
+            project = Path(tmp)
+            (project / "third_party" / "parent").mkdir(parents=True)
+            (project / "third_party" / "parent" / "pom.xml").write_text(
+                '<project><modelVersion>4.0.0</modelVersion>'
+                '<groupId>com.example</groupId><artifactId>parent</artifactId><version>1.0</version>'
+                '<dependencyManagement><dependencies><dependency><groupId>org.slf4j</groupId>'
+                '<artifactId>slf4j-api</artifactId><version>2.0.9</version></dependency>'
+                '</dependencies></dependencyManagement></project>'
+            )
+            (project / "app").mkdir()
+            (project / "app" / "pom.xml").write_text(
+                '<project><modelVersion>4.0.0</modelVersion>'
+                '<parent><groupId>com.example</groupId><artifactId>parent</artifactId><version>1.0</version></parent>'
+                '<artifactId>app</artifactId><dependencies><dependency><groupId>org.slf4j</groupId>'
+                '<artifactId>slf4j-api</artifactId></dependency></dependencies></project>'
+            )
+            versions = [
+                {(dep.name, dep.version) for dep in Scanner(skip_dirs={"third_party"}, max_workers=1,
+                                                            max_processes=processes).scan(tmp).dependencies}
+                for processes in (None, 2)
+            ]
+        if versions != [{("org.slf4j:slf4j-api", "*")}] * 2:
+            print(f"\n❌ Skip dirs not honoured in worker processes: {versions}")
+            return False
+        print(f"   ✓ Worker processes honour custom skip dirs")
+        
+        print(f"\n✅ Parallel scans match sequential scan ({len(parallel.dependencies)} dependencies)")
+        return True
+    
+    except Exception as e:
+        print(f"\n❌ Error during parallel scan: {e}")
+        return False
+
+
+def test_parser_backends():
+    """Test that every parser backend yields the same results as the stdlib fallback"""
+    print("\n" + "=" * 60)
+    print("Testing Parser Backends")
+    print("=" * 60)
+    
+    try:
+        from sbom_scanner import parsers
+        
+        example_path = os.path.join(os.path.dirname(__file__), "examples")
+        default = Scanner(max_workers=1).scan(example_path)
+        
+        selected = {kind: parsers.active_backend(kind) for kind in ('json', 'toml', 'xml')}
+        try:
+            for kind in selected:
+                parsers.set_backend(kind, parsers.available_backends(kind)[-1])
+            fallback = Scanner(max_workers=1).scan(example_path)
+        finally:
+            for kind, name in selected.items():
+                parsers.set_backend(kind, name)
+        if fallback.dependencies != default.dependencies:
+            print(f"\n❌ Fallback parser backends returned different dependencies")
+            return False
+        print(f"   ✓ Parser backends {selected} match the stdlib fallbacks")
+        
+        if parsers.loads_json(b'\xef\xbb\xbf{"a": 1}') != {"a": 1}:
+            print(f"\n❌ JSON byte order mark not stripped")
+            return False
+        print(f"   ✓ JSON byte order mark stripped")
+        
+        print(f"\n✅ Parser backends consistent")
+        return True
+    
+    except Exception as e:
+        print(f"\n❌ Error testing parser backends: {e}")
+        return False
+
+
+def test_compact_dependencies():
+    """Test that dependencies use slots and share interned strings"""
+    print("\n" + "=" * 60)
+    print("Testing Compact Dependencies")
+    print("=" * 60)
+    
+    try:
+        example_path = os.path.join(os.path.dirname(__file__), "examples")
+        inline = Scanner(max_workers=1).scan(example_path)
+        # Dependencies shipped back from worker processes are rebuilt from tuples
+        multiprocess = Scanner(max_workers=1, max_processes=2).scan(example_path)
+        
+        if hasattr(inline, '__dict__'):
+            print(f"\n❌ ScanResult has a __dict__")
+            return False
+        by_key = {dep: dep for dep in inline.dependencies}
+        for dep in multiprocess.dependencies:
+            if hasattr(dep, '__dict__'):
+                print(f"\n❌ Dependency {dep.name} has a __dict__")
+                return False
+            other = by_key[dep]
+            if not (dep.name is other.name and dep.version is other.version
+                    and dep.source_file is other.source_file):
+                print(f"\n❌ Strings of {dep.name} are not interned")
+                return False
+        print(f"   ✓ Dependency and ScanResult use slots")
+        print(f"   ✓ Names, versions and source files interned ({len(by_key)} dependencies)")
+        
+        print(f"\n✅ Dependencies stored compactly")
+        return True
+    
+    except Exception as e:
+        print(f"\n❌ Error testing compact dependencies: {e}")
+        return False
+
+
+def test_parse_cache():
+    """Test that unchanged manifests are served from the parse cache"""
+    print("\n" + "=" * 60)
+    print("Testing Parse Cache")
+    print("=" * 60)
+    
+    try:
+        import tempfile
+        from sbom_scanner.cache import ParseCache
+        
+        example_path = os.path.join(os.path.dirname(__file__), "examples")
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ParseCache(cache_dir)
+            uncached = Scanner().scan(example_path)
+            cold = Scanner(parse_cache=cache).scan(example_path)
+            warm = Scanner(parse_cache=cache).scan(example_path)
+            
+            for label, other in [("Cold", cold), ("Warm", warm)]:
+                if {d.to_tuple() for d in other.dependencies} != {d.to_tuple() for d in uncached.dependencies}:
+                    print(f"\n❌ {label} cache scan returned different dependencies")
+                    return False
+            print(f"   ✓ Cached scans match uncached scan")
+            
+            # Shrinking the cache evicts entries
+            ParseCache(cache_dir, max_size=0).prune()
+            remaining = sum(len(files) for _, _, files in os.walk(cache_dir))
+            if remaining:
+                print(f"\n❌ Cache prune left {remaining} entries")
+                return False
+            print(f"   ✓ LRU pruning respects max_size")
+        
+        print(f"\n✅ Parse cache working")
+        return True
+    
+    except Exception as e:
+        print(f"\n❌ Error testing parse cache: {e}")
+        return False
+
+
+def test_incremental_scan():
+    """Test that unchanged manifests are reused from the previous scan state"""
+    print("\n" + "=" * 60)
+    print("Testing Incremental Rescan")
+    print("=" * 60)
+    
+    try:
+        import tempfile
+        from pathlib import Path
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            project = Path(tmp) / "project"
+            project.mkdir()
+            requirements = project / "requirements.txt"
+            requirements.write_text("requests==2.31.0\n")
+            state_file = str(Path(tmp) / "state.json")
+            
+            Scanner(state_file=state_file).scan(str(project))
+            
+            # Unchanged stat tuple: the previous result is reused as-is
+            stat = os.stat(requirements)
+            requirements.write_text("requests==2.31.1\n")
+            os.utime(requirements, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            reused = Scanner(state_file=state_file).scan(str(project))
+            if {d.version for d in reused.dependencies} != {"2.31.0"}:
+                print(f"\n❌ Unchanged manifest was re-read")
+                return False
+            print(f"   ✓ Unchanged manifest reused")
+            
+            requirements.write_text("flask==3.0.0\nclick==8.1.7\n")
+            changed = Scanner(state_file=state_file).scan(str(project))
+            if {d.name for d in changed.dependencies} != {"flask", "click"}:
+                print(f"\n❌ Changed manifest was not re-read")
+                return False
+            print(f"   ✓ Changed manifest re-parsed")
+        
+        print(f"\n✅ Incremental rescan working")
+        return True
+    
+    except Exception as e:
+        print(f"\n❌ Error testing incremental rescan: {e}")
+        return False
+
+
+def test_watch_session():
+    """Test that watch mode re-parses only changed manifests"""
+    print("\n" + "=" * 60)
+    print("Testing Watch Session")
+    print("=" * 60)
+    
+    try:
+        import tempfile
+        from pathlib import Path
+        from sbom_scanner.watch import WatchSession, PollingWatcher
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            project = Path(tmp).resolve()
+            requirements = project / "requirements.txt"
+            requirements.write_text("requests==2.31.0\n")
+            (project / "go.mod").write_text("module x\n\nrequire github.com/pkg/errors v0.9.1\n")
+            
+            scanner = Scanner()
+            session = WatchSession(scanner, str(project))
+            session.start()
+            watcher = PollingWatcher(project, scanner.skip_dirs,
+                                     session.get_watch_patterns(), interval=0)
+            
+            requirements.write_text("requests==2.31.0\nflask==3.0.0\n")
+            changed = watcher.wait()
+            if changed != {requirements}:
+                print(f"\n❌ Polling watcher reported {changed}")
+                return False
+            print(f"   ✓ Polling watcher reported the changed manifest")
+            
+            result = session.apply_changes(changed)
+            names = {d.name for d in result.dependencies}
+            if names != {"requests", "flask", "github.com/pkg/errors"}:
+                print(f"\n❌ Unexpected dependencies after change: {names}")
+                return False
+            print(f"   ✓ Result updated after change")
+            
+            if session.apply_changes([project / "README.md"]) is not None:
+                print(f"\n❌ Non-manifest change triggered a rescan")
+                return False
+            print(f"   ✓ Non-manifest changes ignored")
+            
+            # Files detectors read inside skipped directories are watched too
+            import json
+            (project / "composer.json").write_text('{"require": {"monolog/monolog": "^3.0"}}')
+            installed = project / "vendor" / "composer" / "installed.json"
+            installed.parent.mkdir(parents=True)
+            installed.write_text(json.dumps({"packages": [{"name": "monolog/monolog", "version": "3.5.0"}]}))
+            session = WatchSession(scanner, str(project))
+            session.start()
+            if session.get_watch_files() != {installed}:
+                print(f"\n❌ Unexpected watched files: {session.get_watch_files()}")
+                return False
+            watcher = PollingWatcher(project, scanner.skip_dirs,
+                                     session.get_watch_patterns(), interval=0)
+            watcher.watch_files(session.get_watch_files())
+            
+            installed.write_text(json.dumps({"packages": [{"name": "monolog/monolog", "version": "3.6.0"}]}))
+            changed = watcher.wait()
+            result = session.apply_changes(changed) if changed == {installed} else None
+            if result is None or ("monolog/monolog", "3.6.0") not in {(d.name, d.version) for d in result.dependencies}:
+                print(f"\n❌ Change to vendor/composer/installed.json not picked up: {changed}")
+                return False
+            print(f"   ✓ Files read inside skipped directories trigger a rescan")
+        
+        print(f"\n✅ Watch session working")
+        return True
+    
+    except Exception as e:
+        print(f"\n❌ Error testing watch session: {e}")
+        return False
+
+
+def test_lock_files():
+    """Test lock file parsing"""
+    print("\n" + "=" * 60)
+    print("Testing Lock Files")
+    print("=" * 60)
+    
+    try:
+        import json
+        import tempfile
+        from pathlib import Path
+        from sbom_scanner.models import DependencyType
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            project = Path(tmp)
+            
+            # npm lockfile v3 with a dev dependency and a nested transitive copy
+            (project / "package-lock.json").write_text(json.dumps({
+                "name": "app",
+                "lockfileVersion": 3,
+                "packages": {
+                    "": {"dependencies": {"express": "^4.18.0"}, "devDependencies": {"jest": "^29.0.0"}},
+                    "node_modules/express": {"version": "4.18.2"},
+                    "node_modules/jest": {"version": "29.7.0", "dev": True},
+                    "node_modules/debug": {"version": "2.6.9"},
+                    "node_modules/express/node_modules/debug": {"version": "4.3.4"},
+                },
+            }))
+            
+            result = Scanner().scan(str(project))
+            found = {(d.name, d.version): d.dependency_type for d in result.dependencies}
+            expected = {
+                ("express", "4.18.2"): DependencyType.DIRECT,
+                ("jest", "29.7.0"): DependencyType.DEV,
+                ("debug", "2.6.9"): DependencyType.TRANSITIVE,
+                ("debug", "4.3.4"): DependencyType.TRANSITIVE,
+            }
+            if found != expected:
+                print(f"\n❌ Unexpected package-lock.json dependencies: {found}")
+                return False
+            print(f"   ✓ package-lock.json parsed ({len(found)} packages)")
+            
+            # The lock file supersedes package.json in the same directory
+            (project / "package.json").write_text(json.dumps({
+                "dependencies": {"express": "^4.18.0"},
+                "devDependencies": {"jest": "^29.0.0"},
+            }))
+            result = Scanner().scan(str(project))
+            if {(d.name, d.version) for d in result.dependencies} != set(expected):
+                print(f"\n❌ package.json was parsed next to package-lock.json")
+                return False
+            result = Scanner(prefer_lockfiles=False).scan(str(project))
+            if ("express", "4.18.0") not in {(d.name, d.version) for d in result.dependencies}:
+                print(f"\n❌ prefer_lockfiles=False did not parse package.json")
+                return False
+            print(f"   ✓ Lock file preferred over package.json")
+            
+            # npm lockfile v1: direct dependencies come from package.json
+            legacy_project = project / "legacy"
+            legacy_project.mkdir()
+            (legacy_project / "package.json").write_text(json.dumps({
+                "dependencies": {"express": "^4.18.0"},
+                "devDependencies": {"jest": "^29.0.0"},
+            }))
+            (legacy_project / "package-lock.json").write_text(json.dumps({
+                "name": "app",
+                "lockfileVersion": 1,
+                "dependencies": {
+                    "express": {"version": "4.18.2", "dependencies": {"debug": {"version": "4.3.4"}}},
+                    "jest": {"version": "29.7.0", "dev": True},
+                    "jest-cli": {"version": "29.7.0", "dev": True},
+                    "debug": {"version": "2.6.9"},
+                },
+            }))
+            result = Scanner().scan(str(legacy_project))
+            found = {(d.name, d.version): d.dependency_type for d in result.dependencies}
+            expected = {
+                ("express", "4.18.2"): DependencyType.DIRECT,
+                ("jest", "29.7.0"): DependencyType.DEV,
+                ("jest-cli", "29.7.0"): DependencyType.DEV,
+                ("debug", "2.6.9"): DependencyType.TRANSITIVE,
+                ("debug", "4.3.4"): DependencyType.TRANSITIVE,
+            }
+            if found != expected:
+                print(f"\n❌ Unexpected lockfile v1 dependencies: {found}")
+                return False
+            print(f"   ✓ package-lock.json v1 parsed ({len(found)} packages)")
+            
+            # Yarn berry lock file: the workspace entry marks direct dependencies
+            yarn_project = project / "yarn"
+            yarn_project.mkdir()
+            (yarn_project / "yarn.lock").write_text(
+                '__metadata:\n  version: 6\n\n'
+                '"app@workspace:.":\n  version: 0.0.0-use.local\n  resolution: "app@workspace:."\n'
+                '  dependencies:\n    express: ^4.18.0\n  linkType: soft\n\n'
+                '"express@npm:^4.18.0":\n  version: 4.18.2\n  resolution: "express@npm:4.18.2"\n'
+                '  dependencies:\n    debug: 2.6.9\n\n'
+                '"debug@npm:2.6.9":\n  version: 2.6.9\n  resolution: "debug@npm:2.6.9"\n'
+            )
+            
+            # pnpm v9 lock file with peer-suffixed importer version
+            pnpm_project = project / "pnpm"
+            pnpm_project.mkdir()
+            (pnpm_project / "pnpm-lock.yaml").write_text(
+                "lockfileVersion: '9.0'\n\nimporters:\n\n  .:\n    devDependencies:\n"
+                "      react-dom:\n        specifier: ^18.2.0\n        version: 18.2.0(react@18.2.0)\n\n"
+                "packages:\n\n  react-dom@18.2.0:\n    resolution: {integrity: sha512-abc}\n\n"
+                "  react@18.2.0:\n    resolution: {integrity: sha512-def}\n\n"
+                "snapshots:\n\n  react-dom@18.2.0(react@18.2.0):\n    dependencies:\n      react: 18.2.0\n"
+            )
+            
+            for lock_project, expected in [
+                (yarn_project, {("express", "4.18.2"): DependencyType.DIRECT,
+                                ("debug", "2.6.9"): DependencyType.TRANSITIVE}),
+                (pnpm_project, {("react-dom", "18.2.0"): DependencyType.DEV,
+                                ("react", "18.2.0"): DependencyType.TRANSITIVE}),
+            ]:
+                result = Scanner().scan(str(lock_project))
+                found = {(d.name, d.version): d.dependency_type for d in result.dependencies}
+                if found != expected:
+                    print(f"\n❌ Unexpected {lock_project.name} lock file dependencies: {found}")
+                    return False
+                print(f"   ✓ {lock_project.name} lock file parsed ({len(found)} packages)")
+            
+            # Cargo workspace: one Cargo.lock covers the member crates
+            cargo_project = project / "cargo"
+            (cargo_project / "member").mkdir(parents=True)
+            (cargo_project / "tools" / "standalone").mkdir(parents=True)
+            (cargo_project / "Cargo.toml").write_text(
+                '[workspace]\nmembers = ["member"]\nexclude = ["tools/standalone"]\n'
+            )
+            (cargo_project / "member" / "Cargo.toml").write_text(
+                '[package]\nname = "member"\nversion = "0.1.0"\n\n[dependencies]\nrand = "0.8"\n'
+                '\n[dev-dependencies]\nproptest = "1.4"\n'
+            )
+            # Excluded from the workspace, so not resolved by its Cargo.lock
+            (cargo_project / "tools" / "standalone" / "Cargo.toml").write_text(
+                '[package]\nname = "standalone"\nversion = "0.1.0"\n\n[dependencies]\nserde = "1.0"\n'
+            )
+            (cargo_project / "Cargo.lock").write_text(
+                'version = 3\n\n'
+                '[[package]]\nname = "member"\nversion = "0.1.0"\ndependencies = [\n "proptest",\n "rand",\n]\n\n'
+                '[[package]]\nname = "proptest"\nversion = "1.4.0"\n'
+                'source = "registry+https://github.com/rust-lang/crates.io-index"\n\n'
+                '[[package]]\nname = "rand"\nversion = "0.8.5"\n'
+                'source = "registry+https://github.com/rust-lang/crates.io-index"\n'
+                'dependencies = [\n "rand_core",\n]\n\n'
+                '[[package]]\nname = "rand_core"\nversion = "0.6.4"\n'
+                'source = "registry+https://github.com/rust-lang/crates.io-index"\n'
+            )
+            result = Scanner().scan(str(cargo_project))
+            found = {(d.name, d.version, d.dependency_type, d.depends_on) for d in result.dependencies}
+            expected = {
+                ("rand", "0.8.5", DependencyType.DIRECT, ("pkg:cargo/rand_core@0.6.4",)),
+                ("rand_core", "0.6.4", DependencyType.TRANSITIVE, ()),
+                ("proptest", "1.4.0", DependencyType.DEV, ()),
+                ("serde", "1.0", DependencyType.DIRECT, None),
+            }
+            if found != expected:
+                print(f"\n❌ Unexpected Cargo.lock dependencies: {found}")
+                return False
+            print(f"   ✓ Cargo.lock parsed with dependency edges, workspace members skipped, "
+                  f"dev-dependencies kept as dev, crates outside the workspace kept")
+            
+            # Go workspace: vendored module list, go.sum, local workspace module
+            go_project = project / "go"
+            (go_project / "app" / "vendor").mkdir(parents=True)
+            (go_project / "lib").mkdir()
+            (go_project / "go.work").write_text("go 1.21\n\nuse (\n\t./app\n\t./lib\n)\n")
+            (go_project / "app" / "go.mod").write_text(
+                "module example.com/app\n\nrequire (\n\texample.com/lib v0.0.0\n"
+                "\tgolang.org/x/text v0.13.0 // indirect\n)\n"
+            )
+            (go_project / "app" / "vendor" / "modules.txt").write_text(
+                "# golang.org/x/text v0.13.0\n## explicit\ngolang.org/x/text/language\n"
+                "# github.com/google/uuid v1.3.0\ngithub.com/google/uuid\n"
+            )
+            (go_project / "lib" / "go.mod").write_text("module example.com/lib\n")
+            (go_project / "lib" / "go.sum").write_text(
+                "github.com/pkg/errors v0.9.0 h1:a=\ngithub.com/pkg/errors v0.9.1 h1:b=\n"
+                "github.com/pkg/errors v0.10.0/go.mod h1:c=\n"
+            )
+            result = Scanner().scan(str(go_project))
+            found = {(d.name, d.version): d.dependency_type for d in result.dependencies}
+            expected = {
+                ("golang.org/x/text", "0.13.0"): DependencyType.TRANSITIVE,
+                ("github.com/google/uuid", "1.3.0"): DependencyType.TRANSITIVE,
+                ("github.com/pkg/errors", "0.9.1"): DependencyType.TRANSITIVE,
+            }
+            if found != expected:
+                print(f"\n❌ Unexpected Go module dependencies: {found}")
+                return False
+            print(f"   ✓ go.work, go.sum and vendor/modules.txt parsed")
+            
+            # Gemfile.lock with platform-specific specs and a PATH gem
+            ruby_project = project / "ruby"
+            ruby_project.mkdir()
+            (ruby_project / "Gemfile").write_text("gem 'nokogiri'\n")
+            (ruby_project / "Gemfile.lock").write_text(
+                "PATH\n  remote: .\n  specs:\n    app (0.1.0)\n      pg (~> 1.1)\n\n"
+                "GEM\n  remote: https://rubygems.org/\n  specs:\n"
+                "    nokogiri (1.13.10-x86_64-linux)\n      racc (~> 1.4)\n"
+                "    pg (1.4.5)\n    racc (1.6.2)\n\n"
+                "DEPENDENCIES\n  app!\n  nokogiri\n"
+            )
+            result = Scanner().scan(str(ruby_project))
+            found = {(d.name, d.version, d.dependency_type, d.depends_on) for d in result.dependencies}
+            expected = {
+                ("nokogiri", "1.13.10", DependencyType.DIRECT, ("pkg:gem/racc@1.6.2",)),
+                ("pg", "1.4.5", DependencyType.DIRECT, ()),
+                ("racc", "1.6.2", DependencyType.TRANSITIVE, ()),
+            }
+            if found != expected:
+                print(f"\n❌ Unexpected Gemfile.lock dependencies: {found}")
+                return False
+            print(f"   ✓ Gemfile.lock parsed with dependency edges")
+            
+            # poetry.lock pins replace the pyproject.toml range
+            poetry_project = project / "poetry"
+            poetry_project.mkdir()
+            (poetry_project / "pyproject.toml").write_text(
+                '[tool.poetry.dependencies]\npython = "^3.11"\nrequests = "^2.31"\n'
+            )
+            (poetry_project / "poetry.lock").write_text(
+                '[[package]]\nname = "requests"\nversion = "2.31.0"\n\n'
+                '[package.dependencies]\ncertifi = ">=2017.4.17"\n\n'
+                '[[package]]\nname = "certifi"\nversion = "2023.7.22"\n\n'
+                '[metadata]\nlock-version = "2.0"\n\n[metadata.files]\ncertifi = []\n'
+            )
+            result = Scanner().scan(str(poetry_project))
+            found = {(d.name, d.version, d.dependency_type, d.depends_on) for d in result.dependencies}
+            expected = {
+                ("requests", "2.31.0", DependencyType.DIRECT, ("pkg:pypi/certifi@2023.7.22",)),
+                ("certifi", "2023.7.22", DependencyType.TRANSITIVE, ()),
+            }
+            if found != expected:
+                print(f"\n❌ Unexpected poetry.lock dependencies: {found}")
+                return False
+            print(f"   ✓ poetry.lock parsed and preferred over pyproject.toml")
+            
+            # uv.lock: the editable project package marks direct/dev dependencies
+            uv_project = project / "uv"
+            uv_project.mkdir()
+            (uv_project / "uv.lock").write_text(
+                'version = 1\n\n'
+                '[[package]]\nname = "app"\nversion = "0.1.0"\nsource = { editable = "." }\n'
+                'dependencies = [\n    { name = "httpx" },\n]\n\n'
+                '[package.dev-dependencies]\ndev = [\n    { name = "pytest" },\n]\n\n'
+                '[[package]]\nname = "httpx"\nversion = "0.27.0"\n'
+                'source = { registry = "https://pypi.org/simple" }\n\n'
+                '[[package]]\nname = "pytest"\nversion = "8.2.0"\n'
+                'source = { registry = "https://pypi.org/simple" }\n'
+            )
+            # Pipfile.lock: the Pipfile tells requested from transitive packages
+            (uv_project / "Pipfile").write_text(
+                '[packages]\nrequests = "*"\n\n[dev-packages]\nblack = "*"\n'
+            )
+            (uv_project / "Pipfile.lock").write_text(json.dumps({
+                "default": {"requests": {"version": "==2.32.3"}, "idna": {"version": "==3.7"}},
+                "develop": {"black": {"version": "==24.4.0"}},
+            }))
+            result = Scanner().scan(str(uv_project))
+            found = {(d.name, d.version): d.dependency_type for d in result.dependencies}
+            expected = {
+                ("httpx", "0.27.0"): DependencyType.DIRECT,
+                ("pytest", "8.2.0"): DependencyType.DEV,
+                ("requests", "2.32.3"): DependencyType.DIRECT,
+                ("idna", "3.7"): DependencyType.TRANSITIVE,
+                ("black", "24.4.0"): DependencyType.DEV,
+            }
+            if found != expected:
+                print(f"\n❌ Unexpected uv.lock / Pipfile.lock dependencies: {found}")
+                return False
+            print(f"   ✓ uv.lock and Pipfile.lock parsed")
+            
+            # composer.lock supersedes composer.json; installed.json is read from vendor/
+            php_project = project / "php"
+            (php_project / "vendor" / "composer").mkdir(parents=True)
+            # psr/log is required by the project and by monolog: still direct
+            (php_project / "composer.json").write_text(json.dumps({
+                "require": {"php": ">=8.1", "monolog/monolog": "^2.0", "psr/log": "^3.0"},
+                "require-dev": {"phpunit/phpunit": "^10.0"},
+            }))
+            (php_project / "composer.lock").write_text(json.dumps({
+                "packages": [
+                    {"name": "monolog/monolog", "version": "2.9.1",
+                     "require": {"php": ">=7.2", "psr/log": "^3.0", "psr/container": "^2.0"}},
+                    {"name": "psr/log", "version": "3.0.0"},
+                    {"name": "psr/container", "version": "2.0.2"},
+                ],
+                "packages-dev": [{"name": "phpunit/phpunit", "version": "10.3.2"}],
+            }))
+            installed_project = project / "php-installed"
+            (installed_project / "vendor" / "composer").mkdir(parents=True)
+            (installed_project / "composer.json").write_text('{"require": {"symfony/console": "^6.0"}}')
+            (installed_project / "vendor" / "composer" / "installed.json").write_text(json.dumps({
+                "packages": [{"name": "symfony/console", "version": "v6.3.4"}],
+                "dev-package-names": [],
+            }))
+            
+            for php_dir, expected in [
+                (php_project, {("monolog/monolog", "2.9.1"): DependencyType.DIRECT,
+                               ("psr/log", "3.0.0"): DependencyType.DIRECT,
+                               ("psr/container", "2.0.2"): DependencyType.TRANSITIVE,
+                               ("phpunit/phpunit", "10.3.2"): DependencyType.DEV}),
+                (installed_project, {("symfony/console", "6.3.4"): DependencyType.DIRECT}),
+            ]:
+                result = Scanner().scan(str(php_dir))
+                found = {(d.name, d.version): d.dependency_type for d in result.dependencies}
+                if found != expected:
+                    print(f"\n❌ Unexpected Composer dependencies in {php_dir.name}: {found}")
+                    return False
+            print(f"   ✓ composer.lock and vendor/composer/installed.json parsed")
+            
+            # Central package versions, packages.lock.json and obj/project.assets.json
+            dotnet = project / "dotnet"
+            for name in ("Lib", "Locked", "App/obj"):
+                (dotnet / name).mkdir(parents=True)
+            (dotnet / "Directory.Packages.props").write_text(
+                '<Project><PropertyGroup><SerilogVersion>3.1.1</SerilogVersion></PropertyGroup>'
+                '<ItemGroup><PackageVersion Include="Serilog" Version="$(SerilogVersion)" />'
+                '<PackageVersion Include="Dapper" Version="2.1.24" /></ItemGroup></Project>'
+            )
+            (dotnet / "Lib" / "Lib.csproj").write_text(
+                '<Project><ItemGroup><PackageReference Include="Serilog" />'
+                '<PackageReference Include="Dapper" VersionOverride="2.0.0" /></ItemGroup></Project>'
+            )
+            (dotnet / "Locked" / "Locked.csproj").write_text(
+                '<Project><ItemGroup><PackageReference Include="Polly" /></ItemGroup></Project>'
+            )
+            (dotnet / "Locked" / "packages.lock.json").write_text(json.dumps({"version": 1, "dependencies": {"net8.0": {
+                "Polly": {"type": "Direct", "resolved": "8.2.0", "dependencies": {"Polly.Core": "8.2.0"}},
+                "Polly.Core": {"type": "Transitive", "resolved": "8.2.0"},
+                "Lib": {"type": "Project"},
+            }}}))
+            (dotnet / "App" / "App.csproj").write_text('<Project />')
+            (dotnet / "App" / "obj" / "project.assets.json").write_text(json.dumps({
+                "version": 3,
+                "targets": {"net8.0": {
+                    "Humanizer/2.14.1": {"type": "package", "dependencies": {"Humanizer.Core": "2.14.1"}},
+                    "Humanizer.Core/2.14.1": {"type": "package"},
+                    "Lib/1.0.0": {"type": "project"},
+                }},
+                "libraries": {"Humanizer/2.14.1": {"files": ["lib/Humanizer.dll"]}},
+                "project": {"frameworks": {"net8.0": {"dependencies": {"Humanizer": {"target": "Package"}}}}},
+            }))
+            
+            result = Scanner().scan(str(dotnet))
+            found = {(d.name, d.version, d.dependency_type, d.depends_on) for d in result.dependencies}
+            expected = {
+                ("Serilog", "3.1.1", DependencyType.DIRECT, None),
+                ("Dapper", "2.0.0", DependencyType.DIRECT, None),
+                ("Polly", "8.2.0", DependencyType.DIRECT, ("pkg:nuget/Polly.Core@8.2.0",)),
+                ("Polly.Core", "8.2.0", DependencyType.TRANSITIVE, ()),
+                ("Humanizer", "2.14.1", DependencyType.DIRECT, ("pkg:nuget/Humanizer.Core@2.14.1",)),
+                ("Humanizer.Core", "2.14.1", DependencyType.TRANSITIVE, ()),
+            }
+            if found != expected:
+                print(f"\n❌ Unexpected NuGet dependencies: {found}")
+                return False
+            
+            # Editing the props file invalidates the cached and incremental results of the projects below it
+            from sbom_scanner.cache import ParseCache
+            cache = ParseCache(str(project / "cache"))
+            state_file = str(project / "state.json")
+            Scanner(parse_cache=cache, state_file=state_file).scan(str(dotnet))
+            props = dotnet / "Directory.Packages.props"
+            props.write_text(props.read_text().replace("3.1.1", "3.1.2"))
+            result = Scanner(parse_cache=cache, state_file=state_file).scan(str(dotnet))
+            if ("Serilog", "3.1.2") not in {(d.name, d.version) for d in result.dependencies}:
+                print(f"\n❌ Central version change not picked up")
+                return False
+            print(f"   ✓ Central package versions, packages.lock.json and project.assets.json parsed")
+        
+        print(f"\n✅ Lock file parsing working")
+        return True
+    
+    except Exception as e:
+        print(f"\n❌ Error testing lock files: {e}")
+        return False
+
+
+def test_version_resolution():
+    """Test versions resolved from parent POMs, BOMs, properties and version catalogs"""
+    print("\n" + "=" * 60)
+    print("Testing Version Resolution")
+    print("=" * 60)
+    
+    try:
+        import tempfile
+        from pathlib import Path
+        from sbom_scanner.detectors.maven_detector import MavenDetector
+        from sbom_scanner.models import DependencyType
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            project = Path(tmp) / "project"
+            repository = Path(tmp) / "repository"
+            
+            # BOM only available in the local repository, imported by the reactor parent
+            bom = repository / "org" / "example" / "platform-bom" / "2.0" / "platform-bom-2.0.pom"
+            bom.parent.mkdir(parents=True)
+            bom.write_text(
+                '<project><groupId>org.example</groupId><artifactId>platform-bom</artifactId><version>2.0</version>'
+                '<properties><jackson.version>2.15.3</jackson.version></properties>'
+                '<dependencyManagement><dependencies><dependency><groupId>com.fasterxml.jackson.core</groupId>'
+                '<artifactId>jackson-databind</artifactId><version>${jackson.version}</version></dependency>'
+                '</dependencies></dependencyManagement></project>'
+            )
+            (project / "core").mkdir(parents=True)
+            (project / "pom.xml").write_text(
+                '<project xmlns="http://maven.apache.org/POM/4.0.0"><groupId>com.acme</groupId>'
+                '<artifactId>parent</artifactId><version>1.4.0</version>'
+                '<properties><guava.version>32.1.3-jre</guava.version></properties>'
+                '<dependencyManagement><dependencies>'
+                '<dependency><groupId>org.example</groupId><artifactId>platform-bom</artifactId><version>2.0</version>'
+                '<type>pom</type><scope>import</scope></dependency>'
+                '<dependency><groupId>com.google.guava</groupId><artifactId>guava</artifactId>'
+                '<version>${guava.version}</version></dependency>'
+                '<dependency><groupId>junit</groupId><artifactId>junit</artifactId><version>4.13.2</version>'
+                '<scope>test</scope></dependency>'
+                '</dependencies></dependencyManagement></project>'
+            )
+            (project / "core" / "pom.xml").write_text(
+                '<project xmlns="http://maven.apache.org/POM/4.0.0"><parent><groupId>com.acme</groupId>'
+                '<artifactId>parent</artifactId><version>1.4.0</version></parent><artifactId>core</artifactId>'
+                '<properties><guava.version>33.0.0-jre</guava.version></properties><dependencies>'
+                '<dependency><groupId>com.google.guava</groupId><artifactId>guava</artifactId></dependency>'
+                '<dependency><groupId>com.fasterxml.jackson.core</groupId><artifactId>jackson-databind</artifactId></dependency>'
+                '<dependency><groupId>junit</groupId><artifactId>junit</artifactId></dependency>'
+                '<dependency><groupId>${project.groupId}</groupId><artifactId>api</artifactId>'
+                '<version>${project.version}</version></dependency>'
+                '</dependencies></project>'
+            )
+            
+            detector = MavenDetector()
+            detector.maven_repository = repository
+            found = {(d.name, d.version, d.dependency_type) for d in detector.parse(project)}
+            expected = {
+                ("com.google.guava:guava", "33.0.0-jre", DependencyType.DIRECT),
+                ("com.fasterxml.jackson.core:jackson-databind", "2.15.3", DependencyType.DIRECT),
+                ("junit:junit", "4.13.2", DependencyType.DEV),
+                ("com.acme:api", "1.4.0", DependencyType.DIRECT),
+            }
+            if found != expected:
+                print(f"\n❌ Unexpected Maven dependencies: {found}")
+                return False
+            if detector.get_unit_inputs('_parse_pom', project / "core" / "pom.xml", project) != sorted([bom, project / "pom.xml"]):
+                print(f"\n❌ Parent POM and BOM not reported as unit inputs")
+                return False
+            print(f"   ✓ Maven properties, parent POM and imported BOM resolved")
+            
+            # Large files take the iterparse path; it must read exactly the same elements
+            from sbom_scanner import xml_stream
+            threshold = xml_stream.STREAMING_THRESHOLD
+            xml_stream.STREAMING_THRESHOLD = 0
+            try:
+                detector = MavenDetector()
+                detector.maven_repository = repository
+                streamed = {(d.name, d.version, d.dependency_type) for d in detector.parse(project)}
+            finally:
+                xml_stream.STREAMING_THRESHOLD = threshold
+            if streamed != expected:
+                print(f"\n❌ Streamed POM parsing differs: {streamed}")
+                return False
+            print(f"   ✓ Streamed POM parsing matches tree parsing")
+            
+            # A parent POM installed after a cached parse must still be used
+            from sbom_scanner.cache import ParseCache
+            orphan = Path(tmp) / "orphan"
+            orphan.mkdir()
+            (orphan / "pom.xml").write_text(
+                '<project><parent><groupId>org.example</groupId><artifactId>platform-parent</artifactId>'
+                '<version>3.0</version></parent><artifactId>app</artifactId><dependencies>'
+                '<dependency><groupId>com.google.guava</groupId><artifactId>guava</artifactId></dependency>'
+                '</dependencies></project>'
+            )
+            cache = ParseCache(str(Path(tmp) / "cache"))
+            for _ in range(2):
+                detector = MavenDetector()
+                detector.maven_repository = repository
+                detector.parse_cache = cache
+                found = {(d.name, d.version) for d in detector.parse(orphan)}
+                parent_pom = repository / "org" / "example" / "platform-parent" / "3.0" / "platform-parent-3.0.pom"
+                if parent_pom.exists():
+                    break
+                if detector.get_unit_inputs('_parse_pom', orphan / "pom.xml", orphan) != [parent_pom]:
+                    print(f"\n❌ Missing parent POM not part of the cache key")
+                    return False
+                parent_pom.parent.mkdir(parents=True)
+                parent_pom.write_text(
+                    '<project><groupId>org.example</groupId><artifactId>platform-parent</artifactId>'
+                    '<version>3.0</version><dependencyManagement><dependencies><dependency>'
+                    '<groupId>com.google.guava</groupId><artifactId>guava</artifactId>'
+                    '<version>33.0.0-jre</version></dependency></dependencies></dependencyManagement></project>'
+                )
+            if found != {("com.google.guava:guava", "33.0.0-jre")}:
+                print(f"\n❌ Cached result ignored a parent POM installed later: {found}")
+                return False
+            print(f"   ✓ Parent POM installed after a cached parse is used")
+            
+            # Gradle version catalog shared by subprojects, gradle.lockfile pins
+            build = Path(tmp) / "gradle-build"
+            for name in ("gradle", "app", "lib"):
+                (build / name).mkdir(parents=True)
+            (build / "gradle" / "libs.versions.toml").write_text(
+                '[versions]\nokhttp = "4.12.0"\n\n'
+                '[libraries]\n'
+                'okhttp = { module = "com.squareup.okhttp3:okhttp", version.ref = "okhttp" }\n'
+                'kotlin-stdlib = "org.jetbrains.kotlin:kotlin-stdlib:1.9.20"\n'
+                'junit-jupiter = { group = "org.junit.jupiter", name = "junit-jupiter", version = "5.10.1" }\n'
+                'guava = "com.google.guava:guava:32.1.3-jre"\n\n'
+                '[bundles]\nnetwork = ["okhttp", "kotlin-stdlib"]\n'
+            )
+            (build / "app" / "build.gradle.kts").write_text(
+                'dependencies {\n'
+                '    implementation(libs.bundles.network)\n'
+                '    implementation("com.google.guava:guava:31.+")\n'
+                '    testImplementation(libs.junit.jupiter)\n'
+                '}\n'
+            )
+            (build / "app" / "gradle.lockfile").write_text(
+                'com.google.guava:failureaccess:1.0.1=compileClasspath,runtimeClasspath\n'
+                'com.google.guava:guava:31.1-jre=compileClasspath,runtimeClasspath\n'
+                'empty=annotationProcessor\n'
+            )
+            (build / "lib" / "build.gradle").write_text('dependencies {\n    implementation libs.guava\n}\n')
+            
+            result = Scanner().scan(str(build))
+            found = {(d.name, d.version, d.dependency_type) for d in result.dependencies}
+            expected = {
+                ("com.squareup.okhttp3:okhttp", "4.12.0", DependencyType.DIRECT),
+                ("org.jetbrains.kotlin:kotlin-stdlib", "1.9.20", DependencyType.DIRECT),
+                ("org.junit.jupiter:junit-jupiter", "5.10.1", DependencyType.DEV),
+                ("com.google.guava:guava", "31.1-jre", DependencyType.DIRECT),
+                ("com.google.guava:failureaccess", "1.0.1", DependencyType.TRANSITIVE),
+                ("com.google.guava:guava", "32.1.3-jre", DependencyType.DIRECT),
+            }
+            if found != expected:
+                print(f"\n❌ Unexpected Gradle dependencies: {found}")
+                return False
+            print(f"   ✓ Gradle version catalog aliases and gradle.lockfile resolved")
+        
+        print(f"\n✅ Version resolution working")
+        return True
+    
+    except Exception as e:
+        print(f"\n❌ Error testing version resolution: {e}")
+        return False
+
+
+def test_bom_generation():
+    """Test that the streaming BOM writer matches the cyclonedx-python-lib output"""
+    print("\n" + "=" * 60)
+    print("Testing BOM Generation")
+    print("=" * 60)
+    
+    try:
+        import json
+        import tempfile
+        from sbom_scanner.models import Dependency, DependencyType, Ecosystem, ScanResult
+        
+        result = ScanResult(project_name="demo", dependencies={
+            Dependency("lodash", "4.17.21", Ecosystem.NPM, purl="pkg:npm/lodash@4.17.21",
+                       description="Utilities <&>", depends_on=("pkg:npm/ms@2.1.3",)),
+            Dependency("ms", "2.1.3", Ecosystem.NPM, purl="pkg:npm/ms@2.1.3",
+                       dependency_type=DependencyType.TRANSITIVE),
+            Dependency("@types/node", "*", Ecosystem.NPM, purl="pkg:npm/%40types/node",
+                       dependency_type=DependencyType.DEV),
+            Dependency("Django", "4.2", Ecosystem.PYPI, purl="pkg:pypi/Django@4.2"),
+            Dependency("org.example:core", "1.0", Ecosystem.MAVEN),
+        })
+        
+        # Canonical purls match PackageURL's, with or without the round trip
+        from packageurl import PackageURL
+        from sbom_scanner.purl import normalize_purl
+        for purl in ["pkg:npm/lodash@4.17.21", "pkg:npm/%40types/node@20.1.0", "pkg:npm/@types/node",
+                     "pkg:pypi/Django_Rest@3.0", "pkg:maven/org.x/y@1.0", "pkg:golang/github.com/Gin/gin@v1",
+                     "pkg:platformio/DHT sensor library@1.4", "pkg:Generic/a%2Fb@1", "pkg:conan/zlib@1.3?x=1"]:
+            expected = PackageURL.from_string(purl).to_string()
+            if normalize_purl(purl) != expected:
+                print(f"\n❌ Canonical purl of {purl}: {normalize_purl(purl)} != {expected}")
+                return False
+        
+        dep = Dependency("Django_Rest", "3.0", Ecosystem.PYPI, purl="pkg:pypi/Django_Rest@3.0", confidence=0.9)
+        shipped = Dependency.from_tuple(dep.to_tuple())
+        if shipped._canonical_purl != "pkg:pypi/django-rest@3.0" or \
+                str(shipped.package_url) != "pkg:pypi/django-rest@3.0":
+            print(f"\n❌ Canonical purl not carried through to_tuple: {shipped._canonical_purl}")
+            return False
+        spelled = Dependency("django-rest", "3.0", Ecosystem.PYPI, purl="pkg:pypi/django-rest@3.0")
+        if Scanner()._reduce_false_positives({dep, spelled}) != {spelled}:
+            print(f"\n❌ Spellings of one package were not deduplicated by canonical purl")
+            return False
+        print(f"   ✓ Canonical purls are computed once and shared by dedupe and output")
+        
+        def normalize(document):
+            """Replace bom-refs by purls and drop the run-specific fields"""
+            bom = json.loads(document)
+            refs = {c["bom-ref"]: c.get("purl") for c in bom["components"]}
+            refs[bom["metadata"]["component"]["bom-ref"]] = "root"
+            for component in [bom["metadata"]["component"]] + bom["components"]:
+                del component["bom-ref"]
+            del bom["serialNumber"]
+            for key in ("timestamp", "tools"):
+                del bom["metadata"][key]
+            bom["dependencies"] = sorted(
+                (refs[d["ref"]], sorted(refs[t] for t in d.get("dependsOn", [])))
+                for d in bom["dependencies"]
+            )
+            return bom
+        
+        library_json = CycloneDXGenerator().generate(result, "json")
+        streaming = CycloneDXGenerator(engine="streaming").generate(result, "json")
+        if normalize(streaming) != normalize(library_json):
+            print(f"\n❌ Streaming JSON differs from the library output:\n{streaming}\n{library_json}")
+            return False
+        print(f"   ✓ Streaming JSON matches the library document")
+        
+        def normalize_xml(document):
+            """XML counterpart of normalize(): (tag, attributes, text) trees without bom-refs"""
+            import xml.etree.ElementTree as ET
+            root = ET.fromstring(document.encode('utf-8'))
+            ns = '{http://cyclonedx.org/schema/bom/1.5}'
+            refs = {c.get("bom-ref"): c.findtext(f"{ns}purl") for c in root.iter(f"{ns}component")}
+            refs[root.find(f"{ns}metadata/{ns}component").get("bom-ref")] = "root"
+            
+            def tree(element):
+                attributes = {k: refs.get(v, v) for k, v in element.attrib.items()}
+                attributes.pop("bom-ref", None)
+                children = [tree(child) for child in element]
+                if element.tag in (f"{ns}dependencies", f"{ns}dependency"):
+                    children.sort()
+                return (element.tag, sorted(attributes.items()), (element.text or '').strip(), children)
+            
+            metadata = root.find(f"{ns}metadata")
+            for name in ("timestamp", "tools"):
+                metadata.remove(metadata.find(f"{ns}{name}"))
+            del root.attrib["serialNumber"]
+            return tree(root)
+        
+        library = CycloneDXGenerator().generate(result, "xml")
+        streaming = CycloneDXGenerator(engine="streaming").generate(result, "xml")
+        if normalize_xml(streaming) != normalize_xml(library):
+            print(f"\n❌ Streaming XML differs from the library output:\n{streaming}\n{library}")
+            return False
+        print(f"   ✓ Streaming XML matches the library document")
+        
+        # One normalized component list fans out to every format
+        for engine in CycloneDXGenerator.ENGINES:
+            generator = CycloneDXGenerator(engine=engine)
+            documents = generator.generate_many(result, ["json", "XML"], max_workers=2)
+            if sorted(documents) != ["json", "xml"]:
+                print(f"\n❌ generate_many returned {sorted(documents)}")
+                return False
+            if normalize(documents["json"]) != normalize(library_json) or \
+                    normalize_xml(documents["xml"]) != normalize_xml(library):
+                print(f"\n❌ generate_many ({engine}) differs from generate")
+                return False
+            
+            with tempfile.TemporaryDirectory() as tmp:
+                outputs = {"json": os.path.join(tmp, "bom.json"), "xml": os.path.join(tmp, "out", "bom.xml")}
+                generator.save_many(result, outputs, max_workers=2)
+                with open(outputs["xml"], encoding="utf-8") as f:
+                    if normalize_xml(f.read()) != normalize_xml(library):
+                        print(f"\n❌ save_many ({engine}) wrote a different XML document")
+                        return False
+        print(f"   ✓ generate_many / save_many produce every format from one scan")
+        
+        print(f"\n✅ BOM generation working")
+        return True
+    
+    except Exception as e:
+        print(f"\n❌ Error testing BOM generation: {e}")
+        return False
+
+
 def test_cli():
     """Test CLI is working"""
     print("\n" + "=" * 60)
@@ -192,10 +1207,40 @@ def main():
     # Test 1: Detector imports
     results.append(("Detector Imports", test_detectors()))
     
-    # Test 2: CLI
+    # Test 2: File index
+    results.append(("File Index", test_file_index()))
+    
+    # Test 3: Parallel detectors
+    results.append(("Parallel Scan", test_parallel_scan()))
+    
+    # Test 4: Parser backends
+    results.append(("Parser Backends", test_parser_backends()))
+    
+    # Test 5: Compact dependencies
+    results.append(("Compact Dependencies", test_compact_dependencies()))
+    
+    # Test 6: Parse cache
+    results.append(("Parse Cache", test_parse_cache()))
+    
+    # Test 7: Incremental rescan
+    results.append(("Incremental Rescan", test_incremental_scan()))
+    
+    # Test 8: Watch session
+    results.append(("Watch Session", test_watch_session()))
+    
+    # Test 9: Lock files
+    results.append(("Lock Files", test_lock_files()))
+    
+    # Test 10: Version resolution
+    results.append(("Version Resolution", test_version_resolution()))
+    
+    # Test 11: BOM generation
+    results.append(("BOM Generation", test_bom_generation()))
+    
+    # Test 12: CLI
     results.append(("CLI", test_cli()))
     
-    # Test 3: Example project scan
+    # Test 13: Example project scan
     results.append(("Example Project Scan", test_example_project()))
     
     # Summary